@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session, joinedload
+from types import SimpleNamespace
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.communication import ForumTopic, ForumReply
 from app.models.user import User
+from app.counters import increment_counter
+from app.forum_search import match_expression, snippets, supports_fts, topic_hits
+from app.likes import add_like, delete_likes, like_index, remove_like
+from app.pagination import paginate
+from app.view_counter import view_counter
 from app.schemas.communication import (
     ForumTopicCreate, ForumTopicUpdate, ForumTopicResponse,
     ForumReplyCreate, ForumReplyUpdate, ForumReplyResponse
@@ -28,6 +34,7 @@ class ForumTopicWithAuthor(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
     author_name: str
+    snippet: Optional[str] = None  # Trecho destacado, só na busca
     
     class Config:
         from_attributes = True
@@ -44,6 +51,7 @@ class ForumReplyWithAuthor(BaseModel):
     updated_at: Optional[datetime] = None
     author_name: str
     parent_reply_id: Optional[int] = None
+    liked_by_me: bool = False
     
     class Config:
         from_attributes = True
@@ -53,15 +61,21 @@ class ForumReplyWithAuthor(BaseModel):
 
 @router.get("/topics", response_model=List[ForumTopicWithAuthor])
 def get_topics(
+    response: Response,
     subject_id: Optional[int] = None,
     user_id: Optional[int] = None,
     is_resolved: Optional[bool] = None,
     search: Optional[str] = None,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Listar tópicos do fórum"""
+    """
+    Listar tópicos do fórum.
+    Com search, busca em tópicos e respostas e ordena por relevância,
+    retornando em snippet o trecho encontrado.
+    """
     query = db.query(ForumTopic, User.name.label('author_name')).join(
         User, ForumTopic.user_id == User.id
     )
@@ -72,16 +86,40 @@ def get_topics(
         query = query.filter(ForumTopic.user_id == user_id)
     if is_resolved is not None:
         query = query.filter(ForumTopic.is_resolved == is_resolved)
-    if search:
+    
+    hits = None
+    if search and supports_fts(db.get_bind()):
+        match = match_expression(search)
+        if match is None:
+            return []
+        hits = topic_hits(match)
+        query = query.add_columns(hits.c.doc_id, hits.c.rank).join(
+            hits, hits.c.topic_id == ForumTopic.id
+        )
+    elif search:
         query = query.filter(
             ForumTopic.title.ilike(f"%{search}%") | 
             ForumTopic.content.ilike(f"%{search}%")
         )
     
-    results = query.order_by(ForumTopic.created_at.desc()).offset(skip).limit(limit).all()
+    if hits is not None:
+        # Mais relevantes primeiro (BM25 menor), empate pelo id
+        results = paginate(
+            query, response, [hits.c.rank, ForumTopic.id],
+            cursor=cursor, skip=skip, limit=limit, descending=False,
+            entity=lambda row: SimpleNamespace(rank=row.rank, id=row[0].id)
+        )
+    else:
+        results = paginate(
+            query, response, [ForumTopic.created_at, ForumTopic.id],
+            cursor=cursor, skip=skip, limit=limit, entity=lambda row: row[0]
+        )
+    
+    # Trechos destacados só dos documentos da página
+    found = snippets(db, match, [row.doc_id for row in results]) if hits is not None else {}
     
     topics = []
-    for topic, author_name in results:
+    for topic, author_name, *hit in results:
         topic_dict = {
             "id": topic.id,
             "subject_id": topic.subject_id,
@@ -93,7 +131,8 @@ def get_topics(
             "replies_count": topic.replies_count,
             "created_at": topic.created_at,
             "updated_at": topic.updated_at,
-            "author_name": author_name
+            "author_name": author_name,
+            "snippet": found.get(hit[0]) if hit else None
         }
         topics.append(topic_dict)
     
@@ -101,7 +140,7 @@ def get_topics(
 
 
 @router.get("/topics/{topic_id}", response_model=ForumTopicWithAuthor)
-def get_topic(topic_id: int, db: Session = Depends(get_db)):
+def get_topic(topic_id: int, db: Session = Depends(get_read_db)):
     """Retorna tópico específico"""
     result = db.query(ForumTopic, User.name.label('author_name')).join(
         User, ForumTopic.user_id == User.id
@@ -112,9 +151,8 @@ def get_topic(topic_id: int, db: Session = Depends(get_db)):
     
     topic, author_name = result
     
-    # Incrementar visualizações
-    topic.views_count += 1
-    db.commit()
+    # Incrementar visualizações (gravadas em lote pelo view_counter)
+    pending_views = view_counter.increment(ForumTopic.__tablename__, topic.id)
     
     return {
         "id": topic.id,
@@ -123,7 +161,7 @@ def get_topic(topic_id: int, db: Session = Depends(get_db)):
         "title": topic.title,
         "content": topic.content,
         "is_resolved": topic.is_resolved,
-        "views_count": topic.views_count,
+        "views_count": topic.views_count + pending_views,
         "replies_count": topic.replies_count,
         "created_at": topic.created_at,
         "updated_at": topic.updated_at,
@@ -226,7 +264,10 @@ def delete_topic(topic_id: int, user_id: int, db: Session = Depends(get_db)):
     if db_topic.user_id != user_id:
         raise HTTPException(status_code=403, detail="Apenas o autor pode deletar o tópico")
     
-    # Deletar todas as respostas do tópico
+    # Deletar todas as respostas do tópico e as curtidas delas
+    db.execute(delete_likes(
+        "forum_reply", db.query(ForumReply.id).filter(ForumReply.topic_id == topic_id).scalar_subquery()
+    ))
     db.query(ForumReply).filter(ForumReply.topic_id == topic_id).delete()
     
     db.delete(db_topic)
@@ -238,18 +279,31 @@ def delete_topic(topic_id: int, user_id: int, db: Session = Depends(get_db)):
 # ==================== RESPOSTAS ====================
 
 @router.get("/topics/{topic_id}/replies", response_model=List[ForumReplyWithAuthor])
-def get_replies(topic_id: int, skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
-    """Listar respostas de um tópico"""
+def get_replies(
+    topic_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    viewer_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Listar respostas de um tópico (viewer_id preenche liked_by_me)"""
     # Verificar se o tópico existe
     topic = db.query(ForumTopic).filter(ForumTopic.id == topic_id).first()
     if not topic:
         raise HTTPException(status_code=404, detail="Tópico não encontrado")
     
-    results = db.query(ForumReply, User.name.label('author_name')).join(
+    query = db.query(ForumReply, User.name.label('author_name')).join(
         User, ForumReply.user_id == User.id
-    ).filter(ForumReply.topic_id == topic_id).order_by(
-        ForumReply.created_at.asc()
-    ).offset(skip).limit(limit).all()
+    ).filter(ForumReply.topic_id == topic_id)
+    results = paginate(
+        query, response, [ForumReply.created_at, ForumReply.id],
+        cursor=cursor, skip=skip, limit=limit, descending=False, entity=lambda row: row[0]
+    )
+    
+    # Curtidas do usuário na página inteira (no máximo uma consulta)
+    liked = like_index.liked_targets(db, "forum_reply", viewer_id, [reply.id for reply, _ in results])
     
     replies = []
     for reply, author_name in results:
@@ -263,7 +317,8 @@ def get_replies(topic_id: int, skip: int = 0, limit: int = 50, db: Session = Dep
             "created_at": reply.created_at,
             "updated_at": reply.updated_at,
             "author_name": author_name,
-            "parent_reply_id": getattr(reply, 'parent_reply_id', None)
+            "parent_reply_id": getattr(reply, 'parent_reply_id', None),
+            "liked_by_me": reply.id in liked
         }
         replies.append(reply_dict)
     
@@ -280,16 +335,15 @@ class ForumReplyCreateWithUser(BaseModel):
 @router.post("/replies", response_model=ForumReplyWithAuthor, status_code=status.HTTP_201_CREATED)
 def create_reply(reply: ForumReplyCreateWithUser, db: Session = Depends(get_db)):
     """Criar nova resposta"""
-    # Verificar se o tópico existe
-    topic = db.query(ForumTopic).filter(ForumTopic.id == reply.topic_id).first()
-    if not topic:
-        raise HTTPException(status_code=404, detail="Tópico não encontrado")
-    
     # Verificar se o usuário existe
     user = db.query(User).filter(User.id == reply.user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
+    # Incrementar contador de respostas do tópico (também verifica se o tópico existe)
+    if increment_counter(db, ForumTopic.replies_count, reply.topic_id) is None:
+        raise HTTPException(status_code=404, detail="Tópico não encontrado")
+    
     db_reply = ForumReply(
         topic_id=reply.topic_id,
         user_id=reply.user_id,
@@ -297,9 +351,6 @@ def create_reply(reply: ForumReplyCreateWithUser, db: Session = Depends(get_db))
     )
     db.add(db_reply)
     
-    # Incrementar contador de respostas do tópico
-    topic.replies_count += 1
-    
     db.commit()
     db.refresh(db_reply)
     
@@ -371,10 +422,9 @@ def delete_reply(reply_id: int, user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=403, detail="Apenas o autor pode deletar a resposta")
     
     # Decrementar contador de respostas do tópico
-    topic = db.query(ForumTopic).filter(ForumTopic.id == db_reply.topic_id).first()
-    if topic:
-        topic.replies_count = max(0, topic.replies_count - 1)
+    increment_counter(db, ForumTopic.replies_count, db_reply.topic_id, -1)
     
+    db.execute(delete_likes("forum_reply", [reply_id]))
     db.delete(db_reply)
     db.commit()
     
@@ -382,19 +432,33 @@ def delete_reply(reply_id: int, user_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/replies/{reply_id}/like", response_model=ForumReplyWithAuthor)
-def like_reply(reply_id: int, db: Session = Depends(get_db)):
-    """Curtir uma resposta"""
-    result = db.query(ForumReply, User.name.label('author_name')).join(
-        User, ForumReply.user_id == User.id
-    ).filter(ForumReply.id == reply_id).first()
+def like_reply(reply_id: int, user_id: int, db: Session = Depends(get_db)):
+    """Curtir uma resposta (uma curtida por usuário)"""
+    if not db.query(User.id).filter(User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
-    if not result:
+    likes_count = add_like(db, "forum_reply", reply_id, user_id)
+    if likes_count is None:
         raise HTTPException(status_code=404, detail="Resposta não encontrada")
     
-    db_reply, author_name = result
-    db_reply.likes_count += 1
-    db.commit()
-    db.refresh(db_reply)
+    return reply_with_author(db, reply_id, likes_count, liked_by_me=True)
+
+
+@router.delete("/replies/{reply_id}/like", response_model=ForumReplyWithAuthor)
+def unlike_reply(reply_id: int, user_id: int, db: Session = Depends(get_db)):
+    """Remover a curtida do usuário em uma resposta"""
+    likes_count = remove_like(db, "forum_reply", reply_id, user_id)
+    if likes_count is None:
+        raise HTTPException(status_code=404, detail="Resposta não encontrada")
+    
+    return reply_with_author(db, reply_id, likes_count, liked_by_me=False)
+
+
+def reply_with_author(db: Session, reply_id: int, likes_count: int, liked_by_me: bool) -> dict:
+    """Resposta com o nome do autor, após curtir ou descurtir"""
+    db_reply, author_name = db.query(ForumReply, User.name.label('author_name')).join(
+        User, ForumReply.user_id == User.id
+    ).filter(ForumReply.id == reply_id).one()
     
     return {
         "id": db_reply.id,
@@ -402,11 +466,12 @@ def like_reply(reply_id: int, db: Session = Depends(get_db)):
         "user_id": db_reply.user_id,
         "content": db_reply.content,
         "is_accepted": db_reply.is_accepted,
-        "likes_count": db_reply.likes_count,
+        "likes_count": likes_count,
         "created_at": db_reply.created_at,
         "updated_at": db_reply.updated_at,
         "author_name": author_name,
-        "parent_reply_id": None
+        "parent_reply_id": None,
+        "liked_by_me": liked_by_me
     }
 
 
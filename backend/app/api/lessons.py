@@ -1,36 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-from app.database import get_db
-from app.models.lesson import Lesson
+from typing import List, Optional
+from datetime import datetime, timezone
+from operator import itemgetter
+from app.database import get_db, get_read_db, get_async_db
+from sqlalchemy import select
+from app.bulk import bulk_response, in_insert_order, insert_returning, reject, should_insert, validate_items
+from app.geo import MAX_RADIUS_KM, filter_box, nearest
+from app.matching import match_index, rank, volunteer_profile
+from app.models.lesson import Lesson, LessonStatus
 from app.models.learner import Learner
 from app.models.volunteer import Volunteer
 from app.models.user import User
+from app.pagination import paginate
 from app.schemas.lesson import (
     LessonCreate, LessonUpdate, LessonResponse,
-    LessonAccept, LessonFeedback
+    LessonAccept, LessonFeedback, LessonAvailableResponse, LessonMatchResponse
 )
+from app.schemas.bulk import BulkCreateRequest, BulkCreateResponse
+from app.websocket.channels import lesson_channel, subject_channel, user_channel
 from app.websocket.manager import manager
 
 
 router = APIRouter(prefix="/lessons", tags=["lessons"])
 
 
+async def lesson_channels(db: AsyncSession, lesson: Lesson) -> List[str]:
+    """Canais dos eventos da aula: a aula, a disciplina, o aprendiz e o voluntário"""
+    channels = [lesson_channel(lesson.id), subject_channel(lesson.subject_id)]
+    # db.get usa os perfis já carregados na sessão, sem nova consulta
+    for model, profile_id in ((Learner, lesson.learner_id), (Volunteer, lesson.volunteer_id)):
+        if profile_id is not None:
+            profile = await db.get(model, profile_id)
+            if profile is not None:
+                channels.append(user_channel(profile.user_id))
+    return channels
+
+
 @router.post("/", response_model=LessonResponse, status_code=status.HTTP_201_CREATED)
-async def create_lesson(lesson: LessonCreate, db: Session = Depends(get_db)):
+async def create_lesson(lesson: LessonCreate, db: AsyncSession = Depends(get_async_db)):
     """Criar solicitação de aula"""
     # Verificar se learner existe
-    learner = db.query(Learner).filter(Learner.id == lesson.learner_id).first()
+    learner = await db.get(Learner, lesson.learner_id)
     if not learner:
         raise HTTPException(status_code=404, detail="Aprendiz não encontrado")
     
     db_lesson = Lesson(**lesson.model_dump())
     db.add(db_lesson)
-    db.commit()
-    db.refresh(db_lesson)
+    await db.commit()
+    await db.refresh(db_lesson)
+    match_index.update([db_lesson])
     
-    await manager.broadcast({
+    await manager.publish(await lesson_channels(db, db_lesson), {
         "type": "lesson_requested",
         "data": LessonResponse.model_validate(db_lesson).model_dump(mode='json')
     })
@@ -38,8 +60,46 @@ async def create_lesson(lesson: LessonCreate, db: Session = Depends(get_db)):
     return db_lesson
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_lessons_bulk(request: BulkCreateRequest, db: AsyncSession = Depends(get_async_db)):
+    """Criar várias solicitações de aula em uma única transação"""
+    valid, failures = validate_items(request, LessonCreate)
+    
+    # Verificar os aprendizes de todo o lote em uma consulta
+    learner_ids = {item.learner_id for item in valid.values()}
+    result = await db.execute(select(Learner.id, Learner.user_id).where(Learner.id.in_(learner_ids)))
+    learner_users = dict(result.all())
+    existing = set(learner_users)
+    for index, item in list(valid.items()):
+        if item.learner_id not in existing:
+            reject(valid, failures, index, "Aprendiz não encontrado")
+    
+    created = {}
+    if should_insert(request, valid, failures):
+        indexes = list(valid)
+        result = await db.execute(insert_returning(Lesson), [valid[index].model_dump() for index in indexes])
+        items = [LessonResponse.model_validate(row) for row in in_insert_order(result.all())]
+        await db.commit()
+        match_index.update(items)
+        created = {index: item.id for index, item in zip(indexes, items)}
+        
+        # Um único evento para o lote, publicado nos canais de todas as
+        # disciplinas e aprendizes dele
+        channels = set()
+        for item in items:
+            channels.add(subject_channel(item.subject_id))
+            channels.add(user_channel(learner_users[item.learner_id]))
+        await manager.publish(channels, {
+            "type": "lesson_bulk_requested",
+            "data": [item.model_dump(mode='json') for item in items]
+        })
+    
+    return bulk_response(len(request.items), created, failures)
+
+
 @router.get("/", response_model=List[LessonResponse])
 def get_lessons(
+    response: Response,
     learner_id: int = None,
     volunteer_id: int = None,
     subject_id: int = None,
@@ -47,6 +107,7 @@ def get_lessons(
     lesson_type: str = None,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Listar aulas com filtros"""
@@ -63,19 +124,35 @@ def get_lessons(
     if lesson_type:
         query = query.filter(Lesson.lesson_type == lesson_type)
     
-    lessons = query.order_by(Lesson.scheduled_date.desc()).offset(skip).limit(limit).all()
-    return lessons
+    return paginate(
+        query, response, [Lesson.scheduled_date, Lesson.id],
+        cursor=cursor, skip=skip, limit=limit
+    )
 
 
-@router.get("/available", response_model=List[LessonResponse])
+@router.get("/available", response_model=List[LessonAvailableResponse])
 def get_available_lessons(
+    response: Response,
     city: str = None,
     subject_id: int = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(10.0, gt=0, le=MAX_RADIUS_KM),
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Voluntários veem solicitações disponíveis"""
+    """
+    Voluntários veem solicitações disponíveis. Com lat e lng, retorna as
+    solicitações a até radius_km do ponto, da mais próxima à mais distante
+    (e pela data agendada); essa busca pagina só com skip e limit.
+    """
+    if lat is not None or lng is not None:
+        if lat is None or lng is None:
+            raise HTTPException(status_code=400, detail="Informe lat e lng para buscar por proximidade")
+        return get_nearby_lessons(db, lat, lng, radius_km, city, subject_id, skip, limit)
+    
     query = db.query(Lesson).filter(Lesson.status == "requested")
     
     if subject_id:
@@ -84,8 +161,85 @@ def get_available_lessons(
     if city:
         query = query.filter(Lesson.location_city == city)
     
-    lessons = query.order_by(Lesson.created_at.desc()).offset(skip).limit(limit).all()
-    return lessons
+    return paginate(
+        query, response, [Lesson.created_at, Lesson.id],
+        cursor=cursor, skip=skip, limit=limit
+    )
+
+
+def get_nearby_lessons(
+    db: Session, lat: float, lng: float, radius_km: float,
+    city: Optional[str], subject_id: Optional[int], skip: int, limit: int
+) -> List[LessonAvailableResponse]:
+    """Solicitações abertas a até radius_km do ponto, ordenadas por distância e data"""
+    query = db.query(Lesson.id, Lesson.location_latitude, Lesson.location_longitude)
+    if subject_id:
+        query = query.filter(Lesson.subject_id == subject_id)
+    if city:
+        query = query.filter(Lesson.location_city == city)
+    
+    # O status fica de fora da consulta no SQLite: o índice espacial só guarda
+    # as solicitações abertas
+    def candidates(box):
+        return filter_box(
+            query, Lesson, Lesson.location_latitude, Lesson.location_longitude, box,
+            condition=Lesson.status == LessonStatus.REQUESTED
+        ).all()
+    
+    # Candidatos só com id e coordenadas; os empatados na última posição vêm
+    # junto para o desempate pela data agendada
+    nearby = nearest(candidates, lat, lng, radius_km, skip + limit, itemgetter(1, 2), keep_ties=True)
+    
+    lessons = {
+        lesson.id: lesson
+        for lesson in db.query(Lesson).filter(Lesson.id.in_([row.id for row, _ in nearby]))
+    }
+    nearby.sort(key=lambda pair: (pair[1], lessons[pair[0].id].scheduled_date))
+    return [
+        LessonAvailableResponse(
+            **LessonResponse.model_validate(lessons[row.id]).model_dump(),
+            distance_km=round(distance, 3)
+        )
+        for row, distance in nearby[skip:skip + limit]
+    ]
+
+
+@router.get("/matches/{volunteer_id}", response_model=List[LessonMatchResponse])
+def get_lesson_matches(
+    volunteer_id: int,
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Solicitações abertas sugeridas para o voluntário: das disciplinas dele,
+    na modalidade que ele atende, sem coincidir com a agenda dele; primeiro
+    as presenciais na cidade dele, depois as online, e as mais próximas
+    da data primeiro
+    """
+    now = datetime.now(timezone.utc)
+    volunteer = volunteer_profile(db, volunteer_id, now)
+    if volunteer is None:
+        raise HTTPException(status_code=404, detail="Voluntário não encontrado")
+    
+    ranked = rank(match_index.candidates(db, volunteer.subject_ids), volunteer, now, skip + limit)[skip:]
+    
+    # Linhas completas só das aulas da página; as que outro processo já
+    # tirou de aberta saem da resposta e do índice
+    lessons = {
+        lesson.id: lesson
+        for lesson in db.query(Lesson).filter(Lesson.id.in_([lesson.id for lesson, _ in ranked]))
+    }
+    matches = []
+    for lesson, points in ranked:
+        db_lesson = lessons.get(lesson.id)
+        if db_lesson is None or db_lesson.status != LessonStatus.REQUESTED:
+            match_index.remove(lesson.id)
+            continue
+        matches.append(LessonMatchResponse(
+            **LessonResponse.model_validate(db_lesson).model_dump(), match_score=points
+        ))
+    return matches
 
 
 @router.get("/{lesson_id}", response_model=LessonResponse)
@@ -101,10 +255,10 @@ def get_lesson(lesson_id: int, db: Session = Depends(get_db)):
 async def update_lesson(
     lesson_id: int,
     lesson: LessonUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualiza informações da aula"""
-    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    db_lesson = await db.get(Lesson, lesson_id)
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
@@ -112,10 +266,11 @@ async def update_lesson(
     for field, value in update_data.items():
         setattr(db_lesson, field, value)
     
-    db.commit()
-    db.refresh(db_lesson)
+    await db.commit()
+    await db.refresh(db_lesson)
+    match_index.update([db_lesson])
     
-    await manager.broadcast({
+    await manager.publish(await lesson_channels(db, db_lesson), {
         "type": "lesson_updated",
         "data": LessonResponse.model_validate(db_lesson).model_dump(mode='json')
     })
@@ -127,10 +282,10 @@ async def update_lesson(
 async def accept_lesson(
     lesson_id: int,
     accept_data: LessonAccept,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Voluntário aceita aula"""
-    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    db_lesson = await db.get(Lesson, lesson_id)
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
@@ -138,17 +293,18 @@ async def accept_lesson(
         raise HTTPException(status_code=400, detail="Aula não está disponível")
     
     # Verificar se voluntário existe
-    volunteer = db.query(Volunteer).filter(Volunteer.id == accept_data.volunteer_id).first()
+    volunteer = await db.get(Volunteer, accept_data.volunteer_id)
     if not volunteer:
         raise HTTPException(status_code=404, detail="Voluntário não encontrado")
     
     db_lesson.volunteer_id = accept_data.volunteer_id
     db_lesson.status = "accepted"
     
-    db.commit()
-    db.refresh(db_lesson)
+    await db.commit()
+    await db.refresh(db_lesson)
+    match_index.remove(lesson_id)
     
-    await manager.broadcast({
+    await manager.publish(await lesson_channels(db, db_lesson), {
         "type": "lesson_accepted",
         "data": LessonResponse.model_validate(db_lesson).model_dump(mode='json')
     })
@@ -157,9 +313,9 @@ async def accept_lesson(
 
 
 @router.post("/{lesson_id}/confirm", response_model=LessonResponse)
-async def confirm_lesson(lesson_id: int, db: Session = Depends(get_db)):
+async def confirm_lesson(lesson_id: int, db: AsyncSession = Depends(get_async_db)):
     """Confirmar aula (após aceita)"""
-    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    db_lesson = await db.get(Lesson, lesson_id)
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
@@ -167,10 +323,10 @@ async def confirm_lesson(lesson_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Aula precisa estar aceita")
     
     db_lesson.status = "confirmed"
-    db.commit()
-    db.refresh(db_lesson)
+    await db.commit()
+    await db.refresh(db_lesson)
     
-    await manager.broadcast({
+    await manager.publish(await lesson_channels(db, db_lesson), {
         "type": "lesson_confirmed",
         "data": LessonResponse.model_validate(db_lesson).model_dump(mode='json')
     })
@@ -182,10 +338,10 @@ async def confirm_lesson(lesson_id: int, db: Session = Depends(get_db)):
 async def complete_lesson(
     lesson_id: int,
     feedback: LessonFeedback = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Marcar aula como concluída"""
-    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    db_lesson = await db.get(Lesson, lesson_id)
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
@@ -197,15 +353,16 @@ async def complete_lesson(
     
     # Adicionar pontos ao voluntário
     if db_lesson.volunteer_id:
-        volunteer = db.query(Volunteer).filter(Volunteer.id == db_lesson.volunteer_id).first()
+        volunteer = await db.get(Volunteer, db_lesson.volunteer_id)
         if volunteer:
             volunteer.total_points += 10
             volunteer.total_lessons += 1
     
-    db.commit()
-    db.refresh(db_lesson)
+    await db.commit()
+    await db.refresh(db_lesson)
+    match_index.remove(lesson_id)
     
-    await manager.broadcast({
+    await manager.publish(await lesson_channels(db, db_lesson), {
         "type": "lesson_completed",
         "data": LessonResponse.model_validate(db_lesson).model_dump(mode='json')
     })
@@ -214,16 +371,17 @@ async def complete_lesson(
 
 
 @router.delete("/{lesson_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def cancel_lesson(lesson_id: int, db: Session = Depends(get_db)):
+async def cancel_lesson(lesson_id: int, db: AsyncSession = Depends(get_async_db)):
     """Cancelar aula"""
-    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    db_lesson = await db.get(Lesson, lesson_id)
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
     db_lesson.status = "cancelled"
-    db.commit()
+    await db.commit()
+    match_index.remove(lesson_id)
     
-    await manager.broadcast({
+    await manager.publish(await lesson_channels(db, db_lesson), {
         "type": "lesson_cancelled",
         "data": {"id": lesson_id}
     })
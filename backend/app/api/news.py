@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import get_read_db, get_async_db
+from app.bulk import bulk_response, in_insert_order, insert_returning, should_insert, validate_items
 from app.models.news import News
+from app.pagination import paginate
+from app.search import reindex
+from app.view_counter import view_counter
+from app.schemas.bulk import BulkCreateRequest, BulkCreateResponse
 from app.schemas.news import NewsCreate, NewsUpdate, NewsResponse
+from app.websocket.channels import NEWS
 from app.websocket.manager import manager
 
 
@@ -12,11 +19,13 @@ router = APIRouter(prefix="/news", tags=["news"])
 
 @router.get("/", response_model=List[NewsResponse])
 def get_news(
+    response: Response,
     news_type: str = None,
     is_featured: bool = None,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
     """Listar notícias, eventos e campanhas"""
     query = db.query(News).filter(News.is_active == True)
@@ -26,33 +35,37 @@ def get_news(
     if is_featured is not None:
         query = query.filter(News.is_featured == is_featured)
     
-    news = query.order_by(News.created_at.desc()).offset(skip).limit(limit).all()
-    return news
+    return paginate(
+        query, response, [News.created_at, News.id],
+        cursor=cursor, skip=skip, limit=limit
+    )
 
 
 @router.get("/{news_id}", response_model=NewsResponse)
-def get_news_item(news_id: int, db: Session = Depends(get_db)):
+def get_news_item(news_id: int, db: Session = Depends(get_read_db)):
     """Retorna notícia específica"""
     news = db.query(News).filter(News.id == news_id).first()
     if not news:
         raise HTTPException(status_code=404, detail="Notícia não encontrada")
     
-    # Incrementar visualizações
-    news.views_count += 1
-    db.commit()
+    # Incrementar visualizações (gravadas em lote pelo view_counter)
+    response = NewsResponse.model_validate(news)
+    response.views_count += view_counter.increment(News.__tablename__, news.id)
     
-    return news
+    return response
 
 
 @router.post("/", response_model=NewsResponse, status_code=status.HTTP_201_CREATED)
-async def create_news(news: NewsCreate, db: Session = Depends(get_db)):
+async def create_news(news: NewsCreate, db: AsyncSession = Depends(get_async_db)):
     """Criar notícia/evento/campanha"""
     db_news = News(**news.model_dump())
     db.add(db_news)
-    db.commit()
-    db.refresh(db_news)
+    await db.flush()
+    await db.run_sync(reindex, "news", [db_news.id])
+    await db.commit()
+    await db.refresh(db_news)
     
-    await manager.broadcast({
+    await manager.publish([NEWS], {
         "type": "news_created",
         "data": NewsResponse.model_validate(db_news).model_dump(mode='json')
     })
@@ -60,10 +73,33 @@ async def create_news(news: NewsCreate, db: Session = Depends(get_db)):
     return db_news
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_news_bulk(request: BulkCreateRequest, db: AsyncSession = Depends(get_async_db)):
+    """Criar várias notícias em uma única transação"""
+    valid, failures = validate_items(request, NewsCreate)
+    
+    created = {}
+    if should_insert(request, valid, failures):
+        indexes = list(valid)
+        result = await db.execute(insert_returning(News), [valid[index].model_dump() for index in indexes])
+        items = [NewsResponse.model_validate(row) for row in in_insert_order(result.all())]
+        await db.run_sync(reindex, "news", [item.id for item in items])
+        await db.commit()
+        created = {index: item.id for index, item in zip(indexes, items)}
+        
+        # Um único evento para o lote
+        await manager.publish([NEWS], {
+            "type": "news_bulk_created",
+            "data": [item.model_dump(mode='json') for item in items]
+        })
+    
+    return bulk_response(len(request.items), created, failures)
+
+
 @router.put("/{news_id}", response_model=NewsResponse)
-async def update_news(news_id: int, news: NewsUpdate, db: Session = Depends(get_db)):
+async def update_news(news_id: int, news: NewsUpdate, db: AsyncSession = Depends(get_async_db)):
     """Atualizar notícia"""
-    db_news = db.query(News).filter(News.id == news_id).first()
+    db_news = await db.get(News, news_id)
     if not db_news:
         raise HTTPException(status_code=404, detail="Notícia não encontrada")
     
@@ -71,10 +107,11 @@ async def update_news(news_id: int, news: NewsUpdate, db: Session = Depends(get_
     for field, value in update_data.items():
         setattr(db_news, field, value)
     
-    db.commit()
-    db.refresh(db_news)
+    await db.run_sync(reindex, "news", [news_id])
+    await db.commit()
+    await db.refresh(db_news)
     
-    await manager.broadcast({
+    await manager.publish([NEWS], {
         "type": "news_updated",
         "data": NewsResponse.model_validate(db_news).model_dump(mode='json')
     })
@@ -83,16 +120,17 @@ async def update_news(news_id: int, news: NewsUpdate, db: Session = Depends(get_
 
 
 @router.delete("/{news_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_news(news_id: int, db: Session = Depends(get_db)):
+async def delete_news(news_id: int, db: AsyncSession = Depends(get_async_db)):
     """Deletar notícia"""
-    db_news = db.query(News).filter(News.id == news_id).first()
+    db_news = await db.get(News, news_id)
     if not db_news:
         raise HTTPException(status_code=404, detail="Notícia não encontrada")
     
-    db.delete(db_news)
-    db.commit()
+    await db.delete(db_news)
+    await db.run_sync(reindex, "news", [news_id])
+    await db.commit()
     
-    await manager.broadcast({
+    await manager.publish([NEWS], {
         "type": "news_deleted",
         "data": {"id": news_id}
     })
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from operator import itemgetter
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_read_db, get_async_db
+from app.bulk import bulk_response, in_insert_order, insert_returning, should_insert, validate_items
+from app.geo import MAX_RADIUS_KM, filter_box, nearest
 from app.models.partner import PartnerLocation
-from app.schemas.partner import PartnerLocationCreate, PartnerLocationUpdate, PartnerLocationResponse
+from app.search import reindex
+from app.schemas.bulk import BulkCreateRequest, BulkCreateResponse
+from app.schemas.partner import (
+    PartnerLocationCreate, PartnerLocationUpdate, PartnerLocationResponse, PartnerNearbyResponse
+)
+from app.websocket.channels import PARTNERS
+from app.websocket.manager import manager
 
 
 router = APIRouter(prefix="/partners", tags=["partners"])
@@ -16,7 +26,7 @@ def get_partners(
     state: str = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Listar locais parceiros"""
     query = db.query(PartnerLocation).filter(PartnerLocation.is_active == True)
@@ -32,6 +42,44 @@ def get_partners(
     return partners
 
 
+@router.get("/nearby", response_model=List[PartnerNearbyResponse])
+def get_nearby_partners(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10.0, gt=0, le=MAX_RADIUS_KM),
+    partner_type: str = None,
+    limit: int = 50,
+    db: Session = Depends(get_read_db)
+):
+    """Locais parceiros ativos a até radius_km do ponto, do mais próximo ao mais distante"""
+    query = db.query(PartnerLocation.id, PartnerLocation.latitude, PartnerLocation.longitude)
+    if partner_type:
+        query = query.filter(PartnerLocation.partner_type == partner_type)
+    
+    # Candidatos pelo índice espacial (só parceiros ativos); a distância exata
+    # é calculada só para eles
+    def candidates(box):
+        return filter_box(
+            query, PartnerLocation, PartnerLocation.latitude, PartnerLocation.longitude, box,
+            condition=PartnerLocation.is_active == True
+        ).all()
+    
+    nearby = nearest(candidates, lat, lng, radius_km, limit, itemgetter(1, 2))
+    
+    # Linhas completas só dos parceiros da resposta
+    partners = {
+        partner.id: partner
+        for partner in db.query(PartnerLocation).filter(PartnerLocation.id.in_([row.id for row, _ in nearby]))
+    }
+    return [
+        PartnerNearbyResponse(
+            **PartnerLocationResponse.model_validate(partners[row.id]).model_dump(),
+            distance_km=round(distance, 3)
+        )
+        for row, distance in nearby
+    ]
+
+
 @router.get("/{partner_id}", response_model=PartnerLocationResponse)
 def get_partner(partner_id: int, db: Session = Depends(get_db)):
     """Retorna local parceiro específico"""
@@ -46,11 +94,36 @@ def create_partner(partner: PartnerLocationCreate, db: Session = Depends(get_db)
     """Criar local parceiro"""
     db_partner = PartnerLocation(**partner.model_dump())
     db.add(db_partner)
+    db.flush()
+    reindex(db, "partner", [db_partner.id])
     db.commit()
     db.refresh(db_partner)
     return db_partner
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_partners_bulk(request: BulkCreateRequest, db: AsyncSession = Depends(get_async_db)):
+    """Criar vários locais parceiros em uma única transação"""
+    valid, failures = validate_items(request, PartnerLocationCreate)
+    
+    created = {}
+    if should_insert(request, valid, failures):
+        indexes = list(valid)
+        result = await db.execute(insert_returning(PartnerLocation), [valid[index].model_dump() for index in indexes])
+        items = [PartnerLocationResponse.model_validate(row) for row in in_insert_order(result.all())]
+        await db.run_sync(reindex, "partner", [item.id for item in items])
+        await db.commit()
+        created = {index: item.id for index, item in zip(indexes, items)}
+        
+        # Um único evento para o lote
+        await manager.publish([PARTNERS], {
+            "type": "partner_bulk_created",
+            "data": [item.model_dump(mode='json') for item in items]
+        })
+    
+    return bulk_response(len(request.items), created, failures)
+
+
 @router.put("/{partner_id}", response_model=PartnerLocationResponse)
 def update_partner(
     partner_id: int,
@@ -66,6 +139,7 @@ def update_partner(
     for field, value in update_data.items():
         setattr(db_partner, field, value)
     
+    reindex(db, "partner", [partner_id])
     db.commit()
     db.refresh(db_partner)
     return db_partner
@@ -79,5 +153,6 @@ def delete_partner(partner_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Parceiro não encontrado")
     
     db.delete(db_partner)
+    reindex(db, "partner", [partner_id])
     db.commit()
     return None
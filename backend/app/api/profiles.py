@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_read_db, get_async_db
+from app.lookup import lookup_by_ids
 from app.models.user import User
 from app.models.volunteer import Volunteer
 from app.models.learner import Learner
@@ -10,24 +13,33 @@ from app.schemas.profiles import (
     VolunteerCreate, VolunteerUpdate, VolunteerResponse,
     LearnerCreate, LearnerUpdate, LearnerResponse
 )
+from app.schemas.lookup import LookupResponse
+from app.search import reindex
+from app.websocket.channels import subject_channel, user_channel
 from app.websocket.manager import manager
 
 
 router = APIRouter(prefix="/profiles", tags=["profiles"])
 
 
+def volunteer_channels(volunteer: Volunteer) -> List[str]:
+    """Canais dos eventos do voluntário: o do usuário e os das disciplinas dele"""
+    return [user_channel(volunteer.user_id)] + [subject_channel(subject.id) for subject in volunteer.subjects]
+
+
 # ==================== VOLUNTEER ROUTES ====================
 
 @router.post("/volunteers", response_model=VolunteerResponse, status_code=status.HTTP_201_CREATED)
-async def create_volunteer(volunteer: VolunteerCreate, db: Session = Depends(get_db)):
+async def create_volunteer(volunteer: VolunteerCreate, db: AsyncSession = Depends(get_async_db)):
     """Cria perfil de voluntário"""
     # Verificar se usuário existe
-    user = db.query(User).filter(User.id == volunteer.user_id).first()
+    user = await db.get(User, volunteer.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
     # Verificar se já tem perfil
-    existing = db.query(Volunteer).filter(Volunteer.user_id == volunteer.user_id).first()
+    result = await db.execute(select(Volunteer).where(Volunteer.user_id == volunteer.user_id))
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Voluntário já possui perfil")
     
@@ -37,14 +49,16 @@ async def create_volunteer(volunteer: VolunteerCreate, db: Session = Depends(get
     
     # Adicionar disciplinas
     if volunteer.subject_ids:
-        subjects = db.query(Subject).filter(Subject.id.in_(volunteer.subject_ids)).all()
-        db_volunteer.subjects = subjects
+        result = await db.execute(select(Subject).where(Subject.id.in_(volunteer.subject_ids)))
+        db_volunteer.subjects = list(result.scalars().all())
     
     db.add(db_volunteer)
-    db.commit()
-    db.refresh(db_volunteer)
+    await db.flush()
+    await db.run_sync(reindex, "volunteer", [db_volunteer.id])
+    await db.commit()
+    await db.refresh(db_volunteer, attribute_names=["subjects"])
     
-    await manager.broadcast({
+    await manager.publish(volunteer_channels(db_volunteer), {
         "type": "volunteer_created",
         "data": {"volunteer_id": db_volunteer.id, "user_id": db_volunteer.user_id}
     })
@@ -52,10 +66,19 @@ async def create_volunteer(volunteer: VolunteerCreate, db: Session = Depends(get
     return db_volunteer
 
 
+@router.get("/volunteers/lookup", response_model=LookupResponse[VolunteerResponse])
+def lookup_volunteers(ids: str, db: Session = Depends(get_read_db)):
+    """Retorna vários perfis de voluntário por id (ids=1,2,3), na ordem pedida"""
+    query = db.query(Volunteer).options(selectinload(Volunteer.subjects))
+    return lookup_by_ids(query, Volunteer, ids)
+
+
 @router.get("/volunteers/{volunteer_id}", response_model=VolunteerResponse)
 def get_volunteer(volunteer_id: int, db: Session = Depends(get_db)):
     """Retorna perfil de voluntário"""
-    volunteer = db.query(Volunteer).filter(Volunteer.id == volunteer_id).first()
+    volunteer = db.query(Volunteer).options(selectinload(Volunteer.subjects)).filter(
+        Volunteer.id == volunteer_id
+    ).first()
     if not volunteer:
         raise HTTPException(status_code=404, detail="Voluntário não encontrado")
     return volunteer
@@ -64,7 +87,9 @@ def get_volunteer(volunteer_id: int, db: Session = Depends(get_db)):
 @router.get("/volunteers/user/{user_id}", response_model=VolunteerResponse)
 def get_volunteer_by_user(user_id: int, db: Session = Depends(get_db)):
     """Retorna perfil de voluntário por user_id"""
-    volunteer = db.query(Volunteer).filter(Volunteer.user_id == user_id).first()
+    volunteer = db.query(Volunteer).options(selectinload(Volunteer.subjects)).filter(
+        Volunteer.user_id == user_id
+    ).first()
     if not volunteer:
         raise HTTPException(status_code=404, detail="Voluntário não encontrado")
     return volunteer
@@ -81,7 +106,8 @@ def search_volunteers(
     db: Session = Depends(get_db)
 ):
     """Busca voluntários por filtros"""
-    query = db.query(Volunteer)
+    # Disciplinas carregadas em uma única consulta extra (IN), e não uma por voluntário
+    query = db.query(Volunteer).options(selectinload(Volunteer.subjects))
     
     if verified_only:
         query = query.filter(Volunteer.document_verified == 1)
@@ -103,10 +129,12 @@ def search_volunteers(
 async def update_volunteer(
     volunteer_id: int,
     volunteer: VolunteerUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualiza perfil de voluntário"""
-    db_volunteer = db.query(Volunteer).filter(Volunteer.id == volunteer_id).first()
+    db_volunteer = await db.get(
+        Volunteer, volunteer_id, options=[selectinload(Volunteer.subjects)]
+    )
     if not db_volunteer:
         raise HTTPException(status_code=404, detail="Voluntário não encontrado")
     
@@ -116,13 +144,14 @@ async def update_volunteer(
     
     # Atualizar disciplinas se fornecido
     if volunteer.subject_ids is not None:
-        subjects = db.query(Subject).filter(Subject.id.in_(volunteer.subject_ids)).all()
-        db_volunteer.subjects = subjects
+        result = await db.execute(select(Subject).where(Subject.id.in_(volunteer.subject_ids)))
+        db_volunteer.subjects = list(result.scalars().all())
     
-    db.commit()
-    db.refresh(db_volunteer)
+    await db.run_sync(reindex, "volunteer", [volunteer_id])
+    await db.commit()
+    await db.refresh(db_volunteer, attribute_names=["subjects"])
     
-    await manager.broadcast({
+    await manager.publish(volunteer_channels(db_volunteer), {
         "type": "volunteer_updated",
         "data": {"volunteer_id": db_volunteer.id}
     })
@@ -133,15 +162,16 @@ async def update_volunteer(
 # ==================== LEARNER ROUTES ====================
 
 @router.post("/learners", response_model=LearnerResponse, status_code=status.HTTP_201_CREATED)
-async def create_learner(learner: LearnerCreate, db: Session = Depends(get_db)):
+async def create_learner(learner: LearnerCreate, db: AsyncSession = Depends(get_async_db)):
     """Cria perfil de aprendiz"""
     # Verificar se usuário existe
-    user = db.query(User).filter(User.id == learner.user_id).first()
+    user = await db.get(User, learner.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
     # Verificar se já tem perfil
-    existing = db.query(Learner).filter(Learner.user_id == learner.user_id).first()
+    result = await db.execute(select(Learner).where(Learner.user_id == learner.user_id))
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Aprendiz já possui perfil")
     
@@ -151,14 +181,14 @@ async def create_learner(learner: LearnerCreate, db: Session = Depends(get_db)):
     
     # Adicionar áreas de interesse
     if learner.interest_ids:
-        interests = db.query(Subject).filter(Subject.id.in_(learner.interest_ids)).all()
-        db_learner.interests = interests
+        result = await db.execute(select(Subject).where(Subject.id.in_(learner.interest_ids)))
+        db_learner.interests = list(result.scalars().all())
     
     db.add(db_learner)
-    db.commit()
-    db.refresh(db_learner)
+    await db.commit()
+    await db.refresh(db_learner, attribute_names=["interests"])
     
-    await manager.broadcast({
+    await manager.publish([user_channel(db_learner.user_id)], {
         "type": "learner_created",
         "data": {"learner_id": db_learner.id, "user_id": db_learner.user_id}
     })
@@ -169,7 +199,9 @@ async def create_learner(learner: LearnerCreate, db: Session = Depends(get_db)):
 @router.get("/learners/{learner_id}", response_model=LearnerResponse)
 def get_learner(learner_id: int, db: Session = Depends(get_db)):
     """Retorna perfil de aprendiz"""
-    learner = db.query(Learner).filter(Learner.id == learner_id).first()
+    learner = db.query(Learner).options(selectinload(Learner.interests)).filter(
+        Learner.id == learner_id
+    ).first()
     if not learner:
         raise HTTPException(status_code=404, detail="Aprendiz não encontrado")
     return learner
@@ -178,7 +210,9 @@ def get_learner(learner_id: int, db: Session = Depends(get_db)):
 @router.get("/learners/user/{user_id}", response_model=LearnerResponse)
 def get_learner_by_user(user_id: int, db: Session = Depends(get_db)):
     """Retorna perfil de aprendiz por user_id"""
-    learner = db.query(Learner).filter(Learner.user_id == user_id).first()
+    learner = db.query(Learner).options(selectinload(Learner.interests)).filter(
+        Learner.user_id == user_id
+    ).first()
     if not learner:
         raise HTTPException(status_code=404, detail="Aprendiz não encontrado")
     return learner
@@ -188,22 +222,24 @@ def get_learner_by_user(user_id: int, db: Session = Depends(get_db)):
 async def update_learner(
     learner_id: int,
     learner: LearnerUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualiza perfil de aprendiz"""
-    db_learner = db.query(Learner).filter(Learner.id == learner_id).first()
+    db_learner = await db.get(
+        Learner, learner_id, options=[selectinload(Learner.interests)]
+    )
     if not db_learner:
         raise HTTPException(status_code=404, detail="Aprendiz não encontrado")
     
     # Atualizar áreas de interesse se fornecido
     if learner.interest_ids is not None:
-        interests = db.query(Subject).filter(Subject.id.in_(learner.interest_ids)).all()
-        db_learner.interests = interests
+        result = await db.execute(select(Subject).where(Subject.id.in_(learner.interest_ids)))
+        db_learner.interests = list(result.scalars().all())
     
-    db.commit()
-    db.refresh(db_learner)
+    await db.commit()
+    await db.refresh(db_learner, attribute_names=["interests"])
     
-    await manager.broadcast({
+    await manager.publish([user_channel(db_learner.user_id)], {
         "type": "learner_updated",
         "data": {"learner_id": db_learner.id}
     })
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, File, UploadFile, Form
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 import os
 from pathlib import Path
-from app.database import get_db
+from app.database import get_db, get_read_db, get_async_db
 from app.models.published_lesson import PublishedLesson
 from app.models.volunteer import Volunteer
 from app.models.user import User, UserRole
+from app.likes import add_like, delete_likes, like_index, remove_like
+from app.lookup import lookup_by_ids
+from app.pagination import paginate
+from app.search import reindex
+from app.view_counter import view_counter
+from app.schemas.lookup import LookupResponse
 from app.schemas.published_lesson import (
     PublishedLessonCreate, PublishedLessonUpdate, PublishedLessonResponse
 )
@@ -15,9 +22,8 @@ from app.schemas.published_lesson import (
 
 router = APIRouter(prefix="/published-lessons", tags=["published_lessons"])
 
-# Diretório para armazenar arquivos de mídia
+# Diretório para armazenar arquivos de mídia (criado no lifespan da aplicação)
 MEDIA_DIR = Path("uploads/media")
-MEDIA_DIR.mkdir(parents=True, exist_ok=True)
 
 # Extensões permitidas
 ALLOWED_EXTENSIONS = {
@@ -47,12 +53,12 @@ async def publish_lesson(
     description: Optional[str] = Form(None),
     volunteer_id: int = Form(...),
     media_file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Voluntário publica uma aula"""
     
     # Verificar se voluntário existe
-    volunteer = db.query(Volunteer).filter(Volunteer.id == volunteer_id).first()
+    volunteer = await db.get(Volunteer, volunteer_id)
     if not volunteer:
         raise HTTPException(status_code=404, detail="Voluntário não encontrado")
     
@@ -104,21 +110,26 @@ async def publish_lesson(
     )
     
     db.add(db_lesson)
-    db.commit()
-    db.refresh(db_lesson)
+    await db.flush()
+    await db.run_sync(reindex, "published_lesson", [db_lesson.id])
+    await db.commit()
+    await db.refresh(db_lesson)
     
     return db_lesson
 
 
 @router.get("/", response_model=List[PublishedLessonResponse])
 def get_published_lessons(
+    response: Response,
     volunteer_id: Optional[int] = None,
     subject_id: Optional[int] = None,
+    viewer_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Listar aulas publicadas com filtros"""
+    """Listar aulas publicadas com filtros (viewer_id preenche liked_by_me)"""
     query = db.query(PublishedLesson)
     
     if volunteer_id:
@@ -126,22 +137,56 @@ def get_published_lessons(
     if subject_id:
         query = query.filter(PublishedLesson.subject_id == subject_id)
     
-    lessons = query.order_by(PublishedLesson.created_at.desc()).offset(skip).limit(limit).all()
-    return lessons
+    lessons = paginate(
+        query, response, [PublishedLesson.created_at, PublishedLesson.id],
+        cursor=cursor, skip=skip, limit=limit
+    )
+    
+    # Curtidas do usuário na página inteira (no máximo uma consulta)
+    liked = like_index.liked_targets(db, "published_lesson", viewer_id, [lesson.id for lesson in lessons])
+    
+    results = []
+    for lesson in lessons:
+        lesson_response = PublishedLessonResponse.model_validate(lesson)
+        lesson_response.liked_by_me = lesson.id in liked
+        results.append(lesson_response)
+    
+    return results
+
+
+@router.get("/lookup", response_model=LookupResponse[PublishedLessonResponse])
+def lookup_published_lessons(ids: str, viewer_id: Optional[int] = None, db: Session = Depends(get_read_db)):
+    """Retorna várias aulas publicadas por id (ids=1,2,3), na ordem pedida"""
+    result = lookup_by_ids(db.query(PublishedLesson), PublishedLesson, ids)
+    
+    lessons = [lesson for lesson in result["items"] if lesson is not None]
+    liked = like_index.liked_targets(db, "published_lesson", viewer_id, [lesson.id for lesson in lessons])
+    
+    items = []
+    for lesson in result["items"]:
+        if lesson is None:
+            items.append(None)
+            continue
+        lesson_response = PublishedLessonResponse.model_validate(lesson)
+        lesson_response.liked_by_me = lesson.id in liked
+        items.append(lesson_response)
+    
+    return {"items": items, "missing": result["missing"]}
 
 
 @router.get("/{lesson_id}", response_model=PublishedLessonResponse)
-def get_published_lesson(lesson_id: int, db: Session = Depends(get_db)):
+def get_published_lesson(lesson_id: int, viewer_id: Optional[int] = None, db: Session = Depends(get_read_db)):
     """Retorna uma aula publicada específica"""
     lesson = db.query(PublishedLesson).filter(PublishedLesson.id == lesson_id).first()
     if not lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
-    # Incrementar contador de visualizações
-    lesson.views_count += 1
-    db.commit()
+    # Incrementar contador de visualizações (gravado em lote pelo view_counter)
+    response = PublishedLessonResponse.model_validate(lesson)
+    response.views_count += view_counter.increment(PublishedLesson.__tablename__, lesson.id)
+    response.liked_by_me = bool(like_index.liked_targets(db, "published_lesson", viewer_id, [lesson.id]))
     
-    return lesson
+    return response
 
 
 @router.put("/{lesson_id}", response_model=PublishedLessonResponse)
@@ -149,10 +194,10 @@ async def update_published_lesson(
     lesson_id: int,
     lesson_update: PublishedLessonUpdate,
     volunteer_id: int = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualiza informações da aula publicada"""
-    db_lesson = db.query(PublishedLesson).filter(PublishedLesson.id == lesson_id).first()
+    db_lesson = await db.get(PublishedLesson, lesson_id)
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
@@ -164,8 +209,9 @@ async def update_published_lesson(
     for field, value in update_data.items():
         setattr(db_lesson, field, value)
     
-    db.commit()
-    db.refresh(db_lesson)
+    await db.run_sync(reindex, "published_lesson", [lesson_id])
+    await db.commit()
+    await db.refresh(db_lesson)
     
     return db_lesson
 
@@ -174,10 +220,10 @@ async def update_published_lesson(
 async def delete_published_lesson(
     lesson_id: int,
     volunteer_id: int = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Deleta uma aula publicada"""
-    db_lesson = db.query(PublishedLesson).filter(PublishedLesson.id == lesson_id).first()
+    db_lesson = await db.get(PublishedLesson, lesson_id)
     if not db_lesson:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
@@ -195,21 +241,32 @@ async def delete_published_lesson(
         except Exception as e:
             print(f"Erro ao deletar arquivo: {str(e)}")
     
-    db.delete(db_lesson)
-    db.commit()
+    await db.execute(delete_likes("published_lesson", [lesson_id]))
+    await db.delete(db_lesson)
+    await db.run_sync(reindex, "published_lesson", [lesson_id])
+    await db.commit()
     
     return None
 
 
 @router.post("/{lesson_id}/like", status_code=status.HTTP_200_OK)
-def like_lesson(lesson_id: int, db: Session = Depends(get_db)):
-    """Adiciona um like à aula"""
-    db_lesson = db.query(PublishedLesson).filter(PublishedLesson.id == lesson_id).first()
-    if not db_lesson:
+def like_lesson(lesson_id: int, user_id: int, db: Session = Depends(get_db)):
+    """Adiciona um like à aula (um por usuário)"""
+    if not db.query(User.id).filter(User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    
+    likes_count = add_like(db, "published_lesson", lesson_id, user_id)
+    if likes_count is None:
         raise HTTPException(status_code=404, detail="Aula não encontrada")
     
-    db_lesson.likes_count += 1
-    db.commit()
-    db.refresh(db_lesson)
+    return {"likes_count": likes_count, "liked_by_me": True}
+
+
+@router.delete("/{lesson_id}/like", status_code=status.HTTP_200_OK)
+def unlike_lesson(lesson_id: int, user_id: int, db: Session = Depends(get_db)):
+    """Remove o like do usuário na aula"""
+    likes_count = remove_like(db, "published_lesson", lesson_id, user_id)
+    if likes_count is None:
+        raise HTTPException(status_code=404, detail="Aula não encontrada")
     
-    return {"likes_count": db_lesson.likes_count}
+    return {"likes_count": likes_count, "liked_by_me": False}
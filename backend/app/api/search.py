@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_read_db
+from app.forum_search import match_expression, snippets, supports_fts
+from app.models.search import SearchDocument
+from app.pagination import paginate
+from app.schemas.search import SearchHit
+from app.search import FTS_TABLE, document_hits, parse_types
+
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=List[SearchHit])
+def search(
+    q: str,
+    response: Response,
+    types: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Busca em notícias, aulas publicadas, disciplinas, parceiros e voluntários.
+    types filtra os tipos (types=news,partner); os resultados vêm por relevância.
+    """
+    query = db.query(SearchDocument)
+    entity_types = parse_types(types)
+    if entity_types:
+        query = query.filter(SearchDocument.entity_type.in_(entity_types))
+    
+    if not supports_fts(db.get_bind()):
+        # Sem FTS5: ILIKE no título e no corpo, mais recentes primeiro
+        query = query.filter(SearchDocument.title.ilike(f"%{q}%") | SearchDocument.body.ilike(f"%{q}%"))
+        documents = paginate(query, response, [SearchDocument.id], cursor=cursor, skip=skip, limit=limit)
+        return [
+            SearchHit(entity_type=document.entity_type, entity_id=document.entity_id, title=document.title)
+            for document in documents
+        ]
+    
+    match = match_expression(q)
+    if match is None:
+        return []
+    
+    hits = document_hits(match)
+    query = query.add_columns(hits.c.rank).join(hits, hits.c.doc_id == SearchDocument.id)
+    results = paginate(
+        query, response, [hits.c.rank, SearchDocument.id],
+        cursor=cursor, skip=skip, limit=limit, descending=False,
+        entity=lambda row: SimpleNamespace(rank=row.rank, id=row[0].id)
+    )
+    
+    # Trechos destacados só dos documentos da página (HTML escapado, termos entre <mark>)
+    found = snippets(db, match, [document.id for document, _ in results], FTS_TABLE)
+    
+    return [
+        SearchHit(
+            entity_type=document.entity_type,
+            entity_id=document.entity_id,
+            title=document.title,
+            snippet=found.get(document.id),
+            score=-rank
+        )
+        for document, rank in results
+    ]
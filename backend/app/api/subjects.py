@@ -1,9 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from app.database import get_db, get_read_db, get_async_db
+from app.bulk import bulk_response, in_insert_order, insert_returning, reject, should_insert, validate_items
+from app.lookup import lookup_by_ids
+from app.models.published_lesson import PublishedLesson
 from app.models.subject import Subject
+from app.models.volunteer import volunteer_subjects
+from app.schemas.bulk import BulkCreateRequest, BulkCreateResponse
+from app.schemas.lookup import LookupResponse
 from app.schemas.profiles import SubjectCreate, SubjectUpdate, SubjectResponse
+from app.search import reindex
+from app.websocket.channels import SUBJECTS, subject_channel
 from app.websocket.manager import manager
 
 
@@ -15,7 +25,7 @@ def get_subjects(
     skip: int = 0,
     limit: int = 100,
     category: str = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Retorna todas as disciplinas"""
     query = db.query(Subject)
@@ -25,6 +35,12 @@ def get_subjects(
     return subjects
 
 
+@router.get("/lookup", response_model=LookupResponse[SubjectResponse])
+def lookup_subjects(ids: str, db: Session = Depends(get_read_db)):
+    """Retorna várias disciplinas por id (ids=1,2,3), na ordem pedida"""
+    return lookup_by_ids(db.query(Subject), Subject, ids)
+
+
 @router.get("/{subject_id}", response_model=SubjectResponse)
 def get_subject(subject_id: int, db: Session = Depends(get_db)):
     """Retorna uma disciplina específica"""
@@ -35,19 +51,22 @@ def get_subject(subject_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=SubjectResponse, status_code=status.HTTP_201_CREATED)
-async def create_subject(subject: SubjectCreate, db: Session = Depends(get_db)):
+async def create_subject(subject: SubjectCreate, db: AsyncSession = Depends(get_async_db)):
     """Cria uma nova disciplina"""
     # Verificar se já existe
-    existing = db.query(Subject).filter(Subject.name == subject.name).first()
+    result = await db.execute(select(Subject).where(Subject.name == subject.name))
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Disciplina já existe")
     
     db_subject = Subject(**subject.model_dump())
     db.add(db_subject)
-    db.commit()
-    db.refresh(db_subject)
+    await db.flush()
+    await db.run_sync(reindex, "subject", [db_subject.id])
+    await db.commit()
+    await db.refresh(db_subject)
     
-    await manager.broadcast({
+    await manager.publish([SUBJECTS, subject_channel(db_subject.id)], {
         "type": "subject_created",
         "data": SubjectResponse.model_validate(db_subject).model_dump(mode='json')
     })
@@ -55,14 +74,46 @@ async def create_subject(subject: SubjectCreate, db: Session = Depends(get_db)):
     return db_subject
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_subjects_bulk(request: BulkCreateRequest, db: AsyncSession = Depends(get_async_db)):
+    """Cria várias disciplinas em uma única transação"""
+    valid, failures = validate_items(request, SubjectCreate)
+    
+    # Nomes já cadastrados ou repetidos no próprio lote (uma consulta para todos)
+    names = {item.name for item in valid.values()}
+    result = await db.execute(select(Subject.name).where(Subject.name.in_(names)))
+    taken = set(result.scalars())
+    for index, item in list(valid.items()):
+        if item.name in taken:
+            reject(valid, failures, index, "Disciplina já existe")
+        taken.add(item.name)
+    
+    created = {}
+    if should_insert(request, valid, failures):
+        indexes = list(valid)
+        result = await db.execute(insert_returning(Subject), [valid[index].model_dump() for index in indexes])
+        items = [SubjectResponse.model_validate(row) for row in in_insert_order(result.all())]
+        await db.run_sync(reindex, "subject", [item.id for item in items])
+        await db.commit()
+        created = {index: item.id for index, item in zip(indexes, items)}
+        
+        # Um único evento para o lote
+        await manager.publish([SUBJECTS], {
+            "type": "subject_bulk_created",
+            "data": [item.model_dump(mode='json') for item in items]
+        })
+    
+    return bulk_response(len(request.items), created, failures)
+
+
 @router.put("/{subject_id}", response_model=SubjectResponse)
 async def update_subject(
     subject_id: int,
     subject: SubjectUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Atualiza uma disciplina"""
-    db_subject = db.query(Subject).filter(Subject.id == subject_id).first()
+    db_subject = await db.get(Subject, subject_id)
     if not db_subject:
         raise HTTPException(status_code=404, detail="Disciplina não encontrada")
     
@@ -70,10 +121,11 @@ async def update_subject(
     for field, value in update_data.items():
         setattr(db_subject, field, value)
     
-    db.commit()
-    db.refresh(db_subject)
+    await db.run_sync(reindex_subject, subject_id)
+    await db.commit()
+    await db.refresh(db_subject)
     
-    await manager.broadcast({
+    await manager.publish([SUBJECTS, subject_channel(db_subject.id)], {
         "type": "subject_updated",
         "data": SubjectResponse.model_validate(db_subject).model_dump(mode='json')
     })
@@ -82,18 +134,41 @@ async def update_subject(
 
 
 @router.delete("/{subject_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_subject(subject_id: int, db: Session = Depends(get_db)):
+async def delete_subject(subject_id: int, db: AsyncSession = Depends(get_async_db)):
     """Deleta uma disciplina"""
-    db_subject = db.query(Subject).filter(Subject.id == subject_id).first()
+    # Carregar as associações antes, pois o delete também remove as linhas
+    # das tabelas volunteer_subjects e learner_interests
+    db_subject = await db.get(
+        Subject,
+        subject_id,
+        options=[selectinload(Subject.volunteers), selectinload(Subject.learners)]
+    )
     if not db_subject:
         raise HTTPException(status_code=404, detail="Disciplina não encontrada")
+    volunteer_ids = [volunteer.id for volunteer in db_subject.volunteers]
     
-    db.delete(db_subject)
-    db.commit()
+    await db.delete(db_subject)
+    await db.run_sync(reindex_subject, subject_id, volunteer_ids)
+    await db.commit()
     
-    await manager.broadcast({
+    await manager.publish([SUBJECTS, subject_channel(subject_id)], {
         "type": "subject_deleted",
         "data": {"id": subject_id}
     })
     
     return None
+
+
+def reindex_subject(db: Session, subject_id: int, volunteer_ids: Optional[List[int]] = None):
+    """
+    Atualiza no índice de busca a disciplina e os itens que levam o nome dela
+    (voluntários e aulas publicadas). Na exclusão, os voluntários precisam ser
+    informados, pois as associações já foram removidas.
+    """
+    if volunteer_ids is None:
+        volunteer_ids = select(volunteer_subjects.c.volunteer_id).where(
+            volunteer_subjects.c.subject_id == subject_id
+        )
+    reindex(db, "subject", [subject_id])
+    reindex(db, "volunteer", volunteer_ids)
+    reindex(db, "published_lesson", select(PublishedLesson.id).where(PublishedLesson.subject_id == subject_id))
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import secrets
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.lookup import lookup_by_ids
 from app.models.user import User
+from app.models.volunteer import Volunteer
+from app.pagination import paginate
+from app.schemas.lookup import LookupResponse
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserLogin, Token
+from app.search import reindex
 
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -73,10 +78,12 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[UserResponse])
 def list_users(
+    response: Response,
     role: str = None,
     status: str = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Listar todos os usuários"""
@@ -87,8 +94,16 @@ def list_users(
     if status:
         query = query.filter(User.status == status)
     
-    users = query.offset(skip).limit(limit).all()
-    return users
+    return paginate(
+        query, response, [User.id],
+        cursor=cursor, skip=skip, limit=limit, descending=False
+    )
+
+
+@router.get("/lookup", response_model=LookupResponse[UserResponse])
+def lookup_users(ids: str, db: Session = Depends(get_read_db)):
+    """Retorna vários usuários por id (ids=1,2,3), na ordem pedida"""
+    return lookup_by_ids(db.query(User), User, ids)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -129,6 +144,8 @@ def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
     for field, value in update_data.items():
         setattr(db_user, field, value)
     
+    # Nome, cidade e bio fazem parte do perfil de voluntário na busca
+    reindex(db, "volunteer", db.query(Volunteer.id).filter(Volunteer.user_id == user_id).scalar_subquery())
     db.commit()
     db.refresh(db_user)
     return db_user
@@ -142,5 +159,6 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
     db.delete(db_user)
+    reindex(db, "volunteer", db.query(Volunteer.id).filter(Volunteer.user_id == user_id).scalar_subquery())
     db.commit()
     return None
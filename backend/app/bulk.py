@@ -0,0 +1,70 @@
+"""
+Apoio às rotas de criação em lote (POST /<recurso>/bulk).
+
+Os itens são validados um a um; os válidos são inseridos de uma vez, com um
+único INSERT executemany com RETURNING e um commit, e o resultado informa,
+para cada posição da lista, o id criado ou os erros.
+"""
+from typing import Dict, List, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from app.schemas.bulk import BulkCreateRequest, BulkCreateResponse, BulkItemResult
+
+
+def validate_items(
+    request: BulkCreateRequest, schema: Type[BaseModel]
+) -> Tuple[Dict[int, BaseModel], Dict[int, BulkItemResult]]:
+    """Valida cada item; retorna os válidos e os resultados de erro, por posição"""
+    valid: Dict[int, BaseModel] = {}
+    failures: Dict[int, BulkItemResult] = {}
+    for index, item in enumerate(request.items):
+        try:
+            valid[index] = schema.model_validate(item)
+        except ValidationError as e:
+            failures[index] = BulkItemResult(index=index, success=False, errors=[
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ])
+    return valid, failures
+
+
+def reject(valid: Dict[int, BaseModel], failures: Dict[int, BulkItemResult], index: int, message: str):
+    """Marca como falha um item que passou na validação do schema"""
+    valid.pop(index, None)
+    failures[index] = BulkItemResult(index=index, success=False, errors=[message])
+
+
+def should_insert(request: BulkCreateRequest, valid: Dict[int, BaseModel], failures: Dict[int, BulkItemResult]) -> bool:
+    """Se há algo a inserir, respeitando all_or_nothing"""
+    return bool(valid) and not (request.all_or_nothing and failures)
+
+
+def insert_returning(model):
+    """INSERT da tabela do modelo que retorna as linhas criadas"""
+    # Sem sort_by_parameter_order: no SQLite ele faz um INSERT por linha
+    table = model.__table__
+    return insert(table).returning(*table.c)
+
+
+def in_insert_order(rows) -> list:
+    """
+    Linhas retornadas pelo INSERT na ordem dos parâmetros. O id autoincremento
+    cresce na ordem em que as linhas de um mesmo INSERT são gravadas, e o
+    RETURNING não garante essa ordem.
+    """
+    return sorted(rows, key=lambda row: row.id)
+
+
+def bulk_response(
+    total: int, created: Dict[int, int], failures: Dict[int, BulkItemResult]
+) -> BulkCreateResponse:
+    """Monta a resposta com um resultado por item enviado"""
+    results: List[BulkItemResult] = []
+    for index in range(total):
+        if index in created:
+            results.append(BulkItemResult(index=index, success=True, id=created[index]))
+        elif index in failures:
+            results.append(failures[index])
+        else:
+            # Item válido não criado porque outro item do lote falhou (all_or_nothing)
+            results.append(BulkItemResult(index=index, success=False, errors=["Lote não criado: há itens inválidos"]))
+    return BulkCreateResponse(created=len(created), failed=total - len(created), results=results)
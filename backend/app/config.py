@@ -1,10 +1,55 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./app.db"
+    # URL usada pela engine assíncrona; se vazia, é derivada de database_url
+    async_database_url: Optional[str] = None
+    # Réplica para rotas somente leitura; no SQLite, se vazia, é aberto um
+    # pool somente leitura sobre o mesmo arquivo
+    read_database_url: Optional[str] = None
+    
+    # SQLite (pragmas aplicados em cada nova conexão)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456  # bytes (256 MB)
+    sqlite_cache_size: int = -64000  # valores negativos são em KiB (64 MB)
+    sqlite_busy_timeout: int = 5000  # ms
+    sqlite_temp_store: str = "MEMORY"
+    
+    # Pool de conexões (por engine e por processo)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # segundos
+    db_pool_recycle: int = -1  # segundos; -1 desativa
+    db_pool_pre_ping: bool = False
+    
+    # Aplicar migrações pendentes ao iniciar a API. Com vários workers,
+    # prefira desativar e rodar "python migrate.py" no deploy.
+    auto_migrate: bool = True
+    
+    # Instrumentação SQL por requisição (Server-Timing, log de lentas e N+1)
+    sql_instrumentation: bool = True
+    slow_query_ms: float = 200.0
+    n_plus_one_threshold: int = 10  # repetições do mesmo formato por requisição
+    
+    # Buffer de visualizações (gravado em lote no banco)
+    view_flush_interval: float = 5.0  # segundos
+    view_flush_threshold: int = 1000  # visualizações acumuladas
+    
+    # Índice de curtidas em memória (reconstruído a partir da tabela likes)
+    like_index_rebuild_interval: float = 60.0  # segundos
+    
+    # Índice de solicitações abertas usado nas sugestões para voluntários
+    match_index_rebuild_interval: float = 60.0  # segundos
+    
+    # WebSocket: mensagens aguardando envio por conexão e tempo limite de cada
+    # envio; clientes que passam disso são desconectados
+    websocket_queue_size: int = 100
+    websocket_send_timeout: float = 5.0  # segundos
     
     # API Configuration
     api_host: str = "0.0.0.0"
@@ -0,0 +1,43 @@
+"""
+Atualização atômica de contadores (likes_count, replies_count).
+
+O incremento é feito pelo próprio banco (SET coluna = coluna + n), então
+curtidas simultâneas não se perdem como no padrão ler-alterar-gravar. Com
+suporte a RETURNING (SQLite 3.35+, PostgreSQL) o novo valor volta no mesmo
+comando; nos demais bancos é lido logo em seguida, na mesma transação.
+
+Contar uma curtida ou resposta não é editar o item: as colunas com onupdate
+(updated_at) recebem o próprio valor, e o UPDATE não as altera.
+"""
+from typing import Optional
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+
+def increment_counter(db: Session, column, row_id: int, delta: int = 1) -> Optional[int]:
+    """
+    Soma delta ao contador da linha (sem ficar negativo) e retorna o novo valor,
+    ou None se a linha não existe. O commit fica a cargo de quem chama.
+    """
+    model = column.class_
+    new_value = column + delta
+    if delta < 0:
+        new_value = case((new_value < 0, 0), else_=new_value)
+
+    values = {
+        table_column: table_column
+        for table_column in model.__table__.columns if table_column.onupdate is not None
+    }
+    values[column] = new_value
+    statement = (
+        update(model)
+        .where(model.id == row_id)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        return db.execute(statement.returning(column)).scalar_one_or_none()
+
+    if db.execute(statement).rowcount == 0:
+        return None
+    return db.execute(select(column).where(model.id == row_id)).scalar_one()
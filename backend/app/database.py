@@ -1,19 +1,173 @@
-from sqlalchemy import create_engine
+import logging
+from typing import AsyncIterator, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
+from app.db_pool import PoolStats, pool_options
+from app.instrumentation import instrument_engine
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
+# Drivers assíncronos usados para cada banco suportado
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+
+def get_async_database_url(database_url: str, override: Optional[str] = None) -> str:
+    """Converte a URL síncrona para o driver assíncrono equivalente"""
+    if override:
+        return override
+
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"Banco sem driver assíncrono configurado: {backend}")
+    return url.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+def is_sqlite_file_url(database_url: str) -> bool:
+    """Indica se a URL aponta para um arquivo SQLite (e não para memória)"""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+# Estatísticas dos pools, expostas em /health/pool
+pool_stats = {"sync": PoolStats(), "async": PoolStats(), "read": PoolStats()}
+
 # Criar engine do SQLAlchemy
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
+    **pool_options(settings.database_url, settings, pool_stats["sync"])
 )
 
+# Engine assíncrona para as rotas declaradas com async def
+async_database_url = get_async_database_url(settings.database_url, settings.async_database_url)
+async_engine = create_async_engine(
+    async_database_url,
+    **pool_options(async_database_url, settings, pool_stats["async"], is_async=True)
+)
+
+# Engine de leitura: usa a réplica configurada ou, no SQLite, um segundo pool
+# somente leitura sobre o mesmo arquivo WAL. Sem nenhum dos dois, as leituras
+# compartilham a engine principal.
+read_database_url = settings.read_database_url or settings.database_url
+if settings.read_database_url or is_sqlite_file_url(settings.database_url):
+    read_engine = create_engine(
+        read_database_url,
+        connect_args={"check_same_thread": False} if "sqlite" in read_database_url else {},
+        **pool_options(read_database_url, settings, pool_stats["read"])
+    )
+    pool_stats["read"].attach(read_engine)
+else:
+    read_engine = engine
+
+pool_stats["sync"].attach(engine)
+pool_stats["async"].attach(async_engine.sync_engine)
+
+
+def get_pool_status() -> Dict[str, Dict[str, object]]:
+    """Estado atual e contadores dos pools de conexão"""
+    status = {
+        "sync": pool_stats["sync"].snapshot(engine.pool),
+        "async": pool_stats["async"].snapshot(async_engine.sync_engine.pool),
+    }
+    if read_engine is not engine:
+        status["read"] = pool_stats["read"].snapshot(read_engine.pool)
+    return status
+
+
+def get_sqlite_pragmas() -> Dict[str, object]:
+    """Perfil de pragmas do SQLite definido nas configurações"""
+    # busy_timeout vem primeiro para que a troca de journal_mode espere locks
+    return {
+        "busy_timeout": settings.sqlite_busy_timeout,
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": settings.sqlite_temp_store,
+    }
+
+
+# Valores numéricos retornados pelo SQLite para pragmas enumerados
+SQLITE_PRAGMA_NAMES = {
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+}
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Aplica o perfil de pragmas em cada nova conexão SQLite"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _apply_sqlite_read_only(dbapi_connection, connection_record):
+    """Impede escritas pelas conexões do pool de leitura"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def log_sqlite_pragmas():
+    """Registra no log os pragmas efetivamente em uso pelo SQLite"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.connect() as connection:
+        for name, expected in get_sqlite_pragmas().items():
+            actual = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            actual = SQLITE_PRAGMA_NAMES.get(name, {}).get(actual, actual)
+            if str(actual).upper() == str(expected).upper():
+                logger.info("SQLite PRAGMA %s=%s", name, actual)
+            else:
+                logger.warning("SQLite PRAGMA %s=%s (configurado: %s)", name, actual, expected)
+
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+if read_engine is not engine and read_engine.dialect.name == "sqlite":
+    event.listen(read_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(read_engine, "connect", _apply_sqlite_read_only)
+
+if settings.sql_instrumentation:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+    if read_engine is not engine:
+        instrument_engine(read_engine)
+
 # Criar SessionLocal
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Sessões para as rotas somente leitura
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Sessões assíncronas não expiram os objetos no commit, pois o acesso
+# posterior a atributos expirados exigiria I/O fora de um await
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base para os modelos
 Base = declarative_base()
 
@@ -25,3 +179,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency para rotas somente leitura (réplica ou pool de leitura).
+# Fluxos que leem o que acabaram de escrever devem continuar usando get_db.
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency para obter a sessão assíncrona do banco de dados
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Dict, Type
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from app.config import Settings
+
+
+class PoolStats:
+    """Contadores de uso de um pool de conexões, alimentados pelos eventos do pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.opens = 0
+        self.open_total = 0.0
+        self.open_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        """Registra o tempo de um checkout que esperou uma conexão ser devolvida"""
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_open(self, seconds: float):
+        """Registra o tempo para abrir uma conexão nova (inclui os hooks de connect)"""
+        with self._lock:
+            self.opens += 1
+            self.open_total += seconds
+            self.open_max = max(self.open_max, seconds)
+
+    def _increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def attach(self, engine: Engine):
+        """Escuta os eventos do pool da engine"""
+        event.listen(engine, "connect", lambda *args: self._increment("connects"))
+        event.listen(engine, "checkout", lambda *args: self._increment("checkouts"))
+        event.listen(engine, "checkin", lambda *args: self._increment("checkins"))
+        event.listen(engine, "invalidate", lambda *args: self._increment("invalidations"))
+
+    def snapshot(self, pool: Pool) -> Dict[str, object]:
+        """Retorna o estado atual do pool junto com os contadores acumulados"""
+        with self._lock:
+            data = {
+                "pool_class": type(pool).__name__,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_count": self.waits,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / self.waits, 3) if self.waits else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "open_count": self.opens,
+                "open_total_ms": round(self.open_total * 1000, 3),
+                "open_avg_ms": round(self.open_total * 1000 / self.opens, 3) if self.opens else 0.0,
+                "open_max_ms": round(self.open_max * 1000, 3),
+            }
+
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return data
+
+
+def instrumented_pool_class(base: Type[QueuePool], stats: PoolStats) -> Type[QueuePool]:
+    """
+    Cria uma subclasse do pool que mede a espera por conexão e a abertura de
+    conexões novas, em contadores separados
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            # Só espera quem encontra todas as conexões (pool_size + max_overflow)
+            # em uso; os demais checkouts pegam uma livre ou abrem uma nova
+            if self._max_overflow < 0 or self.checkedout() < self.size() + self._max_overflow:
+                return super()._do_get()
+
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                stats.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            stats.record_wait(time.perf_counter() - start)
+            return connection
+
+        def _create_connection(self):
+            start = time.perf_counter()
+            connection = super()._create_connection()
+            stats.record_open(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = base.__name__
+    return InstrumentedPool
+
+
+def pool_options(database_url: str, settings: Settings, stats: PoolStats, is_async: bool = False) -> dict:
+    """Argumentos de pool para create_engine conforme as configurações"""
+    url = make_url(database_url)
+    # SQLite em memória usa um pool de conexão única, sem parâmetros de tamanho
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return {
+        "poolclass": instrumented_pool_class(base, stats),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
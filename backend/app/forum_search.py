@@ -0,0 +1,113 @@
+"""
+Busca textual do fórum com o índice FTS5 do SQLite.
+
+A tabela virtual forum_fts guarda título e conteúdo dos tópicos e o conteúdo
+das respostas, com o tokenizador unicode61 sem acentos (buscar "licao"
+encontra "lição"). O rowid identifica a origem: id * 2 para tópicos e
+id * 2 + 1 para respostas. Triggers em forum_topics e forum_replies (criados
+pela migração 0004_forum_search) mantêm o índice em dia, inclusive para
+escritas feitas fora da API.
+
+A busca devolve os tópicos ordenados por BM25 (a melhor entre o tópico e as
+suas respostas, com o título pesando mais) e um trecho destacado do texto
+encontrado. O trecho é gerado numa segunda consulta, só para os documentos da
+página, pois snippet() custa mais que o próprio ranking. O trecho é texto do
+usuário: sai com o HTML escapado, e só as marcações <mark> dos termos
+encontrados são tags de verdade. Em outros bancos a busca volta ao ILIKE em
+título e conteúdo.
+"""
+import html
+import re
+from typing import Dict, Iterable, Optional
+from sqlalchemy import Float, Integer, bindparam, text
+from sqlalchemy.orm import Session
+
+FTS_TABLE = "forum_fts"
+
+# Peso de cada coluna no BM25: título, conteúdo e topic_id (não indexado)
+BM25_WEIGHTS = (10.0, 1.0, 0.0)
+
+# Marcadores do trecho destacado e número de palavras do trecho. O snippet()
+# delimita os termos com caracteres que não aparecem em texto (não-caracteres
+# Unicode), trocados pelas tags depois de escapar o trecho
+SNIPPET_MARK = ("<mark>", "</mark>")
+SNIPPET_DELIMITERS = ("\ufdd0", "\ufdd1")
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 12
+
+# Palavras da busca (letras e dígitos em qualquer alfabeto)
+WORD = re.compile(r"\w+")
+
+
+def supports_fts(bind) -> bool:
+    """Indica se o banco (engine ou conexão) usa o índice FTS5"""
+    return bind.dialect.name == "sqlite"
+
+
+def match_expression(search: str) -> Optional[str]:
+    """
+    Converte o texto digitado numa expressão MATCH segura: cada palavra vira
+    um termo entre aspas (todas obrigatórias) e a última casa por prefixo,
+    para a busca funcionar enquanto o usuário digita.
+    Retorna None se o texto não tem nenhuma palavra.
+    """
+    words = WORD.findall(search)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def topic_hits(match: str):
+    """
+    Subconsulta com um resultado por tópico: topic_id, rank (BM25, menor é
+    melhor) e doc_id, o rowid do documento mais relevante (tópico ou resposta)
+    """
+    weights = ", ".join(f"{weight:g}" for weight in BM25_WEIGHTS)
+    # bm25() só pode ser avaliado na consulta do MATCH, então a CTE é
+    # materializada antes do agrupamento. min() com colunas soltas faz o
+    # SQLite devolver o rowid da mesma linha do melhor rank.
+    statement = text(f"""
+        WITH matches AS MATERIALIZED (
+            SELECT topic_id, bm25({FTS_TABLE}, {weights}) AS rank, rowid AS doc_id
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH :match
+        )
+        SELECT topic_id, min(rank) AS rank, doc_id
+        FROM matches
+        GROUP BY topic_id
+    """).bindparams(match=match)
+    return statement.columns(topic_id=Integer, rank=Float, doc_id=Integer).subquery("forum_hits")
+
+
+def snippets(db: Session, match: str, doc_ids: Iterable[int], table: str = FTS_TABLE) -> Dict[int, str]:
+    """Trecho destacado de cada documento (rowid) da tabela FTS5 encontrado pela busca"""
+    doc_ids = list(doc_ids)
+    if not doc_ids:
+        return {}
+
+    statement = text(f"""
+        SELECT rowid, snippet({table}, -1, :mark_open, :mark_close, :ellipsis, :tokens)
+        FROM {table}
+        WHERE {table} MATCH :match AND rowid IN :doc_ids
+    """).bindparams(
+        bindparam("doc_ids", expanding=True),
+        match=match,
+        doc_ids=doc_ids,
+        mark_open=SNIPPET_DELIMITERS[0],
+        mark_close=SNIPPET_DELIMITERS[1],
+        ellipsis=SNIPPET_ELLIPSIS,
+        tokens=SNIPPET_TOKENS,
+    )
+    return {doc_id: highlight(snippet) for doc_id, snippet in db.execute(statement).all()}
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """Escapa o HTML do trecho e troca os delimitadores dos termos por <mark>"""
+    if snippet is None:
+        return None
+    snippet = html.escape(snippet)
+    for delimiter, tag in zip(SNIPPET_DELIMITERS, SNIPPET_MARK):
+        snippet = snippet.replace(delimiter, tag)
+    return snippet
@@ -0,0 +1,244 @@
+"""
+Apoio às buscas por raio (parceiros e aulas próximas).
+
+As coordenadas ficam em colunas numéricas e, no SQLite, num índice espacial
+R*Tree (módulo rtree) mantido por triggers. A busca seleciona pelo índice os
+pontos dentro do retângulo que envolve o círculo e calcula a distância real
+(haversine) só desses candidatos, então o custo depende de quantos itens estão
+na região, e não do total da tabela. Quando só os N mais próximos interessam,
+nearest() começa com um raio pequeno e o amplia até achar N itens, para que
+regiões densas não carreguem milhares de candidatos. Nos demais bancos o
+retângulo é aplicado direto nas colunas de coordenadas.
+
+O retângulo não atravessa a linha de data (longitude ±180).
+"""
+import math
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple, TypeVar
+from sqlalchemy import String, column, inspect, select, table, text
+
+T = TypeVar("T")
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Maior raio aceito pelas rotas de busca por proximidade
+MAX_RADIUS_KM = 500.0
+
+# nearest(): raio da primeira busca e maior fator de ampliação entre buscas
+INITIAL_RADIUS_KM = 1.0
+RADIUS_GROWTH = 4.0
+
+
+class BoundingBox(NamedTuple):
+    min_lat: float
+    max_lat: float
+    min_lng: float
+    max_lng: float
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> BoundingBox:
+    """Retângulo (em graus) que contém o círculo de raio radius_km em torno do ponto"""
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat = max(lat - delta_lat, -90.0)
+    max_lat = min(lat + delta_lat, 90.0)
+
+    # A largura de um grau de longitude diminui em direção aos polos; usar a
+    # latitude do retângulo mais próxima do polo para não cortar o círculo
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-6:
+        return BoundingBox(min_lat, max_lat, -180.0, 180.0)
+    delta_lng = delta_lat / cos_lat
+    return BoundingBox(min_lat, max_lat, max(lng - delta_lng, -180.0), min(lng + delta_lng, 180.0))
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Distância em km entre dois pontos na superfície da Terra"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def within_radius(
+    items: Iterable[T], lat: float, lng: float, radius_km: float,
+    position: Callable[[T], Tuple[float, float]],
+) -> List[Tuple[T, float]]:
+    """Itens a até radius_km do ponto, com a distância, do mais próximo ao mais distante"""
+    # Mesma conta de haversine_km, com os termos do ponto de origem calculados
+    # uma vez; itens fora do raio são descartados antes do asin
+    phi1 = math.radians(lat)
+    cos_phi1 = math.cos(phi1)
+    max_a = math.sin(min(radius_km / (2 * EARTH_RADIUS_KM), math.pi / 2)) ** 2
+    found = []
+    for item in items:
+        item_lat, item_lng = position(item)
+        phi2 = math.radians(item_lat)
+        a = math.sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * math.cos(phi2) * math.sin(math.radians(item_lng - lng) / 2) ** 2
+        if a <= max_a:
+            found.append((item, 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))))
+    found.sort(key=lambda pair: pair[1])
+    return found
+
+
+def nearest(
+    candidates: Callable[[BoundingBox], Iterable[T]], lat: float, lng: float, radius_km: float,
+    limit: int, position: Callable[[T], Tuple[float, float]], keep_ties: bool = False,
+) -> List[Tuple[T, float]]:
+    """
+    Os limit itens mais próximos a até radius_km do ponto. candidates(box)
+    retorna os itens dentro de um retângulo; a busca começa num raio pequeno e
+    é ampliada enquanto houver menos de limit itens dentro do círculo (os que
+    estão dentro de um círculo menor são sempre os mais próximos).
+    Com keep_ties, inclui também os itens empatados com o último, para o
+    chamador poder desempatar por outro critério antes de cortar a lista.
+    """
+    search_radius = INITIAL_RADIUS_KM
+    while True:
+        search_radius = min(search_radius, radius_km)
+        found = within_radius(candidates(bounding_box(lat, lng, search_radius)), lat, lng, search_radius, position)
+        if len(found) >= limit or search_radius >= radius_km:
+            end = limit
+            if keep_ties and 0 < limit < len(found):
+                while end < len(found) and found[end][1] == found[limit - 1][1]:
+                    end += 1
+            return found[:end]
+        # Estima pela densidade encontrada o raio que teria limit itens (a
+        # área cresce com o quadrado do raio), com folga de 25%
+        growth = RADIUS_GROWTH
+        if found:
+            growth = min(growth, 1.25 * math.sqrt(limit / len(found)))
+        search_radius *= growth
+
+
+# ==================== ÍNDICE ESPACIAL (SQLite) ====================
+
+def rtree_name(table_name: str) -> str:
+    return f"{table_name}_rtree"
+
+
+def rtree_table(table_name: str):
+    """Tabela rtree para uso em consultas (um ponto por linha: min = max)"""
+    return table(
+        rtree_name(table_name),
+        column("id"), column("min_lat"), column("max_lat"), column("min_lng"), column("max_lng"),
+    )
+
+
+def box_filter(box: BoundingBox, min_lat, max_lat, min_lng, max_lng) -> list:
+    """Condições para as linhas cujo retângulo cruza o retângulo da busca"""
+    return [max_lat >= box.min_lat, min_lat <= box.max_lat, max_lng >= box.min_lng, min_lng <= box.max_lng]
+
+
+def filter_box(query, model, latitude, longitude, box: BoundingBox, condition=None):
+    """
+    Restringe a consulta aos itens dentro do retângulo. No SQLite usa o rtree,
+    que só guarda as linhas que atendem condition (a mesma dos triggers); nos
+    demais bancos, condition e o retângulo são aplicados nas colunas.
+    """
+    if query.session.get_bind().dialect.name == "sqlite":
+        # Sem filtrar por colunas indexadas da tabela, o SQLite parte do rtree
+        # e busca as linhas pela chave primária
+        index = rtree_table(model.__tablename__)
+        return query.filter(model.id.in_(
+            select(index.c.id).where(*box_filter(box, index.c.min_lat, index.c.max_lat, index.c.min_lng, index.c.max_lng))
+        ))
+    if condition is not None:
+        query = query.filter(condition)
+    return query.filter(*box_filter(box, latitude, latitude, longitude, longitude))
+
+
+def rtree_statements(
+    table_name: str, latitude: str, longitude: str,
+    watched_columns: Iterable[str], condition: Optional[str] = None,
+) -> List[str]:
+    """
+    Comandos que criam o índice rtree da tabela, os triggers que o mantêm e a
+    carga inicial. Só entram linhas com coordenadas e que atendam condition,
+    escrita com {row} no lugar da linha (ex.: "{row}.status = 'REQUESTED'").
+    Os triggers de atualização disparam quando muda alguma de watched_columns.
+    """
+    index = rtree_name(table_name)
+
+    def accepts(row: str) -> str:
+        conditions = [f"{row}.{latitude} IS NOT NULL", f"{row}.{longitude} IS NOT NULL"]
+        if condition:
+            conditions.append(condition.format(row=row))
+        return " AND ".join(conditions)
+
+    insert_new = (
+        f"INSERT INTO {index} (id, min_lat, max_lat, min_lng, max_lng) "
+        f"SELECT new.id, new.{latitude}, new.{latitude}, new.{longitude}, new.{longitude} WHERE {accepts('new')};"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING rtree(id, min_lat, max_lat, min_lng, max_lng)",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table_name} BEGIN
+            {insert_new}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {", ".join(watched_columns)} ON {table_name} BEGIN
+            DELETE FROM {index} WHERE id = old.id;
+            {insert_new}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table_name} BEGIN
+            DELETE FROM {index} WHERE id = old.id;
+        END
+        """,
+        f"DELETE FROM {index}",
+        f"""
+        INSERT INTO {index} (id, min_lat, max_lat, min_lng, max_lng)
+        SELECT id, {latitude}, {latitude}, {longitude}, {longitude} FROM {table_name}
+        WHERE {accepts(table_name)}
+        """,
+    ]
+
+
+# ==================== CONVERSÃO DE COORDENADAS ====================
+
+def parse_coordinate(value, limit: float) -> Optional[float]:
+    """Converte uma coordenada gravada como texto ("-8.05" ou "-8,05"); None se inválida"""
+    if value is None:
+        return None
+    try:
+        number = float(str(value).strip().replace(",", "."))
+    except ValueError:
+        return None
+    if math.isnan(number) or abs(number) > limit:
+        return None
+    return number
+
+
+def convert_coordinates(connection, table_name: str, latitude: str, longitude: str):
+    """
+    Troca as colunas de coordenadas de texto por colunas numéricas, mantendo os
+    valores válidos (os demais ficam nulos). Não faz nada se já são numéricas.
+    Usa ADD/DROP/RENAME COLUMN (SQLite 3.35+, PostgreSQL, MySQL 8).
+    """
+    columns = {info["name"]: info["type"] for info in inspect(connection).get_columns(table_name)}
+    if not isinstance(columns[latitude], String):
+        return
+
+    for name in (latitude, longitude):
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name}_numeric FLOAT"))
+
+    rows = connection.execute(text(
+        f"SELECT id, {latitude}, {longitude} FROM {table_name} "
+        f"WHERE {latitude} IS NOT NULL OR {longitude} IS NOT NULL"
+    )).all()
+    values = []
+    for row_id, lat, lng in rows:
+        lat, lng = parse_coordinate(lat, 90.0), parse_coordinate(lng, 180.0)
+        if lat is not None and lng is not None:
+            values.append({"row_id": row_id, "lat": lat, "lng": lng})
+    if values:
+        connection.execute(text(
+            f"UPDATE {table_name} SET {latitude}_numeric = :lat, {longitude}_numeric = :lng WHERE id = :row_id"
+        ), values)
+
+    for name in (latitude, longitude):
+        connection.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {name}"))
+        connection.execute(text(f"ALTER TABLE {table_name} RENAME COLUMN {name}_numeric TO {name}"))
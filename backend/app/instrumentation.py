@@ -0,0 +1,126 @@
+"""
+Instrumentação das consultas SQL por requisição.
+
+Os eventos before/after_cursor_execute das engines medem cada consulta e
+acumulam os números na requisição em andamento (via ContextVar). O middleware
+HTTP publica o resultado no cabeçalho Server-Timing, registra consultas lentas
+no logger "app.sql.slow" (uma linha JSON por consulta) e avisa quando o mesmo
+formato de consulta se repete muitas vezes na mesma requisição (N+1).
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+# Quantas consultas mais lentas guardar por requisição
+SLOWEST_KEPT = 3
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|:\w+|\$\d+)\s*,?)+\)")
+
+
+def statement_shape(statement: str) -> str:
+    """Normaliza a consulta para agrupar execuções do mesmo formato"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    # Listas IN expandidas com tamanhos diferentes contam como o mesmo formato
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+class RequestQueryStats:
+    """Consultas executadas durante uma requisição"""
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.total = 0.0
+        self.slowest: List[Tuple[float, str]] = []
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float):
+        with self._lock:
+            self.count += 1
+            self.total += duration
+            self.shapes[statement_shape(statement)] += 1
+            self.slowest.append((duration, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        """Formatos executados mais de threshold vezes"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        """Valor do cabeçalho Server-Timing"""
+        parts = [f'db;dur={self.total * 1000:.2f};desc="{self.count} queries"']
+        if self.slowest:
+            parts.append(f"db-slowest;dur={self.slowest[0][0] * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def start_request(path: str) -> RequestQueryStats:
+    """Começa a acumular as consultas da requisição atual"""
+    stats = RequestQueryStats(path)
+    _current_stats.set(stats)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= settings.slow_query_ms:
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(duration * 1000, 3),
+            "path": stats.path if stats is not None else None,
+            "statement": statement_shape(statement),
+            "executemany": executemany,
+        }, ensure_ascii=False))
+
+
+def instrument_engine(engine: Engine):
+    """Registra os eventos de medição na engine (síncrona ou sync_engine da assíncrona)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report_request(stats: RequestQueryStats):
+    """Avisa sobre formatos de consulta repetidos (provável N+1)"""
+    for shape, count in stats.repeated_shapes(settings.n_plus_one_threshold):
+        logger.warning(json.dumps({
+            "event": "repeated_query",
+            "path": stats.path,
+            "count": count,
+            "statement": shape,
+        }, ensure_ascii=False))
+
+
+async def sql_instrumentation_middleware(request, call_next):
+    """Middleware HTTP que mede as consultas SQL de cada requisição"""
+    stats = start_request(request.url.path)
+    response = await call_next(request)
+    response.headers["Server-Timing"] = stats.server_timing()
+    report_request(stats)
+    return response
@@ -0,0 +1,245 @@
+"""
+Curtidas por usuário e índice de pertinência em memória.
+
+Cada curtida é uma linha em likes (user_id, target_type, target_id), única por
+usuário e item, e o likes_count do item é atualizado na mesma transação.
+
+Para responder "o usuário curtiu este item?" numa página inteira, cada tipo de
+item tem um filtro de Bloom com os pares (usuário, item) carregado da tabela.
+Itens que o filtro descarta não custam consulta; os possíveis positivos são
+confirmados em uma única consulta IN por página. O filtro é reconstruído a cada
+LIKE_INDEX_REBUILD_INTERVAL segundos para incluir curtidas de outros workers e
+descartar as removidas; as curtidas registradas enquanto a tabela é lida são
+reaplicadas no filtro novo antes da troca.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+from app.counters import increment_counter
+from app.database import read_engine
+from app.models.communication import ForumReply
+from app.models.like import Like
+from app.models.published_lesson import PublishedLesson
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Tipos de item que podem ser curtidos e a coluna de contador de cada um
+LIKE_COUNTERS = {
+    "forum_reply": ForumReply.likes_count,
+    "published_lesson": PublishedLesson.likes_count,
+}
+
+# Taxa de falsos positivos do filtro de Bloom
+FALSE_POSITIVE_RATE = 0.01
+MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre pares (usuário, item)"""
+
+    def __init__(self, capacity: int, false_positive_rate: float = FALSE_POSITIVE_RATE):
+        capacity = max(capacity, MIN_CAPACITY)
+        self.size = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, user_id: int, target_id: int) -> Iterable[int]:
+        digest = hashlib.blake2b(f"{user_id}:{target_id}".encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, user_id: int, target_id: int):
+        for position in self._positions(user_id, target_id):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, user_id: int, target_id: int) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(user_id, target_id)
+        )
+
+
+class LikeIndex:
+    """Filtros de Bloom por tipo de item, carregados da tabela likes"""
+
+    def __init__(self, rebuild_interval: float):
+        self.rebuild_interval = rebuild_interval
+        self._filters: Dict[str, BloomFilter] = {}
+        # Curtidas (tipo, usuário, item) registradas durante cada carga em andamento
+        self._change_logs: List[List[Tuple[str, int, int]]] = []
+        self._lock = threading.Lock()
+
+    def _build(self, connection, target_type: str) -> BloomFilter:
+        rows = connection.execute(
+            select(Like.user_id, Like.target_id).where(Like.target_type == target_type)
+        ).all()
+        bloom = BloomFilter(len(rows) * 2)
+        for user_id, target_id in rows:
+            bloom.add(user_id, target_id)
+        return bloom
+
+    def _start_load(self) -> List[Tuple[str, int, int]]:
+        log: List[Tuple[str, int, int]] = []
+        with self._lock:
+            self._change_logs.append(log)
+        return log
+
+    def _end_load(self, log: List[Tuple[str, int, int]]):
+        """Deixa de registrar curtidas para a carga; chamar com o lock"""
+        # Por identidade: registros de cargas diferentes podem ser iguais
+        self._change_logs = [other for other in self._change_logs if other is not log]
+
+    def _replay(self, log: List[Tuple[str, int, int]], filters: Dict[str, BloomFilter]):
+        """Encerra a carga e aplica nos filtros novos as curtidas feitas durante ela; chamar com o lock"""
+        self._end_load(log)
+        for target_type, user_id, target_id in log:
+            bloom = filters.get(target_type)
+            if bloom is not None:
+                bloom.add(user_id, target_id)
+
+    def rebuild(self):
+        """Recarrega os filtros de todos os tipos a partir da tabela"""
+        log = self._start_load()
+        try:
+            with read_engine.connect() as connection:
+                filters = {target_type: self._build(connection, target_type) for target_type in LIKE_COUNTERS}
+        except Exception:
+            with self._lock:
+                self._end_load(log)
+            raise
+        with self._lock:
+            self._replay(log, filters)
+            self._filters = filters
+
+    def _filter(self, db: Session, target_type: str) -> BloomFilter:
+        bloom = self._filters.get(target_type)
+        if bloom is not None:
+            return bloom
+
+        # Primeira consulta do processo: carregar a partir da tabela, fora do
+        # lock para não travar as demais curtidas e leituras
+        log = self._start_load()
+        try:
+            bloom = self._build(db.connection(), target_type)
+        except Exception:
+            with self._lock:
+                self._end_load(log)
+            raise
+        with self._lock:
+            self._replay(log, {target_type: bloom})
+            # Outra requisição (ou a reconstrução) pode ter carregado antes
+            return self._filters.setdefault(target_type, bloom)
+
+    def add(self, target_type: str, user_id: int, target_id: int):
+        """Registra uma curtida feita neste processo"""
+        with self._lock:
+            bloom = self._filters.get(target_type)
+            if bloom is not None:
+                bloom.add(user_id, target_id)
+            for log in self._change_logs:
+                log.append((target_type, user_id, target_id))
+
+    def liked_targets(self, db: Session, target_type: str, user_id: Optional[int], target_ids: Iterable[int]) -> Set[int]:
+        """Itens da lista curtidos pelo usuário (no máximo uma consulta)"""
+        if user_id is None:
+            return set()
+
+        bloom = self._filter(db, target_type)
+        candidates = [target_id for target_id in target_ids if bloom.might_contain(user_id, target_id)]
+        if not candidates:
+            return set()
+
+        return set(db.execute(
+            select(Like.target_id).where(
+                Like.user_id == user_id,
+                Like.target_type == target_type,
+                Like.target_id.in_(candidates),
+            )
+        ).scalars())
+
+    async def run_periodic(self):
+        """Tarefa de fundo que reconstrói os filtros a cada rebuild_interval segundos"""
+        while True:
+            await asyncio.sleep(self.rebuild_interval)
+            start = time.perf_counter()
+            try:
+                await run_in_threadpool(self.rebuild)
+            except Exception:
+                logger.exception("Falha ao reconstruir o índice de curtidas")
+                continue
+            logger.debug("Índice de curtidas reconstruído em %.1f ms", (time.perf_counter() - start) * 1000)
+
+
+# Instância global do índice
+like_index = LikeIndex(settings.like_index_rebuild_interval)
+
+
+def add_like(db: Session, target_type: str, target_id: int, user_id: int) -> Optional[int]:
+    """
+    Registra a curtida e incrementa o contador do item.
+    Retorna o likes_count atual (sem alterar se o usuário já tinha curtido)
+    ou None se o item não existe.
+    """
+    counter = LIKE_COUNTERS[target_type]
+    db.add(Like(user_id=user_id, target_type=target_type, target_id=target_id))
+    try:
+        db.flush()
+    except IntegrityError:
+        # Já curtido: devolver o valor atual sem incrementar
+        db.rollback()
+        return current_count(db, target_type, target_id)
+
+    likes_count = increment_counter(db, counter, target_id)
+    if likes_count is None:
+        db.rollback()
+        return None
+
+    db.commit()
+    like_index.add(target_type, user_id, target_id)
+    return likes_count
+
+
+def remove_like(db: Session, target_type: str, target_id: int, user_id: int) -> Optional[int]:
+    """
+    Remove a curtida e decrementa o contador do item.
+    Retorna o likes_count atual ou None se o item não existe.
+    """
+    counter = LIKE_COUNTERS[target_type]
+    removed = db.execute(
+        delete(Like).where(
+            Like.user_id == user_id,
+            Like.target_type == target_type,
+            Like.target_id == target_id,
+        )
+    ).rowcount
+
+    if not removed:
+        return current_count(db, target_type, target_id)
+
+    likes_count = increment_counter(db, counter, target_id, -1)
+    db.commit()
+    return likes_count
+
+
+def delete_likes(target_type: str, target_ids):
+    """Comando que apaga as curtidas dos itens (lista de ids ou subconsulta)"""
+    return delete(Like).where(Like.target_type == target_type, Like.target_id.in_(target_ids))
+
+
+def current_count(db: Session, target_type: str, target_id: int) -> Optional[int]:
+    """likes_count do item, ou None se ele não existe"""
+    counter = LIKE_COUNTERS[target_type]
+    model = counter.class_
+    return db.execute(select(counter).where(model.id == target_id)).scalar_one_or_none()
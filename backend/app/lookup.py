@@ -0,0 +1,37 @@
+"""
+Busca em lote por lista de ids (GET /<recurso>/lookup?ids=1,2,3).
+
+Evita uma requisição por id no app: todos os itens vêm de uma única consulta
+IN e são devolvidos na ordem pedida, com null (e o id em missing) para os que
+não existem.
+"""
+from typing import List
+from fastapi import HTTPException
+from sqlalchemy.orm import Query
+
+# Limite de ids por requisição
+LOOKUP_MAX_IDS = 200
+
+
+def parse_ids(ids: str) -> List[int]:
+    """Converte "1,2,3" em lista de inteiros"""
+    try:
+        values = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Lista de ids inválida")
+
+    if not values:
+        raise HTTPException(status_code=400, detail="Informe ao menos um id")
+    if len(values) > LOOKUP_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {LOOKUP_MAX_IDS} ids por busca")
+    return values
+
+
+def lookup_by_ids(query: Query, model, ids: str) -> dict:
+    """Executa a consulta IN e alinha os resultados com os ids pedidos"""
+    requested = parse_ids(ids)
+    found = {item.id: item for item in query.filter(model.id.in_(set(requested))).all()}
+    return {
+        "items": [found.get(item_id) for item_id in requested],
+        "missing": [item_id for item_id in dict.fromkeys(requested) if item_id not in found],
+    }
@@ -0,0 +1,263 @@
+"""
+Sugestão de solicitações de aula para um voluntário.
+
+Um índice em memória guarda as solicitações abertas (status requested) por
+disciplina, só com os campos usados no ranking. As rotas de aulas o atualizam
+depois do commit ao criar, alterar, aceitar ou cancelar uma aula, então
+GET /lessons/matches/{volunteer_id} não percorre a tabela lessons: lê as
+disciplinas, a disponibilidade e a agenda do voluntário, monta os candidatos
+a partir do índice e só carrega do banco as aulas da página.
+
+Cada processo tem o seu índice. Para incluir alterações feitas por outros
+workers, ele é reconstruído a cada MATCH_INDEX_REBUILD_INTERVAL segundos; as
+alterações feitas durante a reconstrução são reaplicadas no índice novo, e
+aulas da página que já não estão abertas são descartadas e retiradas dele.
+"""
+import asyncio
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+from app.database import read_engine
+from app.models.lesson import Lesson, LessonStatus, LessonType
+from app.models.user import User
+from app.models.volunteer import Volunteer, volunteer_subjects
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Pontuação de cada solicitação: presencial na cidade do voluntário, online,
+# presencial em outra cidade (ou sem cidade)
+SAME_CITY_SCORE = 2
+ONLINE_SCORE = 1
+OTHER_CITY_SCORE = 0
+
+
+class OpenLesson(NamedTuple):
+    id: int
+    subject_id: int
+    lesson_type: LessonType
+    city: Optional[str]  # normalizada com normalize_city
+    scheduled_date: datetime  # UTC, sem fuso
+    duration_minutes: int
+
+
+class VolunteerProfile(NamedTuple):
+    subject_ids: Sequence[int]
+    online: bool
+    presencial: bool
+    city: Optional[str]  # normalizada com normalize_city
+    agenda: Sequence[Tuple[datetime, datetime]]  # aulas aceitas: (início, fim) em UTC
+
+
+# Os nomes de cidade se repetem muito; a normalização é memorizada
+@lru_cache(maxsize=4096)
+def normalize_city(city: Optional[str]) -> Optional[str]:
+    """Cidade sem acentos, maiúsculas e espaços extras ("São Paulo " -> "sao paulo")"""
+    if not city:
+        return None
+    decomposed = unicodedata.normalize("NFKD", city.strip().casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)) or None
+
+
+def utc_naive(value: datetime) -> datetime:
+    """Data em UTC sem fuso (o SQLite devolve datas sem fuso, o PostgreSQL com)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def open_lesson(lesson) -> OpenLesson:
+    """Registro do índice a partir de uma aula (modelo ou schema)"""
+    return OpenLesson(
+        lesson.id, lesson.subject_id, LessonType(lesson.lesson_type),
+        normalize_city(lesson.location_city), utc_naive(lesson.scheduled_date),
+        lesson.duration_minutes or 60,
+    )
+
+
+class MatchIndex:
+    """Solicitações abertas por disciplina, carregadas da tabela lessons"""
+
+    def __init__(self, rebuild_interval: float):
+        self.rebuild_interval = rebuild_interval
+        self._by_subject: Optional[Dict[int, Dict[int, OpenLesson]]] = None
+        self._subject_of: Dict[int, int] = {}
+        # Alterações recebidas durante uma reconstrução (None fora dela)
+        self._changes: Optional[List[Tuple[int, Optional[OpenLesson]]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self, connection) -> Tuple[Dict[int, Dict[int, OpenLesson]], Dict[int, int]]:
+        # Solicitações com data já passada nunca são sugeridas
+        rows = connection.execute(
+            select(
+                Lesson.id, Lesson.subject_id, Lesson.lesson_type, Lesson.location_city,
+                Lesson.scheduled_date, Lesson.duration_minutes,
+            ).where(Lesson.status == LessonStatus.REQUESTED, Lesson.scheduled_date >= datetime.now(timezone.utc))
+        ).all()
+        by_subject: Dict[int, Dict[int, OpenLesson]] = {}
+        subject_of: Dict[int, int] = {}
+        # Desempacotar as linhas custa bem menos que ler os campos pelo nome
+        for lesson_id, subject_id, lesson_type, city, scheduled_date, duration_minutes in rows:
+            by_subject.setdefault(subject_id, {})[lesson_id] = OpenLesson(
+                lesson_id, subject_id, lesson_type, normalize_city(city),
+                utc_naive(scheduled_date), duration_minutes or 60,
+            )
+            subject_of[lesson_id] = subject_id
+        return by_subject, subject_of
+
+    def _apply(self, lesson_id: int, lesson: Optional[OpenLesson]):
+        """Coloca (ou, com lesson None, retira) a aula do índice; chamar com o lock"""
+        subject_id = self._subject_of.pop(lesson_id, None)
+        if subject_id is not None:
+            self._by_subject[subject_id].pop(lesson_id, None)
+        if lesson is not None:
+            self._by_subject.setdefault(lesson.subject_id, {})[lesson.id] = lesson
+            self._subject_of[lesson.id] = lesson.subject_id
+
+    def _change(self, lesson_id: int, lesson: Optional[OpenLesson]):
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((lesson_id, lesson))
+            if self._by_subject is not None:
+                self._apply(lesson_id, lesson)
+
+    def rebuild(self):
+        """Recarrega o índice a partir da tabela"""
+        with self._lock:
+            self._changes = []
+        try:
+            with read_engine.connect() as connection:
+                by_subject, subject_of = self._load(connection)
+        except Exception:
+            with self._lock:
+                self._changes = None
+            raise
+        with self._lock:
+            self._by_subject, self._subject_of = by_subject, subject_of
+            for lesson_id, lesson in self._changes:
+                self._apply(lesson_id, lesson)
+            self._changes = None
+
+    def update(self, lessons: Iterable):
+        """Atualiza o índice com o estado das aulas já gravadas: entram as abertas, saem as demais"""
+        for lesson in lessons:
+            if lesson.status == LessonStatus.REQUESTED:
+                self._change(lesson.id, open_lesson(lesson))
+            else:
+                self._change(lesson.id, None)
+
+    def remove(self, lesson_id: int):
+        """Retira a aula do índice"""
+        self._change(lesson_id, None)
+
+    def candidates(self, db: Session, subject_ids: Iterable[int]) -> List[OpenLesson]:
+        """Solicitações abertas das disciplinas"""
+        with self._lock:
+            if self._by_subject is None:
+                # Primeira consulta do processo: carregar a partir da tabela
+                self._by_subject, self._subject_of = self._load(db.connection())
+            found = []
+            for subject_id in set(subject_ids):
+                found.extend(self._by_subject.get(subject_id, {}).values())
+            return found
+
+    async def run_periodic(self):
+        """Tarefa de fundo que reconstrói o índice a cada rebuild_interval segundos"""
+        while True:
+            await asyncio.sleep(self.rebuild_interval)
+            start = time.perf_counter()
+            try:
+                await run_in_threadpool(self.rebuild)
+            except Exception:
+                logger.exception("Falha ao reconstruir o índice de sugestões de aulas")
+                continue
+            logger.debug("Índice de sugestões de aulas reconstruído em %.1f ms", (time.perf_counter() - start) * 1000)
+
+
+# Instância global do índice
+match_index = MatchIndex(settings.match_index_rebuild_interval)
+
+
+def volunteer_profile(db: Session, volunteer_id: int, now: datetime) -> Optional[VolunteerProfile]:
+    """
+    Disciplinas, disponibilidade, cidade e agenda do voluntário (now com fuso);
+    None se ele não existe
+    """
+    user = db.execute(
+        select(User.is_online_available, User.is_presencial_available, User.location_city)
+        .join(Volunteer, Volunteer.user_id == User.id)
+        .where(Volunteer.id == volunteer_id)
+    ).first()
+    if user is None:
+        return None
+
+    subject_ids = db.execute(
+        select(volunteer_subjects.c.subject_id).where(volunteer_subjects.c.volunteer_id == volunteer_id)
+    ).scalars().all()
+
+    # Aulas já aceitas, a partir do dia anterior (uma aula iniciada antes de
+    # agora ainda pode coincidir com as próximas)
+    accepted = db.execute(
+        select(Lesson.scheduled_date, Lesson.duration_minutes).where(
+            Lesson.volunteer_id == volunteer_id,
+            Lesson.scheduled_date >= now - timedelta(days=1),
+            Lesson.status.in_([LessonStatus.ACCEPTED, LessonStatus.CONFIRMED]),
+        )
+    ).all()
+    agenda = [
+        (utc_naive(start), utc_naive(start) + timedelta(minutes=duration or 60))
+        for start, duration in accepted
+    ]
+    return VolunteerProfile(
+        subject_ids, bool(user.is_online_available), bool(user.is_presencial_available),
+        normalize_city(user.location_city), agenda,
+    )
+
+
+def score(lesson: OpenLesson, volunteer: VolunteerProfile) -> Optional[int]:
+    """Pontuação da solicitação para o voluntário; None se ele não pode atendê-la"""
+    if lesson.lesson_type == LessonType.ONLINE:
+        return ONLINE_SCORE if volunteer.online else None
+    if not volunteer.presencial:
+        return None
+    if volunteer.city and lesson.city == volunteer.city:
+        return SAME_CITY_SCORE
+    return OTHER_CITY_SCORE
+
+
+def conflicts(lesson: OpenLesson, agenda: Sequence[Tuple[datetime, datetime]]) -> bool:
+    """Indica se a aula coincide com alguma aula já aceita pelo voluntário"""
+    start = lesson.scheduled_date
+    end = start + timedelta(minutes=lesson.duration_minutes)
+    return any(start < busy_end and busy_start < end for busy_start, busy_end in agenda)
+
+
+def rank(
+    candidates: Iterable[OpenLesson], volunteer: VolunteerProfile, now: datetime, count: int
+) -> List[Tuple[OpenLesson, int]]:
+    """
+    As count melhores solicitações para o voluntário, com a pontuação: maior
+    pontuação primeiro e, nela, a aula mais próxima. Ficam de fora aulas já
+    passadas, de modalidade que o voluntário não atende e que coincidem com a
+    agenda dele.
+    """
+    now = utc_naive(now)
+    scored = []
+    for lesson in candidates:
+        if lesson.scheduled_date < now:
+            continue
+        points = score(lesson, volunteer)
+        if points is None or conflicts(lesson, volunteer.agenda):
+            continue
+        scored.append((lesson, points))
+    return heapq.nsmallest(count, scored, key=lambda pair: (-pair[1], pair[0].scheduled_date, pair[0].id))
@@ -0,0 +1,154 @@
+"""
+Métricas HTTP no formato de texto do Prometheus.
+
+Um middleware registra, por rota (caminho com parâmetros, ex.: /lessons/{lesson_id}),
+o número de requisições por status, um histograma de latência e um histograma
+do tamanho das respostas, além das requisições em andamento. GET /metrics
+expõe esses valores junto com as conexões WebSocket ativas, as mensagens
+aguardando envio e os clientes desconectados por lentidão.
+Os valores são por processo; com vários workers, cada um tem os seus.
+"""
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Rótulo usado quando nenhuma rota atende o caminho (evita um rótulo por URL)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Histograma cumulativo com buckets fixos"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class HttpMetrics:
+    """Contadores e histogramas das requisições HTTP"""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.response_size: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: Optional[int] = None):
+        key = (method, route)
+        self.requests[(method, route, status)] += 1
+        self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+        if size is not None:
+            self.response_size.setdefault(key, Histogram(SIZE_BUCKETS)).observe(size)
+
+    def render(
+        self, websocket_connections: int, websocket_queued_messages: int = 0,
+        websocket_slow_consumers: int = 0, websocket_subscriptions: int = 0,
+    ) -> str:
+        lines = [
+            "# HELP http_requests_total Requisições HTTP por rota e status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Latência das requisições HTTP por rota.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            lines += histogram.render("http_request_duration_seconds", f'method="{method}",route="{route}"')
+
+        lines += [
+            "# HELP http_response_size_bytes Tamanho das respostas HTTP por rota.",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        for (method, route), histogram in sorted(self.response_size.items()):
+            lines += histogram.render("http_response_size_bytes", f'method="{method}",route="{route}"')
+
+        lines += [
+            "# HELP http_requests_in_flight Requisições HTTP em andamento.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP websocket_connections Conexões WebSocket ativas.",
+            "# TYPE websocket_connections gauge",
+            f"websocket_connections {websocket_connections}",
+            "# HELP websocket_queued_messages Mensagens WebSocket aguardando envio.",
+            "# TYPE websocket_queued_messages gauge",
+            f"websocket_queued_messages {websocket_queued_messages}",
+            "# HELP websocket_slow_consumers_dropped_total Clientes WebSocket desconectados por lentidão.",
+            "# TYPE websocket_slow_consumers_dropped_total counter",
+            f"websocket_slow_consumers_dropped_total {websocket_slow_consumers}",
+            "# HELP websocket_subscriptions Assinaturas de canais WebSocket.",
+            "# TYPE websocket_subscriptions gauge",
+            f"websocket_subscriptions {websocket_subscriptions}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+# Instância global das métricas
+http_metrics = HttpMetrics()
+
+
+def route_template(request: Request) -> str:
+    """Caminho da rota que atendeu a requisição, com os parâmetros sem valor"""
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Middleware HTTP que registra as métricas de cada requisição"""
+    http_metrics.in_flight += 1
+    start = time.perf_counter()
+    status = 500
+    size = None
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        if "content-length" in response.headers:
+            size = int(response.headers["content-length"])
+        return response
+    finally:
+        http_metrics.in_flight -= 1
+        http_metrics.observe(
+            request.method, route_template(request), status, time.perf_counter() - start, size
+        )
+
+
+def metrics_endpoint() -> PlainTextResponse:
+    """Métricas no formato de texto do Prometheus"""
+    from app.websocket.manager import manager
+
+    websocket = manager.stats()
+    return PlainTextResponse(
+        http_metrics.render(
+            websocket.connections, websocket.queued_messages,
+            websocket.slow_consumers_dropped, websocket.subscriptions,
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,330 @@
+"""
+Esquema inicial: as tabelas como eram antes das migrações versionadas.
+
+As definições ficam congeladas aqui, sem usar os modelos, para que um banco
+novo passe pelas mesmas migrações que um banco antigo; mudanças posteriores
+nos modelos entram em migrações novas. checkfirst mantém as tabelas de bancos
+criados antes das migrações (com create_all).
+"""
+from sqlalchemy import (
+    JSON, Boolean, Column, DateTime, Enum, ForeignKey, Integer, MetaData, String, Table, Text,
+)
+from sqlalchemy.sql import func
+
+metadata = MetaData()
+
+
+def created_at(name: str = "created_at") -> Column:
+    return Column(name, DateTime(timezone=True), server_default=func.now())
+
+
+def updated_at() -> Column:
+    return Column("updated_at", DateTime(timezone=True))
+
+
+# O Enum grava o nome dos membros; os nomes dos tipos são os que o SQLAlchemy
+# deriva das classes dos modelos (tipos nativos no PostgreSQL)
+USER_ROLE = Enum("LEARNER", "VOLUNTEER", name="userrole")
+USER_STATUS = Enum("PENDING", "ACTIVE", "INACTIVE", "REJECTED", name="userstatus")
+LESSON_TYPE = Enum("ONLINE", "PRESENCIAL", name="lessontype")
+LESSON_STATUS = Enum("REQUESTED", "ACCEPTED", "CONFIRMED", "COMPLETED", "CANCELLED", name="lessonstatus")
+NEWS_TYPE = Enum("NEWS", "EVENT", "CAMPAIGN", "ANNOUNCEMENT", name="newstype")
+PARTNER_TYPE = Enum("ONG", "SCHOOL", "LIBRARY", "COMMUNITY_CENTER", "OTHER", name="partnertype")
+CONTENT_TYPE = Enum("VIDEO", "PDF", "ARTICLE", name="contenttype")
+BADGE_TYPE = Enum("COURSE_COMPLETION", "QUIZ_MASTER", "LESSON_STREAK", "HELPER", "SPECIAL", name="badgetype")
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("password_hash", String, nullable=False),
+    Column("name", String, nullable=False),
+    Column("role", USER_ROLE, nullable=False),
+    Column("status", USER_STATUS),
+    Column("phone", String),
+    Column("profile_image", String),
+    Column("location_city", String),
+    Column("location_state", String),
+    Column("location_latitude", String),
+    Column("location_longitude", String),
+    Column("bio", Text),
+    Column("is_online_available", Boolean),
+    Column("is_presencial_available", Boolean),
+    created_at(),
+    updated_at(),
+    Column("last_login", DateTime(timezone=True)),
+)
+
+Table(
+    "subjects", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, unique=True, nullable=False, index=True),
+    Column("description", Text),
+    Column("icon", String),
+    Column("category", String),
+)
+
+Table(
+    "volunteers", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), unique=True, nullable=False),
+    Column("volunteer_type", String, nullable=False),
+    Column("institution", String),
+    Column("document_url", String),
+    Column("document_verified", Integer),
+    Column("verification_notes", String),
+    Column("total_points", Integer),
+    Column("total_lessons", Integer),
+)
+
+Table(
+    "volunteer_subjects", metadata,
+    Column("volunteer_id", Integer, ForeignKey("volunteers.id"), primary_key=True),
+    Column("subject_id", Integer, ForeignKey("subjects.id"), primary_key=True),
+)
+
+Table(
+    "learners", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), unique=True, nullable=False),
+    Column("total_badges", Integer),
+    Column("total_courses_completed", Integer),
+    Column("total_quiz_score", Integer),
+)
+
+Table(
+    "learner_interests", metadata,
+    Column("learner_id", Integer, ForeignKey("learners.id"), primary_key=True),
+    Column("subject_id", Integer, ForeignKey("subjects.id"), primary_key=True),
+)
+
+Table(
+    "lessons", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("learner_id", Integer, ForeignKey("learners.id"), nullable=False),
+    Column("volunteer_id", Integer, ForeignKey("volunteers.id")),
+    Column("subject_id", Integer, ForeignKey("subjects.id"), nullable=False),
+    Column("title", String, nullable=False),
+    Column("description", Text),
+    Column("lesson_type", LESSON_TYPE, nullable=False),
+    Column("status", LESSON_STATUS),
+    Column("scheduled_date", DateTime(timezone=True), nullable=False),
+    Column("duration_minutes", Integer),
+    Column("location_address", String),
+    Column("location_city", String),
+    Column("location_latitude", String),
+    Column("location_longitude", String),
+    Column("meeting_link", String),
+    Column("meeting_platform", String),
+    Column("rating", Integer),
+    Column("feedback", Text),
+    created_at(),
+    updated_at(),
+)
+
+Table(
+    "published_lessons", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("volunteer_id", Integer, ForeignKey("volunteers.id"), nullable=False),
+    Column("subject_id", Integer, ForeignKey("subjects.id"), nullable=False),
+    Column("title", String, nullable=False),
+    Column("description", Text),
+    Column("media_url", String),
+    Column("media_type", String),
+    Column("views_count", Integer),
+    Column("likes_count", Integer),
+    created_at(),
+    updated_at(),
+)
+
+Table(
+    "news", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String, nullable=False, index=True),
+    Column("content", Text, nullable=False),
+    Column("news_type", NEWS_TYPE, nullable=False),
+    Column("author", String),
+    Column("image_url", String),
+    Column("event_date", DateTime(timezone=True)),
+    Column("event_location", String),
+    Column("event_link", String),
+    Column("campaign_goal", String),
+    Column("campaign_end_date", DateTime(timezone=True)),
+    Column("campaign_contact", String),
+    Column("is_featured", Boolean),
+    Column("is_active", Boolean),
+    Column("views_count", Integer),
+    created_at(),
+    updated_at(),
+    Column("published_at", DateTime(timezone=True)),
+)
+
+Table(
+    "partner_locations", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False, index=True),
+    Column("partner_type", PARTNER_TYPE, nullable=False),
+    Column("description", Text),
+    Column("address", String),
+    Column("city", String),
+    Column("state", String),
+    Column("latitude", String),
+    Column("longitude", String),
+    Column("phone", String),
+    Column("email", String),
+    Column("website", String),
+    Column("image_url", String),
+    Column("is_active", Boolean),
+    created_at(),
+    updated_at(),
+)
+
+Table(
+    "messages", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("sender_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("receiver_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("lesson_id", Integer, ForeignKey("lessons.id")),
+    Column("content", Text, nullable=False),
+    Column("is_read", Boolean),
+    created_at(),
+)
+
+Table(
+    "forum_topics", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("subject_id", Integer, ForeignKey("subjects.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("title", String, nullable=False, index=True),
+    Column("content", Text, nullable=False),
+    Column("is_resolved", Boolean),
+    Column("views_count", Integer),
+    Column("replies_count", Integer),
+    created_at(),
+    updated_at(),
+)
+
+Table(
+    "forum_replies", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("topic_id", Integer, ForeignKey("forum_topics.id"), nullable=False),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("is_accepted", Boolean),
+    Column("likes_count", Integer),
+    created_at(),
+    updated_at(),
+)
+
+Table(
+    "courses", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("subject_id", Integer, ForeignKey("subjects.id"), nullable=False),
+    Column("title", String, nullable=False, index=True),
+    Column("description", Text),
+    Column("thumbnail", String),
+    Column("difficulty_level", String),
+    Column("duration_hours", Integer),
+    Column("is_active", Boolean),
+    created_at(),
+    updated_at(),
+)
+
+Table(
+    "course_materials", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("course_id", Integer, ForeignKey("courses.id"), nullable=False),
+    Column("title", String, nullable=False),
+    Column("content_type", CONTENT_TYPE, nullable=False),
+    Column("content_url", String, nullable=False),
+    Column("description", Text),
+    Column("order_index", Integer),
+    Column("duration_minutes", Integer),
+    created_at(),
+)
+
+Table(
+    "course_progress", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("learner_id", Integer, ForeignKey("learners.id"), nullable=False),
+    Column("course_id", Integer, ForeignKey("courses.id"), nullable=False),
+    Column("completed_materials", Integer),
+    Column("total_materials", Integer),
+    Column("is_completed", Boolean),
+    Column("completed_at", DateTime(timezone=True)),
+    created_at("started_at"),
+    updated_at(),
+)
+
+Table(
+    "quizzes", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("course_id", Integer, ForeignKey("courses.id")),
+    Column("subject_id", Integer, ForeignKey("subjects.id"), nullable=False),
+    Column("title", String, nullable=False),
+    Column("description", Text),
+    Column("passing_score", Integer),
+    Column("time_limit_minutes", Integer),
+    Column("is_active", Boolean),
+    created_at(),
+)
+
+Table(
+    "quiz_questions", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("question_text", Text, nullable=False),
+    Column("options", JSON, nullable=False),
+    Column("correct_answer", String, nullable=False),
+    Column("explanation", Text),
+    Column("points", Integer),
+    Column("order_index", Integer),
+)
+
+Table(
+    "quiz_attempts", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("learner_id", Integer, ForeignKey("learners.id"), nullable=False),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id"), nullable=False),
+    Column("score", Integer),
+    Column("total_questions", Integer, nullable=False),
+    Column("correct_answers", Integer),
+    Column("is_passed", Boolean),
+    Column("answers", JSON),
+    created_at("started_at"),
+    Column("completed_at", DateTime(timezone=True)),
+)
+
+Table(
+    "badges", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String, nullable=False),
+    Column("description", Text),
+    Column("icon", String),
+    Column("badge_type", BADGE_TYPE, nullable=False),
+    Column("requirement_value", Integer),
+    Column("points_reward", Integer),
+    created_at(),
+)
+
+Table(
+    "user_badges", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("badge_id", Integer, ForeignKey("badges.id"), nullable=False),
+    created_at("earned_at"),
+)
+
+Table(
+    "points_transactions", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("points", Integer, nullable=False),
+    Column("reason", String, nullable=False),
+    Column("reference_id", Integer),
+    created_at(),
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection, checkfirst=True)
@@ -0,0 +1,24 @@
+"""Índices compostos para os filtros e ordenações mais usados"""
+from sqlalchemy import Index, MetaData, Table
+
+# Tabela -> {índice: colunas}
+INDEXES = {
+    "lessons": {
+        "ix_lessons_status_subject_created": ["status", "subject_id", "created_at"],
+        "ix_lessons_volunteer_scheduled": ["volunteer_id", "scheduled_date"],
+    },
+    "forum_topics": {"ix_forum_topics_subject_created": ["subject_id", "created_at"]},
+    "forum_replies": {"ix_forum_replies_topic_created": ["topic_id", "created_at"]},
+    "published_lessons": {"ix_published_lessons_volunteer_created": ["volunteer_id", "created_at"]},
+    "news": {"ix_news_active_type_created": ["is_active", "news_type", "created_at"]},
+    "partner_locations": {"ix_partner_locations_active_city_state": ["is_active", "city", "state"]},
+    "volunteer_subjects": {"ix_volunteer_subjects_subject_volunteer": ["subject_id", "volunteer_id"]},
+}
+
+
+def upgrade(connection):
+    metadata = MetaData()
+    for table_name, indexes in INDEXES.items():
+        table = Table(table_name, metadata, autoload_with=connection)
+        for index_name, columns in indexes.items():
+            Index(index_name, *(table.c[name] for name in columns)).create(connection, checkfirst=True)
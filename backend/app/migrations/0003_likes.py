@@ -0,0 +1,25 @@
+"""Tabela de curtidas por usuário"""
+from sqlalchemy import (
+    Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, UniqueConstraint,
+)
+from sqlalchemy.sql import func
+
+metadata = MetaData()
+
+# Só a chave referenciada pela chave estrangeira; a tabela já existe
+Table("users", metadata, Column("id", Integer, primary_key=True))
+
+likes = Table(
+    "likes", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("target_type", String, nullable=False),
+    Column("target_id", Integer, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    UniqueConstraint("user_id", "target_type", "target_id", name="uq_likes_user_target"),
+    Index("ix_likes_target", "target_type", "target_id"),
+)
+
+
+def upgrade(connection):
+    likes.create(connection, checkfirst=True)
@@ -0,0 +1,70 @@
+"""
+Índice de busca textual (FTS5) de tópicos e respostas do fórum
+
+A tabela virtual, os triggers e a indexação inicial ficam congelados aqui;
+mudanças posteriores entram em migrações novas. O rowid identifica a origem:
+id * 2 para tópicos e id * 2 + 1 para respostas.
+"""
+
+CREATE_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS forum_fts USING fts5(
+        title, content, topic_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_topics_fts_insert AFTER INSERT ON forum_topics BEGIN
+        INSERT INTO forum_fts (rowid, title, content, topic_id)
+        VALUES (new.id * 2, new.title, new.content, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_topics_fts_update AFTER UPDATE OF title, content ON forum_topics BEGIN
+        UPDATE forum_fts SET title = new.title, content = new.content WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_topics_fts_delete AFTER DELETE ON forum_topics BEGIN
+        DELETE FROM forum_fts WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_replies_fts_insert AFTER INSERT ON forum_replies BEGIN
+        INSERT INTO forum_fts (rowid, title, content, topic_id)
+        VALUES (new.id * 2 + 1, '', new.content, new.topic_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_replies_fts_update AFTER UPDATE OF content, topic_id ON forum_replies BEGIN
+        UPDATE forum_fts SET content = new.content, topic_id = new.topic_id WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS forum_replies_fts_delete AFTER DELETE ON forum_replies BEGIN
+        DELETE FROM forum_fts WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+# Indexação do conteúdo já existente
+INDEX_STATEMENTS = [
+    "DELETE FROM forum_fts",
+    """
+    INSERT INTO forum_fts (rowid, title, content, topic_id)
+    SELECT id * 2, title, content, id FROM forum_topics
+    """,
+    """
+    INSERT INTO forum_fts (rowid, title, content, topic_id)
+    SELECT id * 2 + 1, '', content, topic_id FROM forum_replies
+    """,
+    "INSERT INTO forum_fts (forum_fts) VALUES ('optimize')",
+]
+
+
+def upgrade(connection):
+    # Em outros bancos a busca do fórum usa ILIKE
+    if connection.dialect.name == "sqlite":
+        for statement in CREATE_STATEMENTS + INDEX_STATEMENTS:
+            connection.exec_driver_sql(statement)
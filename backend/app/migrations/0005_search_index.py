@@ -0,0 +1,118 @@
+"""
+Índice de busca geral (search_documents e, no SQLite, a tabela FTS5)
+
+Tabela, índice FTS5, triggers e a indexação inicial ficam congelados aqui,
+com as tabelas e colunas como eram nesta versão; mudanças posteriores entram
+em migrações novas. Depois da migração, app.search mantém o índice.
+"""
+from sqlalchemy import (
+    Boolean, Column, Integer, MetaData, String, Table, Text, UniqueConstraint,
+    column, func, insert, literal, select, table, true,
+)
+
+search_documents = Table(
+    "search_documents", MetaData(),
+    Column("id", Integer, primary_key=True, index=True),
+    Column("entity_type", String, nullable=False),
+    Column("entity_id", Integer, nullable=False),
+    Column("title", String, nullable=False),
+    Column("body", Text, nullable=False),
+    UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+)
+
+FTS_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, body,
+        content = 'search_documents', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_fts_insert AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_fts_update AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_documents_fts_delete AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_fts (search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+]
+
+# Tabelas de origem, só com as colunas lidas pela indexação inicial
+news = table(
+    "news", column("id"), column("title"), column("content"), column("event_location"),
+    column("campaign_goal"), column("is_active", Boolean),
+)
+published_lessons = table(
+    "published_lessons", column("id"), column("subject_id"), column("title"), column("description"),
+)
+subjects = table("subjects", column("id"), column("name"), column("description"), column("category"))
+partner_locations = table(
+    "partner_locations", column("id"), column("name"), column("description"), column("address"),
+    column("city"), column("state"), column("is_active", Boolean),
+)
+volunteers = table("volunteers", column("id"), column("user_id"), column("institution"))
+volunteer_subjects = table("volunteer_subjects", column("volunteer_id"), column("subject_id"))
+users = table("users", column("id"), column("name"), column("location_city"), column("bio"))
+
+
+def _text(*columns):
+    """Concatena colunas de texto opcionais, separadas por espaço"""
+    # As colunas de table() não têm tipo; o coalesce tipado faz o + virar ||
+    result = func.coalesce(columns[0], "", type_=Text)
+    for text_column in columns[1:]:
+        result = result + " " + func.coalesce(text_column, "", type_=Text)
+    return func.trim(result)
+
+
+def documents():
+    """Consultas (tipo, id, título, corpo) de cada tipo indexado"""
+    lesson_subject = (
+        select(subjects.c.name).where(subjects.c.id == published_lessons.c.subject_id).scalar_subquery()
+    )
+    volunteer_subject_names = (
+        select(func.aggregate_strings(subjects.c.name, " "))
+        .select_from(volunteer_subjects.join(subjects, subjects.c.id == volunteer_subjects.c.subject_id))
+        .where(volunteer_subjects.c.volunteer_id == volunteers.c.id)
+        .scalar_subquery()
+    )
+    return [
+        select(literal("news"), news.c.id, news.c.title, _text(
+            news.c.content, news.c.event_location, news.c.campaign_goal
+        )).where(news.c.is_active == true()),
+        select(literal("published_lesson"), published_lessons.c.id, published_lessons.c.title, _text(
+            published_lessons.c.description, lesson_subject
+        )),
+        select(literal("subject"), subjects.c.id, subjects.c.name, _text(
+            subjects.c.description, subjects.c.category
+        )),
+        select(literal("partner"), partner_locations.c.id, partner_locations.c.name, _text(
+            partner_locations.c.description, partner_locations.c.address,
+            partner_locations.c.city, partner_locations.c.state
+        )).where(partner_locations.c.is_active == true()),
+        select(literal("volunteer"), volunteers.c.id, users.c.name, _text(
+            volunteer_subject_names, volunteers.c.institution, users.c.location_city, users.c.bio
+        )).join(users, volunteers.c.user_id == users.c.id),
+    ]
+
+
+def upgrade(connection):
+    search_documents.create(connection, checkfirst=True)
+    # Em outros bancos a busca usa ILIKE em search_documents
+    if connection.dialect.name == "sqlite":
+        for statement in FTS_STATEMENTS:
+            connection.exec_driver_sql(statement)
+    # Indexa o conteúdo já existente (os triggers alimentam a tabela FTS5)
+    for source in documents():
+        connection.execute(insert(search_documents).from_select(
+            ["entity_type", "entity_id", "title", "body"], source
+        ))
@@ -0,0 +1,13 @@
+"""Coordenadas numéricas dos parceiros e índice espacial (rtree no SQLite)"""
+from app.geo import convert_coordinates, rtree_statements
+
+
+def upgrade(connection):
+    convert_coordinates(connection, "partner_locations", "latitude", "longitude")
+    if connection.dialect.name == "sqlite":
+        # Só parceiros ativos entram no índice
+        for statement in rtree_statements(
+            "partner_locations", "latitude", "longitude",
+            watched_columns=["latitude", "longitude", "is_active"], condition="{row}.is_active = 1"
+        ):
+            connection.exec_driver_sql(statement)
@@ -0,0 +1,14 @@
+"""Coordenadas numéricas das aulas e índice espacial das solicitações abertas (rtree no SQLite)"""
+from app.geo import convert_coordinates, rtree_statements
+
+
+def upgrade(connection):
+    convert_coordinates(connection, "lessons", "location_latitude", "location_longitude")
+    if connection.dialect.name == "sqlite":
+        # Só solicitações ainda não aceitas entram no índice (o Enum grava o nome)
+        for statement in rtree_statements(
+            "lessons", "location_latitude", "location_longitude",
+            watched_columns=["location_latitude", "location_longitude", "status"],
+            condition="{row}.status = 'REQUESTED'"
+        ):
+            connection.exec_driver_sql(statement)
@@ -0,0 +1,78 @@
+"""
+Migrações versionadas do esquema do banco de dados.
+
+Cada migração é um módulo em app/migrations/ chamado NNNN_descricao.py que
+define uma função upgrade(connection). As versões aplicadas ficam registradas
+na tabela schema_migrations, e cada migração roda na sua própria transação.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import func
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+MIGRATION_NAME = re.compile(r"^(\d{4})_\w+\.py$")
+
+# Tabela de controle fica fora do Base.metadata dos modelos
+migrations_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    migrations_metadata,
+    Column("version", String, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def import_all_models():
+    """Importa todos os módulos de app/models para registrar as tabelas no Base"""
+    models_dir = Path(__file__).parent / "models"
+    for module in pkgutil.iter_modules([str(models_dir)]):
+        importlib.import_module(f"app.models.{module.name}")
+
+
+def discover_migrations() -> List[Tuple[str, str]]:
+    """Lista (versão, nome do módulo) das migrações disponíveis, em ordem"""
+    migrations = []
+    for path in MIGRATIONS_DIR.glob("*.py"):
+        match = MIGRATION_NAME.match(path.name)
+        if match:
+            migrations.append((match.group(1), path.stem))
+    return sorted(migrations)
+
+
+def get_applied_versions(engine: Engine) -> List[str]:
+    """Versões já aplicadas no banco"""
+    with engine.begin() as connection:
+        migrations_metadata.create_all(connection)
+        return list(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def get_pending_migrations(engine: Engine) -> List[Tuple[str, str]]:
+    """Migrações disponíveis que ainda não foram aplicadas"""
+    applied = set(get_applied_versions(engine))
+    return [(version, name) for version, name in discover_migrations() if version not in applied]
+
+
+def run_migrations(engine: Optional[Engine] = None) -> List[str]:
+    """Aplica as migrações pendentes e retorna os nomes aplicados"""
+    if engine is None:
+        from app.database import engine
+
+    import_all_models()
+    applied = []
+    for version, name in get_pending_migrations(engine):
+        module = importlib.import_module(f"app.migrations.{name}")
+        logger.info("Aplicando migração %s", name)
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(version=version, name=name))
+        applied.append(name)
+    return applied
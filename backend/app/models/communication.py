@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -31,6 +31,10 @@ class ForumTopic(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_forum_topics_subject_created", "subject_id", "created_at"),
+    )
+
 
 class ForumReply(Base):
     """Respostas do fórum"""
@@ -44,3 +48,7 @@ class ForumReply(Base):
     likes_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_forum_replies_topic_created", "topic_id", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, Text, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -37,8 +37,8 @@ class Lesson(Base):
     # Para aulas presenciais
     location_address = Column(String, nullable=True)
     location_city = Column(String, nullable=True)
-    location_latitude = Column(String, nullable=True)
-    location_longitude = Column(String, nullable=True)
+    location_latitude = Column(Float, nullable=True)
+    location_longitude = Column(Float, nullable=True)
     
     # Para aulas online
     meeting_link = Column(String, nullable=True)
@@ -50,3 +50,10 @@ class Lesson(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        # Solicitações disponíveis por disciplina, mais recentes primeiro
+        Index("ix_lessons_status_subject_created", "status", "subject_id", "created_at"),
+        # Agenda do voluntário
+        Index("ix_lessons_volunteer_scheduled", "volunteer_id", "scheduled_date"),
+    )
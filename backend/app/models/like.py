@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Like(Base):
+    """Curtidas dos usuários (uma por usuário e item)"""
+    __tablename__ = "likes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    target_type = Column(String, nullable=False)  # "forum_reply", "published_lesson"
+    target_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "target_type", "target_id", name="uq_likes_user_target"),
+        Index("ix_likes_target", "target_type", "target_id"),
+    )
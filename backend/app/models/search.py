@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Text, UniqueConstraint
+from app.database import Base
+
+
+class SearchDocument(Base):
+    """Documento do índice de busca geral (um por item pesquisável)"""
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String, nullable=False)  # "news", "published_lesson", "subject", "partner", "volunteer"
+    entity_id = Column(Integer, nullable=False)
+    title = Column(String, nullable=False)
+    body = Column(Text, nullable=False, default="")
+
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_search_documents_entity"),
+    )
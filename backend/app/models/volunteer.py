@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, Table
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -8,7 +8,9 @@ volunteer_subjects = Table(
     'volunteer_subjects',
     Base.metadata,
     Column('volunteer_id', Integer, ForeignKey('volunteers.id'), primary_key=True),
-    Column('subject_id', Integer, ForeignKey('subjects.id'), primary_key=True)
+    Column('subject_id', Integer, ForeignKey('subjects.id'), primary_key=True),
+    # A chave primária cobre volunteer -> subjects; este índice cobre subject -> volunteers
+    Index('ix_volunteer_subjects_subject_volunteer', 'subject_id', 'volunteer_id')
 )
 
 
@@ -0,0 +1,116 @@
+"""
+Paginação por cursor (keyset) para as listagens.
+
+O cursor é um token opaco com os valores das colunas de ordenação do último
+item da página (ex.: created_at e id). A próxima página filtra a partir desses
+valores em vez de usar OFFSET, então o custo não cresce com a profundidade e
+itens novos não deslocam as páginas seguintes. O token da próxima página vai
+no cabeçalho X-Next-Cursor; skip/limit continuam funcionando como alternativa.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, String, and_, or_, type_coerce
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Gera o token opaco a partir dos valores de ordenação"""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """Lê o token gerado por encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return values
+
+
+def _sqlite_datetime_forms(value: datetime) -> List[str]:
+    """Representações de texto com que o SQLite pode ter gravado o instante"""
+    # Valores vindos do Python são gravados com microssegundos, e o
+    # server_default CURRENT_TIMESTAMP sem. Os dois formatos precisam ser
+    # tratados como o mesmo instante, senão itens se repetem entre páginas.
+    full = value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if value.microsecond:
+        return [full]
+    return [value.strftime("%Y-%m-%d %H:%M:%S"), full]
+
+
+def _column_after(column, value, descending: bool, dialect_name: str):
+    """Condições "depois de" e "igual a" para uma coluna de ordenação"""
+    if isinstance(value, datetime) and isinstance(column.type, DateTime) and dialect_name == "sqlite":
+        text_column = type_coerce(column, String)
+        forms = _sqlite_datetime_forms(value)
+        after = text_column < forms[0] if descending else text_column > forms[-1]
+        return after, text_column.in_(forms)
+
+    after = column < value if descending else column > value
+    return after, column == value
+
+
+def keyset_filter(columns: Sequence, values: Sequence[Any], descending: bool, dialect_name: str):
+    """Filtro que seleciona as linhas posteriores ao cursor na ordenação"""
+    conditions = []
+    equal_prefix = []
+    for column, value in zip(columns, values):
+        after, equal = _column_after(column, value, descending, dialect_name)
+        conditions.append(and_(*equal_prefix, after))
+        equal_prefix.append(equal)
+    return or_(*conditions)
+
+
+def paginate(
+    query: Query,
+    response: Response,
+    columns: Sequence,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    descending: bool = True,
+    entity: Callable[[Any], Any] = lambda row: row,
+) -> list:
+    """
+    Ordena a consulta pelas colunas informadas e retorna uma página.
+    Com cursor, pagina por keyset; sem cursor, usa skip como OFFSET.
+    O cursor da próxima página é enviado no cabeçalho X-Next-Cursor.
+    """
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    query = query.order_by(*ordering)
+
+    if cursor:
+        dialect_name = query.session.get_bind().dialect.name
+        values = decode_cursor(cursor, len(columns))
+        query = query.filter(keyset_filter(columns, values, descending, dialect_name))
+    elif skip:
+        query = query.offset(skip)
+
+    # Um item a mais indica se existe próxima página
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    if len(rows) > limit and items:
+        last = entity(items[-1])
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column in columns]
+        )
+    return items
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+# Limite de itens por requisição de criação em lote
+BULK_MAX_ITEMS = 1000
+
+
+class BulkCreateRequest(BaseModel):
+    # Cada item é validado separadamente, para que um item inválido não rejeite o lote
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+    all_or_nothing: bool = False  # Se algum item for inválido, nada é criado
+
+
+class BulkItemResult(BaseModel):
+    index: int  # Posição do item na lista enviada
+    success: bool
+    id: Optional[int] = None
+    errors: Optional[List[str]] = None
+
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional
 from app.models.lesson import LessonType, LessonStatus
@@ -13,8 +13,8 @@ class LessonBase(BaseModel):
     duration_minutes: int = 60
     location_address: Optional[str] = None
     location_city: Optional[str] = None
-    location_latitude: Optional[str] = None
-    location_longitude: Optional[str] = None
+    location_latitude: Optional[float] = Field(None, ge=-90, le=90)
+    location_longitude: Optional[float] = Field(None, ge=-180, le=180)
     meeting_link: Optional[str] = None
     meeting_platform: Optional[str] = None
 
@@ -30,6 +30,8 @@ class LessonUpdate(BaseModel):
     duration_minutes: Optional[int] = None
     location_address: Optional[str] = None
     location_city: Optional[str] = None
+    location_latitude: Optional[float] = Field(None, ge=-90, le=90)
+    location_longitude: Optional[float] = Field(None, ge=-180, le=180)
     meeting_link: Optional[str] = None
     meeting_platform: Optional[str] = None
     status: Optional[LessonStatus] = None
@@ -55,3 +57,13 @@ class LessonResponse(LessonBase):
     updated_at: Optional[datetime] = None
     
     model_config = ConfigDict(from_attributes=True)
+
+
+class LessonAvailableResponse(LessonResponse):
+    # Preenchida só na busca por proximidade
+    distance_km: Optional[float] = None
+
+
+class LessonMatchResponse(LessonResponse):
+    # 2: presencial na cidade do voluntário, 1: online, 0: presencial em outra cidade
+    match_score: int
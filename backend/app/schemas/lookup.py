@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LookupResponse(BaseModel, Generic[T]):
+    # Um item por id pedido, na mesma ordem; null quando o id não existe
+    items: List[Optional[T]]
+    missing: List[int]
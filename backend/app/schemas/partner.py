@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime
 from typing import Optional
 from app.models.partner import PartnerType
@@ -11,8 +11,8 @@ class PartnerLocationBase(BaseModel):
     address: Optional[str] = None
     city: Optional[str] = None
     state: Optional[str] = None
-    latitude: Optional[str] = None
-    longitude: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     phone: Optional[str] = None
     email: Optional[EmailStr] = None
     website: Optional[str] = None
@@ -30,8 +30,8 @@ class PartnerLocationUpdate(BaseModel):
     address: Optional[str] = None
     city: Optional[str] = None
     state: Optional[str] = None
-    latitude: Optional[str] = None
-    longitude: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     phone: Optional[str] = None
     email: Optional[EmailStr] = None
     website: Optional[str] = None
@@ -46,3 +46,7 @@ class PartnerLocationResponse(PartnerLocationBase):
     updated_at: Optional[datetime] = None
     
     model_config = ConfigDict(from_attributes=True)
+
+
+class PartnerNearbyResponse(PartnerLocationResponse):
+    distance_km: float
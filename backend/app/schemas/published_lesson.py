@@ -25,6 +25,7 @@ class PublishedLessonResponse(PublishedLessonBase):
     media_type: Optional[str] = None
     views_count: int
     likes_count: int
+    liked_by_me: bool = False
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SearchHit(BaseModel):
+    entity_type: str  # "news", "published_lesson", "subject", "partner", "volunteer"
+    entity_id: int
+    title: str
+    snippet: Optional[str] = None  # Trecho destacado com <mark>, só no SQLite
+    score: Optional[float] = None  # Relevância (maior é melhor), só no SQLite
@@ -0,0 +1,142 @@
+"""
+Índice de busca geral: notícias, aulas publicadas, disciplinas, parceiros e
+perfis de voluntário.
+
+Cada item pesquisável vira uma linha em search_documents (tipo, id, título e
+corpo). O índice é atualizado pelas próprias rotas que alteram os itens, na
+mesma transação da alteração: reindex() apaga os documentos dos ids
+informados e os gera de novo a partir das tabelas de origem, então criação,
+edição e exclusão usam a mesma chamada (itens apagados ou inativos
+simplesmente não geram documento).
+
+No SQLite, a tabela FTS5 search_fts (conteúdo externo, mantida por triggers
+em search_documents, criados pela migração 0005_search_index) responde à busca
+com ranking BM25 e trechos destacados.
+Nos demais bancos a busca usa ILIKE em search_documents.
+"""
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import Float, Integer, delete, func, insert, literal, select, text
+from sqlalchemy.orm import Session
+from app.models.news import News
+from app.models.partner import PartnerLocation
+from app.models.published_lesson import PublishedLesson
+from app.models.search import SearchDocument
+from app.models.subject import Subject
+from app.models.user import User
+from app.models.volunteer import Volunteer, volunteer_subjects
+
+FTS_TABLE = "search_fts"
+
+# Peso de cada coluna no BM25: título e corpo
+BM25_WEIGHTS = (5.0, 1.0)
+
+
+def _text(*columns):
+    """Concatena colunas de texto opcionais, separadas por espaço"""
+    result = func.coalesce(columns[0], "")
+    for column in columns[1:]:
+        result = result + " " + func.coalesce(column, "")
+    return func.trim(result)
+
+
+def _news_documents():
+    return News.id, select(News.id, News.title, _text(
+        News.content, News.event_location, News.campaign_goal
+    )).where(News.is_active == True)
+
+
+def _published_lesson_documents():
+    subject_name = select(Subject.name).where(Subject.id == PublishedLesson.subject_id).scalar_subquery()
+    return PublishedLesson.id, select(
+        PublishedLesson.id, PublishedLesson.title, _text(PublishedLesson.description, subject_name)
+    )
+
+
+def _subject_documents():
+    return Subject.id, select(Subject.id, Subject.name, _text(Subject.description, Subject.category))
+
+
+def _partner_documents():
+    return PartnerLocation.id, select(PartnerLocation.id, PartnerLocation.name, _text(
+        PartnerLocation.description, PartnerLocation.address, PartnerLocation.city, PartnerLocation.state
+    )).where(PartnerLocation.is_active == True)
+
+
+def _volunteer_documents():
+    subject_names = (
+        select(func.aggregate_strings(Subject.name, " "))
+        .select_from(volunteer_subjects.join(Subject, Subject.id == volunteer_subjects.c.subject_id))
+        .where(volunteer_subjects.c.volunteer_id == Volunteer.id)
+        .scalar_subquery()
+    )
+    return Volunteer.id, select(Volunteer.id, User.name, _text(
+        subject_names, Volunteer.institution, User.location_city, User.bio
+    )).join(User, Volunteer.user_id == User.id)
+
+
+# Tipos indexados; cada função devolve a coluna de id e a consulta (id, título, corpo)
+SOURCES = {
+    "news": _news_documents,
+    "published_lesson": _published_lesson_documents,
+    "subject": _subject_documents,
+    "partner": _partner_documents,
+    "volunteer": _volunteer_documents,
+}
+
+
+def reindex(db, entity_type: str, ids=None):
+    """
+    Gera de novo os documentos dos itens (lista de ids ou subconsulta; None
+    reindexa o tipo inteiro). Aceita Session ou Connection e não faz commit;
+    nas rotas assíncronas, chame com await db.run_sync(reindex, ...).
+    """
+    if isinstance(ids, list) and not ids:
+        return
+    if isinstance(db, Session):
+        # As leituras abaixo precisam ver as alterações ainda não enviadas
+        db.flush()
+
+    documents = SearchDocument.__table__
+    id_column, source = SOURCES[entity_type]()
+    remove = delete(documents).where(documents.c.entity_type == entity_type)
+    if ids is not None:
+        remove = remove.where(documents.c.entity_id.in_(ids))
+        source = source.where(id_column.in_(ids))
+
+    db.execute(remove)
+    db.execute(insert(documents).from_select(
+        ["entity_type", "entity_id", "title", "body"],
+        source.with_only_columns(literal(entity_type), *source.selected_columns),
+    ))
+
+
+def rebuild(connection):
+    """Reindexa todos os tipos (migração e geração de dados em massa)"""
+    for entity_type in SOURCES:
+        reindex(connection, entity_type)
+
+
+def document_hits(match: str):
+    """Subconsulta com doc_id (id em search_documents) e rank (BM25, menor é melhor)"""
+    weights = ", ".join(f"{weight:g}" for weight in BM25_WEIGHTS)
+    statement = text(f"""
+        WITH matches AS MATERIALIZED (
+            SELECT rowid AS doc_id, bm25({FTS_TABLE}, {weights}) AS rank
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH :match
+        )
+        SELECT doc_id, rank FROM matches
+    """).bindparams(match=match)
+    return statement.columns(doc_id=Integer, rank=Float).subquery("search_hits")
+
+
+def parse_types(types: Optional[str]) -> Optional[List[str]]:
+    """Lê o filtro de tipos (types=news,partner); None quando ausente"""
+    if not types:
+        return None
+    entity_types = [entity_type.strip() for entity_type in types.split(",") if entity_type.strip()]
+    for entity_type in entity_types:
+        if entity_type not in SOURCES:
+            raise HTTPException(status_code=400, detail=f"Tipo de busca inválido: {entity_type}")
+    return entity_types
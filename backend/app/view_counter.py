@@ -0,0 +1,145 @@
+"""
+Contador de visualizações com buffer em memória.
+
+As rotas de detalhe só registram a visualização aqui, sem escrever no banco.
+Os incrementos são acumulados por (tabela, id) e gravados em lote, com um
+UPDATE executemany por tabela, a cada VIEW_FLUSH_INTERVAL segundos, a cada
+VIEW_FLUSH_THRESHOLD visualizações e no encerramento da aplicação. Ao atingir o
+limite, a requisição só acorda a tarefa de fundo; a gravação nunca acontece
+dentro de uma leitura.
+
+O UPDATE soma o delta (views_count = views_count + n) em vez de gravar o total,
+então vários workers, cada um com o seu buffer, podem gravar sem perder
+incrementos uns dos outros.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from sqlalchemy import bindparam, update
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+from app.database import Base, engine
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Tabelas com coluna views_count que passam pelo buffer
+COUNTED_TABLES = {"forum_topics", "news", "published_lessons"}
+
+
+class ViewCounter:
+    """Acumula visualizações e as grava em lote"""
+
+    def __init__(self, flush_interval: float, flush_threshold: int):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending: Dict[Tuple[str, int], int] = defaultdict(int)
+        self._events = 0
+        self._lock = threading.Lock()
+        # Tarefa de fundo em execução: loop e evento usados para acordá-la
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._wake_requested = False
+
+    def increment(self, table: str, row_id: int) -> int:
+        """
+        Registra uma visualização e retorna quantas visualizações do item ainda
+        não estavam gravadas no momento da leitura (para somar ao valor lido)
+        """
+        if table not in COUNTED_TABLES:
+            raise ValueError(f"Tabela sem contador de visualizações: {table}")
+
+        with self._lock:
+            self._pending[(table, row_id)] += 1
+            self._events += 1
+            pending = self._pending[(table, row_id)]
+            should_wake = self._events >= self.flush_threshold and not self._wake_requested
+            if should_wake:
+                self._wake_requested = True
+
+        if should_wake:
+            self._request_flush()
+        return pending
+
+    def _request_flush(self):
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None or loop.is_closed():
+            # Sem a tarefa de fundo (scripts): gravar agora, sem propagar erros
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Falha ao gravar visualizações; nova tentativa na próxima gravação")
+            return
+        # increment roda tanto no loop quanto nas threads das rotas síncronas
+        loop.call_soon_threadsafe(wake.set)
+
+    def pending(self, table: str, row_id: int) -> int:
+        """Visualizações do item ainda não gravadas neste processo"""
+        with self._lock:
+            return self._pending.get((table, row_id), 0)
+
+    def _drain(self) -> Dict[Tuple[str, int], int]:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._events = 0
+            self._wake_requested = False
+        return pending
+
+    def _restore(self, pending: Dict[Tuple[str, int], int]):
+        """Devolve ao buffer incrementos que não puderam ser gravados"""
+        with self._lock:
+            for key, count in pending.items():
+                self._pending[key] += count
+                self._events += count
+
+    def flush(self) -> int:
+        """Grava os incrementos acumulados; retorna quantos itens foram atualizados"""
+        pending = self._drain()
+        if not pending:
+            return 0
+
+        by_table: Dict[str, list] = defaultdict(list)
+        for (table, row_id), count in pending.items():
+            by_table[table].append({"row_id": row_id, "delta": count})
+
+        try:
+            with engine.begin() as connection:
+                for table_name, rows in by_table.items():
+                    table = Base.metadata.tables[table_name]
+                    statement = (
+                        update(table)
+                        .where(table.c.id == bindparam("row_id"))
+                        .values(views_count=table.c.views_count + bindparam("delta"))
+                    )
+                    connection.execute(statement, rows)
+        except Exception:
+            self._restore(pending)
+            raise
+        return len(pending)
+
+    async def run_periodic(self):
+        """
+        Tarefa de fundo que grava o buffer a cada flush_interval segundos, ou
+        antes, quando increment atinge flush_threshold
+        """
+        self._loop, self._wake = asyncio.get_running_loop(), asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                try:
+                    await run_in_threadpool(self.flush)
+                except Exception:
+                    logger.exception("Falha ao gravar visualizações; nova tentativa no próximo ciclo")
+        finally:
+            self._loop = self._wake = None
+
+
+# Instância global do contador
+view_counter = ViewCounter(settings.view_flush_interval, settings.view_flush_threshold)
@@ -0,0 +1,42 @@
+"""
+Canais de notificação do WebSocket.
+
+O cliente assina os canais que lhe interessam enviando pelo /ws
+{"action": "subscribe", "channels": [...]} (ou "unsubscribe"). Canais:
+
+- news: notícias, eventos e campanhas
+- subjects: disciplinas criadas, alteradas ou removidas
+- partners: locais parceiros criados
+- subject:{id}: solicitações de aula e voluntários da disciplina
+- lesson:{id}: andamento da aula
+- user:{id}: perfis e aulas do usuário
+
+Conexões que nunca assinaram nada recebem todos os eventos, como antes dos
+canais.
+"""
+import re
+
+NEWS = "news"
+SUBJECTS = "subjects"
+PARTNERS = "partners"
+
+# Máximo de canais assinados por conexão
+MAX_CHANNELS_PER_CONNECTION = 200
+
+CHANNEL_PATTERN = re.compile(r"(news|subjects|partners|(subject|lesson|user):[1-9][0-9]*)")
+
+
+def is_valid(channel: str) -> bool:
+    return CHANNEL_PATTERN.fullmatch(channel) is not None
+
+
+def subject_channel(subject_id: int) -> str:
+    return f"subject:{subject_id}"
+
+
+def lesson_channel(lesson_id: int) -> str:
+    return f"lesson:{lesson_id}"
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
@@ -0,0 +1,44 @@
+"""
+Codificação das mensagens do WebSocket.
+
+O cliente escolhe a codificação ao conectar (/ws?encoding=msgpack); o padrão
+é JSON em frames de texto. Com MessagePack os eventos vão em frames binários,
+e os comandos do cliente podem ser enviados em JSON (texto) ou MessagePack
+(binário). O MessagePack depende do pacote msgpack; sem ele, só JSON é aceito.
+"""
+import json
+from typing import Any, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+# Mensagem já codificada: texto (JSON) ou bytes (MessagePack)
+Frame = Union[str, bytes]
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return (JSON, MSGPACK) if msgpack is not None else (JSON,)
+
+
+def encode(message: Any, encoding: str) -> Frame:
+    """Codifica a mensagem (o mesmo JSON compacto de WebSocket.send_json)"""
+    if encoding == MSGPACK:
+        return msgpack.packb(message)
+    return json.dumps(message, separators=(",", ":"))
+
+
+def decode(data: Frame) -> Any:
+    """Decodifica um comando do cliente; levanta ValueError se for inválido"""
+    if isinstance(data, str):
+        return json.loads(data)
+    if msgpack is None:
+        raise ValueError("MessagePack indisponível")
+    try:
+        return msgpack.unpackb(data)
+    except Exception as exc:
+        raise ValueError(str(exc)) from exc
@@ -1,14 +1,77 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from app.websocket.manager import manager
+from app.websocket import channels
+from app.websocket.encoding import JSON, Frame, available_encodings, decode
+from app.websocket.manager import TooManyChannels, manager
+
+ACTIONS = ("subscribe", "unsubscribe")
+
+# Código de fechamento para codificação não suportada (RFC 6455: Unsupported Data)
+UNSUPPORTED_ENCODING_CLOSE_CODE = 1003
+
+
+def error(detail: str) -> dict:
+    return {"type": "error", "data": {"detail": detail}}
+
+
+def handle_command(websocket: WebSocket, data: Frame):
+    """
+    Trata um comando do cliente ({"action": ..., "channels": [...]}) e
+    enfileira a resposta. Mensagens que não são comandos (ex.: "ping" para
+    manter a conexão) são ignoradas.
+    """
+    try:
+        command = decode(data)
+    except ValueError:
+        return
+    if not isinstance(command, dict) or "action" not in command:
+        return
+
+    action = command["action"]
+    requested = command.get("channels")
+    if action not in ACTIONS:
+        manager.send(websocket, error("Ação inválida; use subscribe ou unsubscribe"))
+        return
+    if not isinstance(requested, list) or not all(isinstance(channel, str) for channel in requested):
+        manager.send(websocket, error("Informe channels como uma lista de nomes de canais"))
+        return
+    invalid = [channel for channel in requested if not channels.is_valid(channel)]
+    if invalid:
+        manager.send(websocket, error(f"Canais inválidos: {', '.join(invalid[:10])}"))
+        return
+
+    if action == "subscribe":
+        try:
+            subscribed = manager.subscribe(websocket, requested)
+        except TooManyChannels:
+            manager.send(websocket, error(
+                f"Limite de {channels.MAX_CHANNELS_PER_CONNECTION} canais por conexão"
+            ))
+            return
+    else:
+        subscribed = manager.unsubscribe(websocket, requested)
+    manager.send(websocket, {"type": "subscriptions", "data": {"channels": sorted(subscribed)}})
 
 
 async def websocket_endpoint(websocket: WebSocket):
-    """Endpoint WebSocket para notificações em tempo real"""
-    await manager.connect(websocket)
+    """Endpoint WebSocket para notificações em tempo real (?encoding=json|msgpack)"""
+    encoding = websocket.query_params.get("encoding", JSON)
+    if encoding not in available_encodings():
+        await websocket.accept()
+        await websocket.close(
+            code=UNSUPPORTED_ENCODING_CLOSE_CODE,
+            reason=f"Codificação não suportada; use {' ou '.join(available_encodings())}",
+        )
+        return
+
+    await manager.connect(websocket, encoding)
     try:
         while True:
-            # Mantém a conexão aberta e aguarda mensagens
-            data = await websocket.receive_text()
-            # Você pode processar mensagens recebidas do cliente aqui, se necessário
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            data = message.get("text")
+            handle_command(websocket, data if data is not None else message.get("bytes"))
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
@@ -1,37 +1,238 @@
+"""
+Gerenciador de conexões WebSocket.
+
+publish() e broadcast() não enviam nada diretamente: colocam a mensagem numa
+fila de saída e retornam, sem depender de quantos clientes estão conectados
+nem da rede de cada um. Uma tarefa de distribuição copia cada mensagem para a
+fila das conexões que devem recebê-la (limitada a WEBSOCKET_QUEUE_SIZE
+mensagens), e uma tarefa por conexão envia as mensagens da sua fila, cada
+envio limitado a WEBSOCKET_SEND_TIMEOUT segundos.
+
+Cada mensagem é codificada uma única vez por codificação (JSON ou
+MessagePack, ver app.websocket.encoding) e o mesmo texto ou buffer é
+colocado na fila de todas as conexões que a recebem.
+
+Um índice canal -> conexões (ver app.websocket.channels) faz a distribuição
+de publish() percorrer só os assinantes dos canais da mensagem, mais as
+conexões que nunca assinaram nada e por isso recebem tudo.
+
+Um cliente lento, cuja fila enche ou cujo envio passa do tempo limite, é
+desconectado (código 1013, "tente novamente mais tarde") em vez de atrasar os
+demais; ao reconectar, ele recarrega o estado pela API.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, NamedTuple, Optional, Set
 from fastapi import WebSocket
-from typing import List
-import json
+from app.config import get_settings
+from app.websocket.channels import MAX_CHANNELS_PER_CONNECTION
+from app.websocket.encoding import JSON, Frame, encode
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Código de fechamento enviado a clientes lentos (RFC 6455: Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ConnectionStats(NamedTuple):
+    connections: int
+    queued_messages: int
+    slow_consumers_dropped: int
+    subscriptions: int
+
+
+class Client:
+    """Conexão de um cliente: fila de saída, tarefa que a envia e canais assinados"""
+
+    def __init__(self, websocket: WebSocket, queue_size: int, encoding: str = JSON):
+        self.websocket = websocket
+        self.encoding = encoding
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.channels: Set[str] = set()
+
+
+class TooManyChannels(Exception):
+    pass
 
 
 class ConnectionManager:
     """Gerenciador de conexões WebSocket"""
-    
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
 
-    async def connect(self, websocket: WebSocket):
-        """Aceita uma nova conexão WebSocket"""
+    def __init__(self, queue_size: int, send_timeout: float):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.active_connections: Dict[WebSocket, Client] = {}
+        self.slow_consumers_dropped = 0
+        self._subscribers: Dict[str, Set[Client]] = {}
+        # Conexões que nunca assinaram nem cancelaram canais: recebem tudo
+        self._receive_all: Set[Client] = set()
+        self._outbox: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        # Fechamentos em andamento (referência para as tarefas não serem coletadas)
+        self._closing: Set[asyncio.Task] = set()
+
+    async def connect(self, websocket: WebSocket, encoding: str = JSON):
+        """Aceita uma nova conexão WebSocket, que recebe as mensagens em encoding"""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = Client(websocket, self.queue_size, encoding)
+        client.writer = asyncio.create_task(self._write(client))
+        self.active_connections[websocket] = client
+        self._receive_all.add(client)
 
     def disconnect(self, websocket: WebSocket):
-        """Remove uma conexão WebSocket"""
-        self.active_connections.remove(websocket)
+        """Remove uma conexão WebSocket (pode ser chamado mais de uma vez)"""
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        self._receive_all.discard(client)
+        self._remove_subscriptions(client, list(client.channels))
+        if client.writer is not None:
+            client.writer.cancel()
+
+    def subscribe(self, websocket: WebSocket, channels: Iterable[str]) -> Set[str]:
+        """
+        Assina os canais (já validados) e retorna os canais assinados pela
+        conexão. Levanta TooManyChannels acima do limite por conexão.
+        """
+        client = self.active_connections[websocket]
+        new_channels = set(channels) - client.channels
+        if len(client.channels) + len(new_channels) > MAX_CHANNELS_PER_CONNECTION:
+            raise TooManyChannels()
+        self._receive_all.discard(client)
+        for channel in new_channels:
+            self._subscribers.setdefault(channel, set()).add(client)
+        client.channels |= new_channels
+        return client.channels
+
+    def unsubscribe(self, websocket: WebSocket, channels: Iterable[str]) -> Set[str]:
+        """Cancela a assinatura dos canais e retorna os que continuam assinados"""
+        client = self.active_connections[websocket]
+        # Quem cancela deixa de receber tudo, mesmo sem ter assinado antes
+        self._receive_all.discard(client)
+        self._remove_subscriptions(client, channels)
+        return client.channels
+
+    def send(self, websocket: WebSocket, message: dict):
+        """Enfileira uma mensagem só para a conexão (respostas aos comandos do cliente)"""
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return
+        try:
+            client.queue.put_nowait(encode(message, client.encoding))
+        except asyncio.QueueFull:
+            self._drop_slow(client, "fila cheia")
+
+    async def publish(self, channels: Iterable[str], message: dict):
+        """Enfileira uma mensagem para os assinantes dos canais (e as conexões que recebem tudo)"""
+        self._ensure_dispatcher()
+        self._outbox.put_nowait((frozenset(channels), message))
 
     async def broadcast(self, message: dict):
-        """Envia uma mensagem para todas as conexões ativas"""
-        disconnected = []
-        for connection in self.active_connections:
+        """Enfileira uma mensagem para todas as conexões ativas, assinantes ou não"""
+        self._ensure_dispatcher()
+        self._outbox.put_nowait((None, message))
+
+    def stats(self) -> ConnectionStats:
+        """Conexões ativas, mensagens aguardando envio, clientes lentos desconectados e assinaturas"""
+        queued = sum(client.queue.qsize() for client in self.active_connections.values())
+        subscriptions = sum(len(clients) for clients in self._subscribers.values())
+        return ConnectionStats(len(self.active_connections), queued, self.slow_consumers_dropped, subscriptions)
+
+    async def shutdown(self):
+        """Encerra a distribuição e as tarefas de envio (desligamento da aplicação)"""
+        tasks = [client.writer for client in self.active_connections.values() if client.writer is not None]
+        for websocket in list(self.active_connections):
+            self.disconnect(websocket)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            tasks.append(self._dispatcher)
+        await asyncio.gather(*tasks, *self._closing, return_exceptions=True)
+        self._dispatcher = None
+        self._outbox = None
+
+    def _ensure_dispatcher(self):
+        # A tarefa é criada no primeiro broadcast, no loop em execução (e de
+        # novo se o loop anterior foi encerrado, como entre clientes de teste)
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._outbox = asyncio.Queue()
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    def _remove_subscriptions(self, client: Client, channels: Iterable[str]):
+        for channel in channels:
+            client.channels.discard(channel)
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def _recipients(self, channels: Optional[frozenset]) -> Set[Client]:
+        if channels is None:
+            return set(self.active_connections.values())
+        recipients = set(self._receive_all)
+        for channel in channels:
+            recipients.update(self._subscribers.get(channel, ()))
+        return recipients
+
+    async def _dispatch(self):
+        """Copia cada mensagem da fila de saída para a fila das conexões que a recebem"""
+        while True:
+            channels, message = await self._outbox.get()
+            frames: Dict[str, Frame] = {}
+            for client in self._recipients(channels):
+                frame = frames.get(client.encoding)
+                if frame is None:
+                    frame = frames[client.encoding] = encode(message, client.encoding)
+                try:
+                    client.queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    self._drop_slow(client, "fila cheia")
+
+    async def _write(self, client: Client):
+        """Envia as mensagens da fila da conexão, com tempo limite por envio"""
+        while True:
+            frame = await client.queue.get()
+            if isinstance(frame, bytes):
+                sending = client.websocket.send_bytes(frame)
+            else:
+                sending = client.websocket.send_text(frame)
             try:
-                await connection.send_json(message)
+                await asyncio.wait_for(sending, self.send_timeout)
+            except asyncio.TimeoutError:
+                self._drop_slow(client, "tempo de envio esgotado")
+                return
             except Exception:
-                disconnected.append(connection)
-        
-        # Remove conexões que falharam
-        for connection in disconnected:
-            if connection in self.active_connections:
-                self.active_connections.remove(connection)
+                # Conexão já encerrada pelo cliente
+                self.disconnect(client.websocket)
+                return
+            # Antes do Python 3.12, o wait_for engole o cancelamento que chega
+            # junto com o fim do envio; sem esta verificação, a tarefa de uma
+            # conexão já removida voltaria a aguardar a fila para sempre
+            if self.active_connections.get(client.websocket) is not client:
+                return
+
+    def _drop_slow(self, client: Client, reason: str):
+        if self.active_connections.get(client.websocket) is not client:
+            return
+        self.slow_consumers_dropped += 1
+        logger.warning("Cliente WebSocket lento desconectado (%s)", reason)
+        self.disconnect(client.websocket)
+        task = asyncio.get_running_loop().create_task(self._close(client.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), self.send_timeout)
+        except Exception:
+            # O envio interrompido pode ter deixado a conexão sem condições de
+            # fechar normalmente; o servidor a encerra quando o cliente cair
+            pass
 
 
 # Instância global do gerenciador
-manager = ConnectionManager()
+manager = ConnectionManager(settings.websocket_queue_size, settings.websocket_send_timeout)
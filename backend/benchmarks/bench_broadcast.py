@@ -0,0 +1,126 @@
+"""
+Mede o custo por conexão de distribuir um evento pelo WebSocket
+Execute: python benchmarks/bench_broadcast.py [--connections 100,1000,5000] [--messages 20]
+
+Não abre sockets: as conexões são objetos que só somam o que receberam, então o
+tempo medido é o do ConnectionManager (distribuição, codificação e entrega pelas
+tarefas de envio), do publish até a última conexão receber o último evento. Para
+comparação, a coluna "antes" usa o mesmo gerenciador codificando a mensagem uma
+vez por conexão, como fazia o send_json chamado para cada socket. O evento é um
+news_created com uma notícia de ~3,5 KB.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class Deliveries:
+    """Contagem regressiva dos envios esperados"""
+
+    def __init__(self, expected: int):
+        self.pending = expected
+        self.done = asyncio.Event()
+
+    def delivered(self):
+        self.pending -= 1
+        if self.pending == 0:
+            self.done.set()
+
+
+class FakeWebSocket:
+    """Conexão que só soma os bytes recebidos"""
+
+    def __init__(self, deliveries: Deliveries):
+        self.deliveries = deliveries
+        self.bytes_received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.bytes_received += len(data)
+        self.deliveries.delivered()
+
+    async def send_bytes(self, data: bytes):
+        self.bytes_received += len(data)
+        self.deliveries.delivered()
+
+
+def news_event() -> dict:
+    content = "Inscrições abertas para o mutirão de reforço escolar. " * 40
+    return {
+        "type": "news_created",
+        "data": {
+            "id": 1234, "title": "Mutirão de reforço escolar no sábado", "summary": content[:200],
+            "content": content, "news_type": "event", "author_id": 1, "image_url": None,
+            "event_date": "2030-01-01T10:00:00", "event_location": "Recife",
+            "is_published": True, "is_featured": False, "views_count": 0,
+            "created_at": "2029-12-01T12:00:00", "updated_at": None,
+        },
+    }
+
+
+def per_connection_manager(base):
+    """Gerenciador que codifica a mensagem de novo para cada conexão (comportamento antigo)"""
+    from app.websocket.encoding import encode
+
+    class PerConnectionEncoding(base):
+        async def _dispatch(self):
+            while True:
+                channels, message = await self._outbox.get()
+                for client in self._recipients(channels):
+                    client.queue.put_nowait(encode(message, client.encoding))
+
+    return PerConnectionEncoding
+
+
+async def measure(connections: int, messages: int, encoding: str, encode_once: bool = True) -> float:
+    """Microssegundos por conexão para distribuir um evento a todas as conexões"""
+    from app.websocket.manager import ConnectionManager
+
+    manager_class = ConnectionManager if encode_once else per_connection_manager(ConnectionManager)
+    manager = manager_class(queue_size=messages, send_timeout=5.0)
+    deliveries = Deliveries(connections * messages)
+    for _ in range(connections):
+        await manager.connect(FakeWebSocket(deliveries), encoding)
+    event = news_event()
+
+    start = time.perf_counter()
+    for _ in range(messages):
+        await manager.publish(["news"], event)
+    await deliveries.done.wait()
+    elapsed = time.perf_counter() - start
+
+    assert manager.stats().connections == connections, "conexões desconectadas durante a medição"
+    await manager.shutdown()
+    return elapsed / (messages * connections) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo por conexão da distribuição de eventos WebSocket")
+    parser.add_argument("--connections", default="100,1000,5000", help="números de conexões, separados por vírgula")
+    parser.add_argument("--messages", type=int, default=20, help="eventos distribuídos em cada medição")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.websocket.encoding import JSON, MSGPACK, available_encodings, encode
+
+    event = news_event()
+    encodings = available_encodings()
+    print("Tamanho do evento: " + ", ".join(f"{name} {len(encode(event, name))} bytes" for name in encodings))
+    if MSGPACK not in encodings:
+        print("(msgpack não instalado: medindo só JSON)")
+
+    print(f"{'conexões':>9}  {'json (antes)':>14}" + "".join(f"  {name:>14}" for name in encodings) + "   (µs por conexão e evento)")
+    for connections in (int(value) for value in args.connections.split(",")):
+        before = asyncio.run(measure(connections, args.messages, JSON, encode_once=False))
+        results = [asyncio.run(measure(connections, args.messages, name)) for name in encodings]
+        print(f"{connections:>9}  {before:>14.2f}" + "".join(f"  {result:>14.2f}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Dispara curtidas em paralelo e confere se nenhuma se perdeu
+Execute: python benchmarks/bench_likes.py [--likes 2000] [--workers 32]
+
+Usa um banco SQLite temporário. Cada usuário curte uma resposta do fórum e uma
+aula publicada, todos ao mesmo tempo, e metade das curtidas é repetida (deve ser
+ignorada); ao final o likes_count gravado precisa ser igual ao número de
+usuários. O script termina com código 1 se não for.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concorrência dos contadores de curtidas")
+    parser.add_argument("--likes", type=int, default=2000, help="usuários curtindo cada alvo")
+    parser.add_argument("--workers", type=int, default=32, help="requisições simultâneas")
+    args = parser.parse_args()
+
+    # Banco temporário, configurado antes de importar a aplicação
+    workdir = tempfile.mkdtemp(prefix="bench_likes_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.chdir(workdir)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+    from app.database import engine
+    from app.models.user import User, UserRole
+    from main import create_app
+
+    with TestClient(create_app()) as client:
+        user = client.post("/users/", json={
+            "email": "bench@example.com", "name": "Bench", "password": "bench", "role": "volunteer"
+        }).json()["user"]
+        subject = client.post("/subjects/", json={"name": "Benchmark"}).json()
+        volunteer = client.post("/profiles/volunteers", json={
+            "user_id": user["id"], "volunteer_type": "teacher", "subject_ids": [subject["id"]]
+        }).json()
+        topic = client.post("/forum/topics", json={
+            "subject_id": subject["id"], "user_id": user["id"], "title": "Benchmark", "content": "curtidas"
+        }).json()
+        reply = client.post("/forum/replies", json={
+            "topic_id": topic["id"], "user_id": user["id"], "content": "resposta"
+        }).json()
+        lesson = client.post("/published-lessons/", data={
+            "subject_id": subject["id"], "title": "Benchmark", "volunteer_id": volunteer["id"]
+        }).json()
+
+        # Usuários que vão curtir, inseridos em lote
+        with engine.begin() as connection:
+            connection.execute(insert(User), [
+                {"email": f"fan{i}@example.com", "name": f"Fã {i}", "password_hash": "-", "role": UserRole.LEARNER}
+                for i in range(args.likes)
+            ])
+        fans = list(range(user["id"] + 1, user["id"] + 1 + args.likes))
+
+        targets = [f"/forum/replies/{reply['id']}/like", f"/published-lessons/{lesson['id']}/like"]
+        # Cada usuário curte os dois alvos; metade repete a curtida
+        requests = [(target, fan) for fan in fans for target in targets]
+        requests += requests[::2]
+
+        def like(request) -> int:
+            target, fan = request
+            return client.post(f"{target}?user_id={fan}").status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            statuses = list(executor.map(like, requests))
+        elapsed = time.perf_counter() - start
+
+        reply_likes = client.get(f"/forum/topics/{topic['id']}/replies").json()[0]["likes_count"]
+        lesson_likes = client.get(f"/published-lessons/{lesson['id']}").json()["likes_count"]
+
+    failures = len([code for code in statuses if code != 200])
+    print(f"{len(statuses)} curtidas em {elapsed:.2f} s ({len(statuses) / elapsed:.0f} req/s), {failures} com erro")
+    print(f"resposta do fórum: {reply_likes}/{args.likes}")
+    print(f"aula publicada:    {lesson_likes}/{args.likes}")
+
+    if failures or reply_likes != args.likes or lesson_likes != args.likes:
+        print("❌ Curtidas perdidas")
+        sys.exit(1)
+    print("✅ Nenhuma curtida perdida")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Confere o número de consultas SQL das leituras de perfis (regressão de N+1)
+Execute: python benchmarks/check_query_counts.py [--page-sizes 1,2,30,100]
+
+Usa um banco SQLite temporário com voluntários e aprendizes, cada um com
+várias disciplinas, e conta as consultas de cada requisição com o
+RequestQueryStats da instrumentação SQL. A busca de voluntários precisa fazer
+o mesmo número de consultas (2: perfis e disciplinas) qualquer que seja o
+tamanho da página, assim como os detalhes de voluntário e aprendiz. O script
+termina com código 1 se alguma rota passar do esperado.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Perfis e disciplinas: uma consulta para cada, independente da quantidade
+EXPECTED_QUERIES = 2
+PROFILES = 120
+SUBJECTS_PER_PROFILE = 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas SQL por requisição das leituras de perfis")
+    parser.add_argument("--page-sizes", default="1,2,30,100", help="tamanhos de página da busca, separados por vírgula")
+    args = parser.parse_args()
+
+    # Banco temporário, configurado antes de importar a aplicação
+    workdir = tempfile.mkdtemp(prefix="check_query_counts_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/check.db"
+    os.environ["SQL_INSTRUMENTATION"] = "true"
+    os.chdir(workdir)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+    from app import instrumentation
+    from app.database import engine
+    from app.models.learner import Learner, learner_interests
+    from app.models.subject import Subject
+    from app.models.user import User, UserRole
+    from app.models.volunteer import Volunteer, volunteer_subjects
+    from main import create_app
+
+    # O middleware entrega as estatísticas de cada requisição a report_request
+    requests = []
+    report_request = instrumentation.report_request
+
+    def record_request(stats):
+        requests.append(stats)
+        report_request(stats)
+
+    instrumentation.report_request = record_request
+
+    def query_count(client, path: str):
+        requests.clear()
+        response = client.get(path)
+        response.raise_for_status()
+        return requests[-1], response.json()
+
+    with TestClient(create_app()) as client:
+        with engine.begin() as connection:
+            connection.execute(insert(Subject), [{"name": f"Disciplina {i}"} for i in range(10)])
+            connection.execute(insert(User), [
+                {
+                    "email": f"perfil{i}@example.com", "name": f"Perfil {i}", "password_hash": "-",
+                    "role": UserRole.VOLUNTEER if i % 2 == 0 else UserRole.LEARNER,
+                }
+                for i in range(2 * PROFILES)
+            ])
+            connection.execute(insert(Volunteer), [
+                {"user_id": 2 * i + 1, "volunteer_type": "teacher"} for i in range(PROFILES)
+            ])
+            connection.execute(insert(Learner), [{"user_id": 2 * i + 2} for i in range(PROFILES)])
+            connection.execute(insert(volunteer_subjects), [
+                {"volunteer_id": i + 1, "subject_id": (i + j) % 10 + 1}
+                for i in range(PROFILES) for j in range(SUBJECTS_PER_PROFILE)
+            ])
+            connection.execute(insert(learner_interests), [
+                {"learner_id": i + 1, "subject_id": (i + j) % 10 + 1}
+                for i in range(PROFILES) for j in range(SUBJECTS_PER_PROFILE)
+            ])
+
+        checks = []
+        for size in (int(value) for value in args.page_sizes.split(",")):
+            stats, volunteers = query_count(client, f"/profiles/volunteers?limit={size}")
+            assert len(volunteers) == min(size, PROFILES), "página incompleta"
+            checks.append((f"busca de voluntários ({size} por página)", stats))
+        for label, path in (
+            ("detalhe do voluntário", "/profiles/volunteers/1"),
+            ("voluntário pelo usuário", "/profiles/volunteers/user/1"),
+            ("detalhe do aprendiz", "/profiles/learners/1"),
+            ("aprendiz pelo usuário", "/profiles/learners/user/2"),
+        ):
+            stats, _ = query_count(client, path)
+            checks.append((label, stats))
+
+    failures = 0
+    for label, stats in checks:
+        ok = stats.count == EXPECTED_QUERIES
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {label}: {stats.count} consultas")
+        if not ok:
+            for shape, count in stats.shapes.most_common():
+                print(f"     {count}x {shape[:120]}")
+
+    if failures:
+        print(f"❌ {failures} rota(s) fora do esperado ({EXPECTED_QUERIES} consultas)")
+        sys.exit(1)
+    print(f"✅ Todas as leituras com {EXPECTED_QUERIES} consultas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Mede o tempo de import do main.py e de criação da aplicação
+Execute: python benchmarks/import_time.py [--budget-ms 2500] [--runs 5]
+
+Cada medição roda em um processo Python novo (cold start). O script termina
+com código 1 se o melhor tempo ultrapassar o orçamento definido.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Executado em um subprocesso limpo; imprime os tempos em JSON
+PROBE = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "total_ms": (created - start) * 1000,
+}))
+"""
+
+
+def measure() -> dict:
+    """Roda uma medição em um processo novo"""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de inicialização")
+    parser.add_argument("--runs", type=int, default=5, help="número de processos medidos")
+    parser.add_argument("--budget-ms", type=float, default=2500.0, help="orçamento para import + create_app")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    best = {key: min(run[key] for run in runs) for key in runs[0]}
+
+    print(f"import main:  {best['import_ms']:.1f} ms")
+    print(f"create_app(): {best['create_app_ms']:.1f} ms")
+    print(f"total:        {best['total_ms']:.1f} ms (orçamento {args.budget_ms:.0f} ms)")
+
+    if best["total_ms"] > args.budget_ms:
+        print("❌ Inicialização acima do orçamento")
+        sys.exit(1)
+    print("✅ Inicialização dentro do orçamento")
+
+
+if __name__ == "__main__":
+    main()
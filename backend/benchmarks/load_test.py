@@ -0,0 +1,406 @@
+"""
+Teste de carga HTTP de ponta a ponta, com percentis por rota e comparação com baseline
+Execute: python benchmarks/load_test.py [--users 2000] [--duration 20] [--concurrency 4]
+
+Gera um banco SQLite temporário com generate_dataset.py, sobe a aplicação com
+uvicorn dentro do próprio processo e dispara cenários realistas contra as rotas
+reais: leitura do feed, navegação no fórum, solicitação e aceite de aulas,
+curtidas, upload de aulas publicadas, buscas (geral, no fórum e por
+proximidade), sugestões de aulas, consultas por lista de ids e criação em lote.
+Ao final mostra vazão e p50/p95/p99 por
+rota e compara p50/p95 e vazão com benchmarks/baseline.json; termina com código
+1 se alguma rota piorou além da tolerância. Use --update-baseline para regravar o arquivo.
+
+Os números dependem da máquina: gere o baseline na mesma máquina (ou no mesmo
+runner de CI) em que a comparação vai rodar.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Pioras menores que isso (em ms) são consideradas ruído
+NOISE_FLOOR_MS = 5.0
+# Com poucas amostras a cauda é basicamente o pior caso; só comparar o p95 acima
+# disso (o p99 aparece no relatório, mas varia demais para reprovar a execução)
+MIN_SAMPLES_P95 = 200
+
+# Termos de busca (palavras usadas nos textos do generate_dataset.py)
+SEARCH_TERMS = ["dúvida", "exercício", "prova", "revisão", "conceito", "exemplo", "fórmula", "projeto"]
+# Centros das cidades do generate_dataset.py, onde ficam parceiros e aulas presenciais
+CITY_CENTERS = [(-23.55, -46.63), (-22.91, -43.17), (-8.05, -34.88), (-12.97, -38.50),
+                (-19.92, -43.94), (-25.43, -49.27), (-3.73, -38.52), (-30.03, -51.23)]
+LOOKUP_SIZE = 20
+BULK_SIZE = 20
+
+
+class Dataset:
+    """Ids existentes no banco gerado, sorteados pelos cenários"""
+
+    def __init__(self, database_path: str):
+        connection = sqlite3.connect(database_path)
+
+        def ids(query: str) -> List[int]:
+            return [row[0] for row in connection.execute(query)]
+
+        self.users = ids("SELECT id FROM users")
+        self.learners = ids("SELECT id FROM learners")
+        self.volunteers = ids("SELECT id FROM volunteers")
+        self.subjects = ids("SELECT id FROM subjects")
+        self.news = ids("SELECT id FROM news WHERE is_active = 1")
+        self.topics = ids("SELECT id FROM forum_topics")
+        self.replies = ids("SELECT id FROM forum_replies")
+        self.published_lessons = ids("SELECT id FROM published_lessons")
+        connection.close()
+
+
+class Client:
+    """Conexão HTTP keep-alive que mede cada requisição"""
+
+    def __init__(self, port: int, results: "Results"):
+        self.port = port
+        self.results = results
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+
+    def request(self, route: str, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[dict] = None) -> Tuple[int, object]:
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=headers or {})
+            response = self.connection.getresponse()
+            payload = response.read()
+            status = response.status
+        except (http.client.HTTPException, OSError):
+            # Reabrir a conexão e contar como erro
+            self.connection.close()
+            self.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+            self.results.record(route, time.perf_counter() - start, 599)
+            return 599, None
+
+        self.results.record(route, time.perf_counter() - start, status)
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+    def get(self, route: str, path: str):
+        return self.request(route, "GET", path)
+
+    def post_json(self, route: str, path: str, data: Optional[dict] = None):
+        body = json.dumps(data or {}).encode()
+        return self.request(route, "POST", path, body, {"Content-Type": "application/json"})
+
+    def post_multipart(self, route: str, path: str, fields: Dict[str, str], file_name: str, content: bytes):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in fields.items():
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="media_file"; filename="{file_name}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode() + content + b"\r\n"
+        )
+        parts.append(f"--{boundary}--\r\n".encode())
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        return self.request(route, "POST", path, b"".join(parts), headers)
+
+
+class Results:
+    """Latências e status por rota"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, seconds: float, status: int):
+        with self._lock:
+            self.latencies[route].append(seconds * 1000)
+            if status >= 400:
+                self.errors[route] += 1
+
+
+# ==================== CENÁRIOS ====================
+
+def feed(client: Client, data: Dataset, rng: random.Random):
+    """Usuário abre o app: notícias, aulas publicadas e um item de cada"""
+    client.get("GET /news/", "/news/?limit=20")
+    client.get("GET /published-lessons/", f"/published-lessons/?limit=20&viewer_id={rng.choice(data.users)}")
+    if data.news:
+        client.get("GET /news/{id}", f"/news/{rng.choice(data.news)}")
+    if data.published_lessons:
+        client.get("GET /published-lessons/{id}", f"/published-lessons/{rng.choice(data.published_lessons)}")
+
+
+def forum(client: Client, data: Dataset, rng: random.Random):
+    """Navegação no fórum: lista, tópico, respostas e às vezes uma curtida"""
+    client.get("GET /forum/topics", "/forum/topics?limit=20")
+    if not data.topics:
+        return
+    topic_id = rng.choice(data.topics)
+    client.get("GET /forum/topics/{id}", f"/forum/topics/{topic_id}")
+    client.get("GET /forum/topics/{id}/replies",
+               f"/forum/topics/{topic_id}/replies?limit=20&viewer_id={rng.choice(data.users)}")
+    if data.replies and rng.random() < 0.3:
+        client.post_json("POST /forum/replies/{id}/like",
+                         f"/forum/replies/{rng.choice(data.replies)}/like?user_id={rng.choice(data.users)}")
+
+
+def lesson_flow(client: Client, data: Dataset, rng: random.Random):
+    """Aprendiz solicita uma aula; um voluntário consulta as disponíveis e aceita"""
+    status, lesson = client.post_json("POST /lessons/", "/lessons/", {
+        "learner_id": rng.choice(data.learners),
+        "subject_id": rng.choice(data.subjects),
+        "title": "Aula de teste de carga",
+        "lesson_type": "online",
+        "scheduled_date": "2030-01-01T10:00:00",
+    })
+    client.get("GET /lessons/available", f"/lessons/available?subject_id={rng.choice(data.subjects)}&limit=20")
+    if status == 201 and data.volunteers:
+        client.post_json("POST /lessons/{id}/accept", f"/lessons/{lesson['id']}/accept",
+                         {"volunteer_id": rng.choice(data.volunteers)})
+
+
+def upload(client: Client, data: Dataset, rng: random.Random):
+    """Voluntário publica uma aula com um arquivo pequeno"""
+    if not data.volunteers:
+        return
+    client.post_multipart("POST /published-lessons/", "/published-lessons/", {
+        "subject_id": str(rng.choice(data.subjects)),
+        "title": "Aula publicada no teste de carga",
+        "volunteer_id": str(rng.choice(data.volunteers)),
+    }, "material.pdf", os.urandom(rng.randint(10_000, 200_000)))
+
+
+def search(client: Client, data: Dataset, rng: random.Random):
+    """Busca geral e busca no fórum"""
+    term = rng.choice(SEARCH_TERMS)
+    client.get("GET /search", f"/search?q={quote(term)}&limit=20")
+    client.get("GET /forum/topics?search", f"/forum/topics?search={quote(term)}&limit=20")
+
+
+def nearby(client: Client, data: Dataset, rng: random.Random):
+    """Parceiros e aulas presenciais perto de um ponto de uma das cidades"""
+    lat, lng = rng.choice(CITY_CENTERS)
+    lat, lng = round(lat + rng.uniform(-0.1, 0.1), 5), round(lng + rng.uniform(-0.1, 0.1), 5)
+    client.get("GET /partners/nearby", f"/partners/nearby?lat={lat}&lng={lng}&radius_km=20&limit=20")
+    client.get("GET /lessons/available?lat&lng", f"/lessons/available?lat={lat}&lng={lng}&radius_km=30&limit=20")
+
+
+def matches(client: Client, data: Dataset, rng: random.Random):
+    """Voluntário abre as sugestões de aulas"""
+    if data.volunteers:
+        client.get("GET /lessons/matches/{id}", f"/lessons/matches/{rng.choice(data.volunteers)}?limit=20")
+
+
+def lookup(client: Client, data: Dataset, rng: random.Random):
+    """Telas que carregam vários itens por id de uma vez"""
+    for route, path, ids in (
+        ("GET /users/lookup", "/users/lookup", data.users),
+        ("GET /profiles/volunteers/lookup", "/profiles/volunteers/lookup", data.volunteers),
+        ("GET /published-lessons/lookup", "/published-lessons/lookup", data.published_lessons),
+    ):
+        if ids:
+            chosen = rng.sample(ids, min(LOOKUP_SIZE, len(ids)))
+            client.get(route, f"{path}?ids={','.join(map(str, chosen))}")
+
+
+def bulk(client: Client, data: Dataset, rng: random.Random):
+    """Importação em lote de notícias e de solicitações de aula"""
+    client.post_json("POST /news/bulk", "/news/bulk", {"items": [
+        {"title": "Notícia do teste de carga", "content": "Conteúdo do teste de carga", "news_type": "news"}
+        for _ in range(BULK_SIZE)
+    ]})
+    client.post_json("POST /lessons/bulk", "/lessons/bulk", {"items": [
+        {
+            "learner_id": rng.choice(data.learners),
+            "subject_id": rng.choice(data.subjects),
+            "title": "Aula em lote do teste de carga",
+            "lesson_type": "online",
+            "scheduled_date": "2030-01-01T10:00:00",
+        }
+        for _ in range(BULK_SIZE)
+    ]})
+
+
+# Peso de cada cenário na mistura
+SCENARIOS = [
+    (feed, 40), (forum, 24), (lesson_flow, 12), (upload, 4),
+    (search, 8), (nearby, 5), (matches, 3), (lookup, 3), (bulk, 1),
+]
+
+
+# ==================== EXECUÇÃO ====================
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int):
+    """Sobe a aplicação com uvicorn em uma thread deste processo"""
+    import uvicorn
+
+    config = uvicorn.Config("main:create_app", factory=True, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Servidor não iniciou")
+        time.sleep(0.05)
+    return server, thread
+
+
+def worker(port: int, data: Dataset, results: Results, seed: int, deadline: float):
+    rng = random.Random(seed)
+    client = Client(port, results)
+    scenarios = [scenario for scenario, _ in SCENARIOS]
+    weights = [weight for _, weight in SCENARIOS]
+    while time.perf_counter() < deadline:
+        rng.choices(scenarios, weights)[0](client, data, rng)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil pelo método nearest-rank"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(results: Results, elapsed: float) -> dict:
+    routes = {}
+    for route, latencies in sorted(results.latencies.items()):
+        routes[route] = {
+            "count": len(latencies),
+            "errors": results.errors.get(route, 0),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+        }
+    total = sum(route["count"] for route in routes.values())
+    return {"throughput_rps": round(total / elapsed, 2), "routes": routes}
+
+
+def print_report(summary: dict):
+    print(f"\n{'rota':<36} {'req':>7} {'erros':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, stats in summary["routes"].items():
+        print(f"{route:<36} {stats['count']:>7} {stats['errors']:>6} {stats['rps']:>8.1f} "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+    print(f"\nVazão total: {summary['throughput_rps']:.1f} req/s (latências em ms)")
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Lista as regressões em relação ao baseline"""
+    regressions = []
+    for route, stats in summary["routes"].items():
+        reference = baseline["routes"].get(route)
+        if not reference:
+            continue
+        keys = ("p50_ms", "p95_ms") if stats["count"] >= MIN_SAMPLES_P95 else ("p50_ms",)
+        for key in keys:
+            limit = reference[key] * (1 + tolerance)
+            if stats[key] > limit and stats[key] - reference[key] > NOISE_FLOOR_MS:
+                regressions.append(f"{route}: {key} {stats[key]:.1f} ms (baseline {reference[key]:.1f} ms)")
+        if stats["errors"] > reference["errors"]:
+            regressions.append(f"{route}: {stats['errors']} erros (baseline {reference['errors']})")
+
+    minimum = baseline["throughput_rps"] * (1 - tolerance)
+    if summary["throughput_rps"] < minimum:
+        regressions.append(
+            f"vazão {summary['throughput_rps']:.1f} req/s (baseline {baseline['throughput_rps']:.1f} req/s)"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga HTTP com baseline")
+    parser.add_argument("--users", type=int, default=2000, help="tamanho do conjunto gerado")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--duration", type=float, default=20.0, help="segundos de carga")
+    parser.add_argument("--concurrency", type=int, default=4, help="clientes simultâneos")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="piora aceita (0.5 = 50%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="regrava o baseline com esta execução")
+    args = parser.parse_args()
+
+    # Banco e uploads em um diretório temporário, configurados antes de importar a aplicação
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    database_path = os.path.join(workdir, "load.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    print(f"Gerando dados ({args.users} usuários) em {workdir}...")
+    subprocess.run(
+        [sys.executable, str(BACKEND_DIR / "generate_dataset.py"), "--users", str(args.users), "--seed", str(args.seed)],
+        cwd=workdir, check=True, stdout=subprocess.DEVNULL,
+    )
+    data = Dataset(database_path)
+
+    os.chdir(workdir)
+    sys.path.insert(0, str(BACKEND_DIR))
+    port = free_port()
+    server, server_thread = start_server(port)
+
+    print(f"Carga por {args.duration:.0f} s com {args.concurrency} clientes...")
+    results = Results()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(port, data, results, args.seed + index, deadline))
+        for index in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    server.should_exit = True
+    server_thread.join(timeout=10)
+
+    summary = summarize(results, elapsed)
+    summary["config"] = {"users": args.users, "seed": args.seed, "duration": args.duration,
+                         "concurrency": args.concurrency}
+    print_report(summary)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(summary, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Baseline gravado em {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("Sem baseline para comparar (use --update-baseline)")
+        return
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("config") != summary["config"]:
+        print("⚠️ Baseline gerado com outros parâmetros; a comparação pode não ser justa")
+
+    regressions = compare(summary, baseline, args.tolerance)
+    if regressions:
+        print("\n❌ Regressões em relação ao baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print("\n✅ Dentro do baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+Gera um volume grande de dados sintéticos para testes de carga
+Execute: python generate_dataset.py --users 100000 [--seed 42]
+
+Diferente do seed_database.py, não apaga nada: os ids continuam a partir dos
+já existentes e todas as chaves estrangeiras apontam para linhas criadas
+aqui. Os dados são os mesmos para a mesma semente e a mesma data de referência
+(partindo do mesmo banco), e são gravados com INSERTs executemany em lotes, sem
+passar pelo ORM.
+
+O histórico (cadastros, fórum, aulas concluídas) fica nos dois anos anteriores
+à data de referência, que por padrão é o dia atual; as aulas solicitadas,
+aceitas e confirmadas são marcadas para os dias seguintes a ela, como num
+sistema em uso.
+
+As respostas do fórum são geradas sem hierarquia (o modelo ForumReply não tem
+coluna de resposta-pai); cada tópico recebe uma lista de respostas.
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import bindparam, func, select, text, update
+
+from app.database import Base, engine
+from app.migrator import import_all_models, run_migrations
+from app.models.lesson import LessonStatus, LessonType
+from app.models.news import NewsType
+from app.models.partner import PartnerType
+from app.models.user import UserRole, UserStatus
+from app.search import rebuild as rebuild_search_index
+
+import_all_models()
+TABLES = Base.metadata.tables
+
+# Cada lote grande passaria do limite de consulta lenta; não registrar
+logging.getLogger("app.sql.slow").setLevel(logging.ERROR)
+
+# Período do histórico gerado, antes da data de referência
+PERIOD_DAYS = 730
+# Aulas em aberto são marcadas para até este número de dias após a data de referência
+UPCOMING_DAYS = 60
+
+QUESTIONS_PER_QUIZ = 10
+
+SUBJECT_NAMES = [
+    ("Matemática", "Exatas"), ("Português", "Linguagens"), ("Programação", "Tecnologia"),
+    ("Inglês", "Linguagens"), ("Física", "Exatas"), ("Química", "Exatas"),
+    ("História", "Humanas"), ("Geografia", "Humanas"), ("Biologia", "Biológicas"),
+    ("Informática Básica", "Tecnologia"),
+]
+CITIES = [
+    ("São Paulo", "SP", -23.55, -46.63), ("Rio de Janeiro", "RJ", -22.91, -43.17),
+    ("Recife", "PE", -8.05, -34.88), ("Salvador", "BA", -12.97, -38.50),
+    ("Belo Horizonte", "MG", -19.92, -43.94), ("Curitiba", "PR", -25.43, -49.27),
+    ("Fortaleza", "CE", -3.73, -38.52), ("Porto Alegre", "RS", -30.03, -51.23),
+]
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Hugo", "Isabela", "João",
+               "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Tiago", "Vitória", "Yuri"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Almeida", "Ferreira", "Gomes"]
+WORDS = ["dúvida", "exercício", "prova", "revisão", "conceito", "exemplo", "resumo", "questão", "tema", "aula",
+         "fórmula", "texto", "projeto", "leitura", "prática", "teoria", "método", "resultado", "cálculo", "ideia"]
+
+# Distribuição dos status das aulas
+LESSON_STATUS_WEIGHTS = {
+    LessonStatus.REQUESTED: 25,
+    LessonStatus.ACCEPTED: 15,
+    LessonStatus.CONFIRMED: 15,
+    LessonStatus.COMPLETED: 35,
+    LessonStatus.CANCELLED: 10,
+}
+# Status de aulas que ainda vão acontecer
+OPEN_STATUSES = (LessonStatus.REQUESTED, LessonStatus.ACCEPTED, LessonStatus.CONFIRMED)
+
+
+def batched(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Generator:
+    """Gera e grava os dados tabela por tabela"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.reference_date = datetime.combine(args.reference_date, datetime.min.time())
+        self.base_date = self.reference_date - timedelta(days=PERIOD_DAYS)
+        self.total_rows = 0
+        self.started = time.perf_counter()
+        # Ids gerados, usados pelas tabelas seguintes
+        self.subject_ids: List[int] = []
+        self.user_ids: List[int] = []
+        self.volunteers: Dict[int, int] = {}  # volunteer_id -> user_id
+        self.learners: Dict[int, int] = {}  # learner_id -> user_id
+        self.quiz_ids: List[int] = []
+        # Contadores agregados, gravados no fim
+        self.volunteer_totals: Dict[int, List[int]] = {}  # volunteer_id -> [pontos, aulas]
+        self.learner_quiz_score: Dict[int, int] = {}
+
+    # ==================== AUXILIARES ====================
+
+    def next_id(self, connection, table_name: str) -> int:
+        table = TABLES[table_name]
+        return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+    def date(self, days: int = PERIOD_DAYS) -> datetime:
+        """Data do histórico, entre o início do período e days dias depois dele"""
+        return self.base_date + timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def upcoming_date(self) -> datetime:
+        """Data de uma aula em aberto, nos dias seguintes à data de referência"""
+        return self.reference_date + timedelta(days=self.rng.randint(1, UPCOMING_DAYS), hours=self.rng.randint(8, 20))
+
+    def text(self, words: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=words)).capitalize()
+
+    def write(self, connection, table_name: str, rows: Iterable[dict]) -> int:
+        """Grava as linhas em lotes (um executemany e um commit por lote)"""
+        table = TABLES[table_name]
+        count = 0
+        for batch in batched(rows, self.args.batch_size):
+            connection.execute(table.insert(), batch)
+            connection.commit()
+            count += len(batch)
+        self.total_rows += count
+        elapsed = time.perf_counter() - self.started
+        print(f"  {table_name}: {count} linhas ({self.total_rows / elapsed:,.0f} linhas/s no total)")
+        return count
+
+    # ==================== TABELAS ====================
+
+    def subjects(self, connection):
+        existing = set(connection.execute(select(TABLES["subjects"].c.name)).scalars())
+        start = self.next_id(connection, "subjects")
+        rows = []
+        names = SUBJECT_NAMES + [(f"Disciplina {n}", "Geral") for n in range(1, self.args.subjects + 1)]
+        for name, category in names:
+            if len(rows) == self.args.subjects:
+                break
+            if name in existing:
+                continue
+            subject_id = start + len(rows)
+            rows.append({"id": subject_id, "name": name, "category": category,
+                         "description": f"Conteúdos de {name}"})
+            self.subject_ids.append(subject_id)
+        if not self.subject_ids:
+            self.subject_ids = list(connection.execute(select(TABLES["subjects"].c.id)).scalars())
+        self.write(connection, "subjects", rows)
+
+    def users(self, connection):
+        start = self.next_id(connection, "users")
+        volunteer_ratio = self.args.volunteer_ratio
+        volunteer_users, learner_users = [], []
+
+        def rows():
+            for user_id in range(start, start + self.args.users):
+                is_volunteer = self.rng.random() < volunteer_ratio
+                (volunteer_users if is_volunteer else learner_users).append(user_id)
+                city, state, lat, lng = self.rng.choice(CITIES)
+                self.user_ids.append(user_id)
+                yield {
+                    "id": user_id,
+                    "email": f"usuario{user_id}@exemplo.com",
+                    "password_hash": "senha123",
+                    "name": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                    "role": UserRole.VOLUNTEER if is_volunteer else UserRole.LEARNER,
+                    "status": UserStatus.ACTIVE,
+                    "location_city": city,
+                    "location_state": state,
+                    "location_latitude": f"{lat + self.rng.uniform(-0.2, 0.2):.6f}",
+                    "location_longitude": f"{lng + self.rng.uniform(-0.2, 0.2):.6f}",
+                    "is_online_available": True,
+                    "is_presencial_available": self.rng.random() < 0.4,
+                    "created_at": self.date(),
+                }
+
+        self.write(connection, "users", rows())
+        self.profiles(connection, volunteer_users, learner_users)
+
+    def profiles(self, connection, volunteer_users: List[int], learner_users: List[int]):
+        volunteer_start = self.next_id(connection, "volunteers")
+        for offset, user_id in enumerate(volunteer_users):
+            self.volunteers[volunteer_start + offset] = user_id
+        learner_start = self.next_id(connection, "learners")
+        for offset, user_id in enumerate(learner_users):
+            self.learners[learner_start + offset] = user_id
+
+        self.write(connection, "volunteers", (
+            {"id": volunteer_id, "user_id": user_id,
+             "volunteer_type": self.rng.choice(["student", "teacher"]),
+             "institution": f"Instituição {self.rng.randint(1, 500)}",
+             "document_verified": 1 if self.rng.random() < 0.8 else 0,
+             "total_points": 0, "total_lessons": 0}
+            for volunteer_id, user_id in self.volunteers.items()
+        ))
+        self.write(connection, "volunteer_subjects", (
+            {"volunteer_id": volunteer_id, "subject_id": subject_id}
+            for volunteer_id in self.volunteers
+            for subject_id in self.rng.sample(self.subject_ids, min(len(self.subject_ids), self.rng.randint(1, 3)))
+        ))
+        self.write(connection, "learners", (
+            {"id": learner_id, "user_id": user_id, "total_badges": 0,
+             "total_courses_completed": 0, "total_quiz_score": 0}
+            for learner_id, user_id in self.learners.items()
+        ))
+        self.write(connection, "learner_interests", (
+            {"learner_id": learner_id, "subject_id": subject_id}
+            for learner_id in self.learners
+            for subject_id in self.rng.sample(self.subject_ids, min(len(self.subject_ids), self.rng.randint(1, 4)))
+        ))
+
+    def lessons(self, connection):
+        start = self.next_id(connection, "lessons")
+        volunteer_ids = list(self.volunteers)
+        statuses = list(LESSON_STATUS_WEIGHTS)
+        weights = list(LESSON_STATUS_WEIGHTS.values())
+        completed = []
+
+        def rows():
+            lesson_id = start
+            for learner_id in self.learners:
+                for _ in range(self.rng.randint(0, 2 * self.args.lessons_per_learner)):
+                    status = self.rng.choices(statuses, weights)[0]
+                    lesson_type = self.rng.choice([LessonType.ONLINE, LessonType.PRESENCIAL])
+                    city, _, lat, lng = self.rng.choice(CITIES)
+                    has_volunteer = volunteer_ids and (
+                        status not in (LessonStatus.REQUESTED, LessonStatus.CANCELLED) or self.rng.random() < 0.3
+                    )
+                    volunteer_id = self.rng.choice(volunteer_ids) if has_volunteer else None
+                    if status in OPEN_STATUSES:
+                        # Em aberto: marcada para os próximos dias, solicitada há pouco
+                        scheduled_date = self.upcoming_date()
+                        created_at = self.reference_date - timedelta(seconds=self.rng.randrange(30 * 86400))
+                    else:
+                        # Histórico: marcada até 30 dias após a solicitação, antes da data de referência
+                        created_at = self.date(PERIOD_DAYS - 31)
+                        scheduled_date = created_at + timedelta(days=self.rng.randint(1, 30), hours=self.rng.randint(8, 20))
+                    row = {
+                        "id": lesson_id,
+                        "learner_id": learner_id,
+                        "volunteer_id": volunteer_id,
+                        "subject_id": self.rng.choice(self.subject_ids),
+                        "title": f"Ajuda com {self.text(2).lower()}",
+                        "lesson_type": lesson_type,
+                        "status": status,
+                        "scheduled_date": scheduled_date,
+                        "duration_minutes": self.rng.choice([30, 45, 60, 90]),
+                        "location_city": city,
+                        "location_latitude": round(lat + self.rng.uniform(-0.2, 0.2), 6) if lesson_type == LessonType.PRESENCIAL else None,
+                        "location_longitude": round(lng + self.rng.uniform(-0.2, 0.2), 6) if lesson_type == LessonType.PRESENCIAL else None,
+                        "meeting_link": f"https://meet.exemplo.com/{lesson_id}" if lesson_type == LessonType.ONLINE else None,
+                        "meeting_platform": "google_meet" if lesson_type == LessonType.ONLINE else None,
+                        "rating": None,
+                        "feedback": None,
+                        "created_at": created_at,
+                    }
+                    if status == LessonStatus.COMPLETED and volunteer_id:
+                        row["rating"] = self.rng.randint(3, 5)
+                        completed.append((lesson_id, volunteer_id, row["scheduled_date"]))
+                        totals = self.volunteer_totals.setdefault(volunteer_id, [0, 0])
+                        totals[0] += 10
+                        totals[1] += 1
+                    lesson_id += 1
+                    yield row
+
+        self.write(connection, "lessons", rows())
+        # Pontos das aulas concluídas (mesma regra de POST /lessons/{id}/complete)
+        self.write(connection, "points_transactions", (
+            {"user_id": self.volunteers[volunteer_id], "points": 10, "reason": "lesson_completed",
+             "reference_id": lesson_id, "created_at": scheduled}
+            for lesson_id, volunteer_id, scheduled in completed
+        ))
+
+    def forum(self, connection):
+        topic_start = self.next_id(connection, "forum_topics")
+        reply_start = self.next_id(connection, "forum_replies")
+        replies = []
+
+        def topics():
+            reply_id = reply_start
+            for topic_id in range(topic_start, topic_start + self.args.topics):
+                created_at = self.date()
+                count = self.rng.randint(0, 2 * self.args.replies_per_topic)
+                for _ in range(count):
+                    replies.append({
+                        "id": reply_id,
+                        "topic_id": topic_id,
+                        "user_id": self.rng.choice(self.user_ids),
+                        "content": self.text(12),
+                        "is_accepted": False,
+                        "likes_count": 0,
+                        "created_at": created_at + timedelta(minutes=self.rng.randint(1, 10000)),
+                    })
+                    reply_id += 1
+                yield {
+                    "id": topic_id,
+                    "subject_id": self.rng.choice(self.subject_ids),
+                    "user_id": self.rng.choice(self.user_ids),
+                    "title": self.text(5),
+                    "content": self.text(30),
+                    "is_resolved": False,
+                    "views_count": self.rng.randint(0, 500),
+                    "replies_count": count,
+                    "created_at": created_at,
+                }
+
+        self.write(connection, "forum_topics", topics())
+        self.write(connection, "forum_replies", replies)
+
+    def published_lessons(self, connection):
+        volunteer_ids = list(self.volunteers)
+        if not volunteer_ids:
+            return
+        start = self.next_id(connection, "published_lessons")
+        self.write(connection, "published_lessons", (
+            {"id": lesson_id,
+             "volunteer_id": self.rng.choice(volunteer_ids),
+             "subject_id": self.rng.choice(self.subject_ids),
+             "title": self.text(4),
+             "description": self.text(20),
+             "media_type": "video",
+             "media_url": f"/uploads/media/gerado_{lesson_id}.mp4",
+             "views_count": self.rng.randint(0, 1000),
+             "likes_count": 0,
+             "created_at": self.date()}
+            for lesson_id in range(start, start + self.args.published_lessons)
+        ))
+
+    def quizzes(self, connection):
+        start = self.next_id(connection, "quizzes")
+        quizzes = []
+        for subject_id in self.subject_ids:
+            for _ in range(self.args.quizzes_per_subject):
+                quiz_id = start + len(quizzes)
+                quizzes.append({"id": quiz_id, "subject_id": subject_id, "title": f"Quiz: {self.text(3)}",
+                                "passing_score": 70, "time_limit_minutes": 20, "is_active": True,
+                                "created_at": self.date()})
+                self.quiz_ids.append(quiz_id)
+        self.write(connection, "quizzes", quizzes)
+        self.write(connection, "quiz_questions", (
+            {"quiz_id": quiz_id, "question_text": f"{self.text(8)}?", "options": ["A", "B", "C", "D"],
+             "correct_answer": str(self.rng.randint(0, 3)), "points": 10, "order_index": order}
+            for quiz_id in self.quiz_ids
+            for order in range(QUESTIONS_PER_QUIZ)
+        ))
+
+        passed = []
+
+        def attempts():
+            for learner_id in self.learners:
+                for _ in range(self.rng.randint(0, 2 * self.args.attempts_per_learner)):
+                    correct = self.rng.randint(0, QUESTIONS_PER_QUIZ)
+                    score = correct * 100 // QUESTIONS_PER_QUIZ
+                    started = self.date()
+                    quiz_id = self.rng.choice(self.quiz_ids)
+                    if score >= 70:
+                        passed.append((learner_id, quiz_id, score, started))
+                        self.learner_quiz_score[learner_id] = self.learner_quiz_score.get(learner_id, 0) + score
+                    yield {"learner_id": learner_id, "quiz_id": quiz_id, "score": score,
+                           "total_questions": QUESTIONS_PER_QUIZ, "correct_answers": correct,
+                           "is_passed": score >= 70, "started_at": started,
+                           "completed_at": started + timedelta(minutes=self.rng.randint(2, 20))}
+
+        self.write(connection, "quiz_attempts", attempts())
+        self.write(connection, "points_transactions", (
+            {"user_id": self.learners[learner_id], "points": score // 10, "reason": "quiz_passed",
+             "reference_id": quiz_id, "created_at": started}
+            for learner_id, quiz_id, score, started in passed
+        ))
+
+    def partners_and_news(self, connection):
+        partner_types = list(PartnerType)
+        self.write(connection, "partner_locations", (
+            {"name": f"Parceiro {self.text(2)}", "partner_type": self.rng.choice(partner_types),
+             "city": city, "state": state,
+             "latitude": round(lat + self.rng.uniform(-0.2, 0.2), 6),
+             "longitude": round(lng + self.rng.uniform(-0.2, 0.2), 6),
+             "is_active": True, "created_at": self.date()}
+            for city, state, lat, lng in (self.rng.choice(CITIES) for _ in range(self.args.partners))
+        ))
+        news_types = list(NewsType)
+        self.write(connection, "news", (
+            {"title": self.text(6), "content": self.text(60), "news_type": self.rng.choice(news_types),
+             "is_active": True, "is_featured": self.rng.random() < 0.1,
+             "views_count": self.rng.randint(0, 5000), "created_at": self.date()}
+            for _ in range(self.args.news)
+        ))
+
+    def totals(self, connection):
+        """Grava os contadores agregados de voluntários e aprendizes"""
+        volunteers = TABLES["volunteers"]
+        for batch in batched(({"row_id": volunteer_id, "points": points, "lessons": lessons}
+                              for volunteer_id, (points, lessons) in self.volunteer_totals.items()),
+                             self.args.batch_size):
+            connection.execute(
+                update(volunteers).where(volunteers.c.id == bindparam("row_id"))
+                .values(total_points=bindparam("points"), total_lessons=bindparam("lessons")),
+                batch,
+            )
+        learners = TABLES["learners"]
+        for batch in batched(({"row_id": learner_id, "score": score}
+                              for learner_id, score in self.learner_quiz_score.items()),
+                             self.args.batch_size):
+            connection.execute(
+                update(learners).where(learners.c.id == bindparam("row_id"))
+                .values(total_quiz_score=bindparam("score")),
+                batch,
+            )
+        connection.commit()
+
+    def sequences(self, connection):
+        """No PostgreSQL, ids explícitos não avançam as sequências; ajustar"""
+        if connection.dialect.name != "postgresql":
+            return
+        for table_name in ("subjects", "users", "volunteers", "learners", "lessons", "forum_topics",
+                           "forum_replies", "published_lessons", "quizzes"):
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table_name}))"
+            ))
+        connection.commit()
+
+    def run(self):
+        with engine.connect() as connection:
+            print("\n📚 Disciplinas")
+            self.subjects(connection)
+            print("\n👥 Usuários e perfis")
+            self.users(connection)
+            print("\n📅 Aulas")
+            self.lessons(connection)
+            print("\n💬 Fórum")
+            self.forum(connection)
+            print("\n🎬 Aulas publicadas")
+            self.published_lessons(connection)
+            print("\n📝 Quizzes")
+            self.quizzes(connection)
+            print("\n🗺️ Parceiros e notícias")
+            self.partners_and_news(connection)
+            self.totals(connection)
+            self.sequences(connection)
+            print("\n🔎 Índice de busca")
+            rebuild_search_index(connection)
+            connection.commit()
+
+        elapsed = time.perf_counter() - self.started
+        print(f"\n✅ {self.total_rows:,} linhas em {elapsed:.1f} s ({self.total_rows / elapsed * 60:,.0f} linhas/min)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de dados sintéticos para testes de carga")
+    parser.add_argument("--seed", type=int, default=42, help="semente (mesma semente, mesmos dados)")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--volunteer-ratio", type=float, default=0.2, help="fração de usuários voluntários")
+    parser.add_argument("--subjects", type=int, default=30)
+    parser.add_argument("--lessons-per-learner", type=int, default=2, help="média de aulas por aprendiz")
+    parser.add_argument("--topics", type=int, default=None, help="tópicos do fórum (padrão: usuários / 10)")
+    parser.add_argument("--replies-per-topic", type=int, default=5, help="média de respostas por tópico")
+    parser.add_argument("--published-lessons", type=int, default=None, help="padrão: usuários / 20")
+    parser.add_argument("--quizzes-per-subject", type=int, default=5)
+    parser.add_argument("--attempts-per-learner", type=int, default=2, help="média de tentativas de quiz")
+    parser.add_argument("--partners", type=int, default=200)
+    parser.add_argument("--news", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=10000, help="linhas por executemany/commit")
+    parser.add_argument(
+        "--reference-date", type=date.fromisoformat, default=date.today(),
+        help="data (AAAA-MM-DD) que separa o histórico das aulas em aberto (padrão: hoje)",
+    )
+    args = parser.parse_args()
+
+    if args.topics is None:
+        args.topics = args.users // 10
+    if args.published_lessons is None:
+        args.published_lessons = args.users // 20
+
+    run_migrations(engine)
+    Generator(args).run()
+
+
+if __name__ == "__main__":
+    main()
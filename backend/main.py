@@ -1,109 +1,169 @@
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from pathlib import Path
+from starlette.concurrency import run_in_threadpool
 from app.config import get_settings
-from app.database import engine, Base
-
-# Importar TODOS os modelos para que SQLAlchemy os registre
-from app.models.user import User
-from app.models.volunteer import Volunteer
-from app.models.learner import Learner
-from app.models.subject import Subject
-from app.models.lesson import Lesson
-from app.models.published_lesson import PublishedLesson
-from app.models.course import Course, CourseMaterial, CourseProgress
-from app.models.quiz import Quiz, QuizQuestion, QuizAttempt
-from app.models.gamification import Badge, UserBadge, PointsTransaction
-from app.models.partner import PartnerLocation
-from app.models.news import News
-from app.models.communication import Message, ForumTopic, ForumReply
-
-from app.api.subjects import router as subjects_router
-from app.api.profiles import router as profiles_router
-from app.api.lessons import router as lessons_router
-from app.api.published_lessons import router as published_lessons_router
-from app.api.news import router as news_router
-from app.api.partners import router as partners_router
-from app.api.users import router as users_router
-from app.api.forum import router as forum_router
-from app.websocket.endpoint import websocket_endpoint
 
 settings = get_settings()
 
-# Criar as tabelas no banco de dados
-Base.metadata.create_all(bind=engine)
-
-# Criar aplicação FastAPI
-app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
-    description="API Backend - Plataforma de Voluntariado Educacional"
-)
-
-# Configurar CORS
-origins = settings.cors_origins.split(",")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Servir arquivos estáticos de mídia
-uploads_dir = Path("uploads")
-uploads_dir.mkdir(exist_ok=True)
-if (uploads_dir / "media").exists():
-    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-
-# Incluir rotas da API
-app.include_router(users_router)
-app.include_router(subjects_router)
-app.include_router(profiles_router)
-app.include_router(lessons_router)
-app.include_router(published_lessons_router)
-app.include_router(news_router)
-app.include_router(partners_router)
-app.include_router(forum_router)
-
-# Rota WebSocket
-@app.websocket("/ws")
-async def websocket_route(websocket: WebSocket):
-    await websocket_endpoint(websocket)
-
-
-# Rota raiz
-@app.get("/")
-def read_root():
-    return {
-        "message": f"Bem-vindo à {settings.app_name}",
-        "version": settings.app_version,
-        "description": "Plataforma de Voluntariado Educacional",
-        "docs": "/docs",
-        "endpoints": {
-            "subjects": "/subjects",
-            "volunteers": "/profiles/volunteers",
-            "learners": "/profiles/learners",
-            "lessons": "/lessons",
-            "published_lessons": "/published-lessons",
-            "news": "/news",
-            "partners": "/partners",
-            "websocket": "/ws"
+# Diretório de uploads servido em /uploads
+UPLOADS_DIR = Path("uploads")
+
+
+def prepare_runtime():
+    """Prepara banco e diretórios antes de atender requisições"""
+    from app.api.published_lessons import MEDIA_DIR
+    from app.database import log_sqlite_pragmas
+    from app.migrator import run_migrations
+
+    if settings.auto_migrate:
+        run_migrations()
+    log_sqlite_pragmas()
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicialização e encerramento da aplicação"""
+    from app.database import async_engine
+    from app.likes import like_index
+    from app.matching import match_index
+    from app.view_counter import view_counter
+    from app.websocket.manager import manager
+
+    await run_in_threadpool(prepare_runtime)
+    flush_task = asyncio.create_task(view_counter.run_periodic())
+    like_index_task = asyncio.create_task(like_index.run_periodic())
+    match_index_task = asyncio.create_task(match_index.run_periodic())
+    yield
+    like_index_task.cancel()
+    match_index_task.cancel()
+    # Gravar as visualizações pendentes antes de encerrar
+    flush_task.cancel()
+    await run_in_threadpool(view_counter.flush)
+    # Encerrar a distribuição das mensagens WebSocket
+    await manager.shutdown()
+    # Encerrar o pool da engine assíncrona ao desligar
+    await async_engine.dispose()
+
+
+def create_app() -> FastAPI:
+    """Cria a aplicação FastAPI com todas as rotas"""
+    # Rotas (e os modelos que elas usam) só são importadas ao criar a
+    # aplicação, deixando o import deste módulo barato
+    from app.api.subjects import router as subjects_router
+    from app.api.profiles import router as profiles_router
+    from app.api.lessons import router as lessons_router
+    from app.api.published_lessons import router as published_lessons_router
+    from app.api.news import router as news_router
+    from app.api.partners import router as partners_router
+    from app.api.users import router as users_router
+    from app.api.forum import router as forum_router
+    from app.api.search import router as search_router
+    from app.database import get_pool_status
+    from app.instrumentation import sql_instrumentation_middleware
+    from app.metrics import metrics_endpoint, metrics_middleware
+    from app.pagination import NEXT_CURSOR_HEADER
+    from app.websocket.endpoint import websocket_endpoint
+
+    # Criar aplicação FastAPI
+    app = FastAPI(
+        title=settings.app_name,
+        version=settings.app_version,
+        description="API Backend - Plataforma de Voluntariado Educacional",
+        lifespan=lifespan
+    )
+
+    # Configurar CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
+
+    # Medir as consultas SQL de cada requisição
+    if settings.sql_instrumentation:
+        app.middleware("http")(sql_instrumentation_middleware)
+
+    # Métricas por rota (registrado por último para envolver os demais middlewares)
+    app.middleware("http")(metrics_middleware)
+
+    # Servir arquivos estáticos de mídia (o diretório é criado no lifespan)
+    app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR, check_dir=False), name="uploads")
+
+    # Incluir rotas da API
+    app.include_router(users_router)
+    app.include_router(subjects_router)
+    app.include_router(profiles_router)
+    app.include_router(lessons_router)
+    app.include_router(published_lessons_router)
+    app.include_router(news_router)
+    app.include_router(partners_router)
+    app.include_router(forum_router)
+    app.include_router(search_router)
+
+    # Rota WebSocket
+    @app.websocket("/ws")
+    async def websocket_route(websocket: WebSocket):
+        await websocket_endpoint(websocket)
+
+    # Rota raiz
+    @app.get("/")
+    def read_root():
+        return {
+            "message": f"Bem-vindo à {settings.app_name}",
+            "version": settings.app_version,
+            "description": "Plataforma de Voluntariado Educacional",
+            "docs": "/docs",
+            "endpoints": {
+                "subjects": "/subjects",
+                "volunteers": "/profiles/volunteers",
+                "learners": "/profiles/learners",
+                "lessons": "/lessons",
+                "published_lessons": "/published-lessons",
+                "news": "/news",
+                "partners": "/partners",
+                "search": "/search",
+                "websocket": "/ws"
+            }
         }
-    }
+
+    # Rota de health check
+    @app.get("/health")
+    def health_check():
+        return {"status": "ok"}
+
+    # Estatísticas dos pools de conexão com o banco
+    @app.get("/health/pool")
+    def pool_health_check():
+        return get_pool_status()
+
+    # Métricas no formato do Prometheus
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+
+    return app
 
 
-# Rota de health check
-@app.get("/health")
-def health_check():
-    return {"status": "ok"}
+def __getattr__(name: str):
+    """Cria a aplicação no primeiro acesso a main.app (usado por "uvicorn main:app")"""
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "main:app",
+        "main:create_app",
+        factory=True,
         host=settings.api_host,
         port=settings.api_port,
         reload=settings.api_reload
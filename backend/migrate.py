@@ -0,0 +1,39 @@
+"""
+Aplica as migrações do banco de dados
+Execute: python migrate.py [upgrade|status]
+"""
+import argparse
+import logging
+from app.database import engine
+from app.migrator import discover_migrations, get_applied_versions, run_migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrações do banco de dados")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        default="upgrade",
+        choices=["upgrade", "status"],
+        help="upgrade aplica as migrações pendentes; status lista o estado de cada uma"
+    )
+    args = parser.parse_args()
+
+    if args.command == "status":
+        applied = set(get_applied_versions(engine))
+        for version, name in discover_migrations():
+            state = "aplicada" if version in applied else "pendente"
+            print(f"{name}: {state}")
+        return
+
+    applied = run_migrations(engine)
+    if applied:
+        for name in applied:
+            print(f"✅ {name}")
+    else:
+        print("Banco de dados já está atualizado.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
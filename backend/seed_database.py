@@ -2,7 +2,9 @@
 Script para popular o banco de dados com dados de exemplo
 Execute: python seed_database.py
 """
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, engine
+from app.migrator import run_migrations
+from app.search import rebuild as rebuild_search_index
 
 # Importar TODOS os modelos para que SQLAlchemy os registre
 from app.models.user import User
@@ -19,8 +21,8 @@ from app.models.communication import Message, ForumTopic, ForumReply
 
 from datetime import datetime, timedelta
 
-# Criar tabelas
-Base.metadata.create_all(bind=engine)
+# Criar/atualizar tabelas
+run_migrations(engine)
 
 db = SessionLocal()
 
@@ -172,6 +174,10 @@ try:
     db.commit()
     print(f"✅ {len(news_items)} notícias/eventos criados!")
     
+    # Os objetos acima foram gravados sem passar pelas rotas; indexar tudo
+    rebuild_search_index(db)
+    db.commit()
+    
     print("\n" + "="*50)
     print("✨ Banco de dados populado com sucesso!")
     print("="*50)
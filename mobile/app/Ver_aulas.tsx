@@ -46,7 +46,7 @@ export default function VerAulasScreen() {
     try {
       setIsLoading(true);
       const [lessonsData, subjectsData] = await Promise.all([
-        apiService.getPublishedLessons(),
+        apiService.getPublishedLessons(undefined, undefined, undefined, undefined, authContext.state.user?.id),
         apiService.getSubjects(),
       ]);
       setLessons(lessonsData);
@@ -89,15 +89,18 @@ export default function VerAulasScreen() {
     setFilteredLessons(filtered);
   };
 
-  const handleLikeLesson = async (lessonId: number) => {
+  const handleLikeLesson = async (lesson: PublishedLesson) => {
+    const userId = authContext.state.user?.id;
+    if (!userId) return;
+
     try {
-      await apiService.likePublishedLesson(lessonId);
-      // Atualizar o contador de likes localmente
+      // Cada usuário curte uma vez; tocar de novo remove a curtida
+      const { likes_count, liked_by_me } = lesson.liked_by_me
+        ? await apiService.unlikePublishedLesson(lesson.id, userId)
+        : await apiService.likePublishedLesson(lesson.id, userId);
       setLessons(prevLessons =>
-        prevLessons.map(lesson =>
-          lesson.id === lessonId
-            ? { ...lesson, likes_count: lesson.likes_count + 1 }
-            : lesson
+        prevLessons.map(item =>
+          item.id === lesson.id ? { ...item, likes_count, liked_by_me } : item
         )
       );
     } catch (error: any) {
@@ -292,9 +295,13 @@ export default function VerAulasScreen() {
                   </View>
                   <TouchableOpacity
                     style={styles.statItem}
-                    onPress={() => handleLikeLesson(lesson.id)}
+                    onPress={() => handleLikeLesson(lesson)}
                   >
-                    <MaterialIcons name="favorite" size={16} color="#FF6B6B" />
+                    <MaterialIcons
+                      name={lesson.liked_by_me ? 'favorite' : 'favorite-border'}
+                      size={16}
+                      color="#FF6B6B"
+                    />
                     <ThemedText style={styles.statText}>{lesson.likes_count}</ThemedText>
                   </TouchableOpacity>
                 </View>
@@ -67,12 +67,12 @@ export default function ConversasScreen() {
 
   const loadReplies = useCallback(async (topicId: number) => {
     try {
-      const repliesData = await apiService.getForumReplies(topicId);
+      const repliesData = await apiService.getForumReplies(topicId, undefined, undefined, state.user?.id);
       setReplies(repliesData);
     } catch (error) {
       console.error('Erro ao carregar respostas:', error);
     }
-  }, []);
+  }, [state.user?.id]);
 
   useEffect(() => {
     const init = async () => {
@@ -275,8 +275,13 @@ export default function ConversasScreen() {
   };
 
   const handleLikeReply = async (reply: ForumReply) => {
+    if (!state.user?.id) return;
+
     try {
-      const updatedReply = await apiService.likeForumReply(reply.id);
+      // Cada usuário curte uma vez; tocar de novo remove a curtida
+      const updatedReply = reply.liked_by_me
+        ? await apiService.unlikeForumReply(reply.id, state.user.id)
+        : await apiService.likeForumReply(reply.id, state.user.id);
       setReplies(replies.map(r => r.id === updatedReply.id ? updatedReply : r));
     } catch (error: any) {
       console.error('Erro ao curtir:', error);
@@ -371,7 +376,7 @@ export default function ConversasScreen() {
         
         <View style={styles.replyFooter}>
           <TouchableOpacity style={styles.replyAction} onPress={() => handleLikeReply(item)}>
-            <MaterialIcons name="thumb-up" size={16} color="#666" />
+            <MaterialIcons name="thumb-up" size={16} color={item.liked_by_me ? '#0A66C2' : '#666'} />
             <Text style={styles.replyActionText}>{item.likes_count}</Text>
           </TouchableOpacity>
           
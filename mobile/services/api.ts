@@ -204,7 +204,8 @@ class ApiService {
     volunteerId?: number,
     subjectId?: number,
     skip?: number,
-    limit?: number
+    limit?: number,
+    viewerId?: number
   ): Promise<any[]> {
     try {
       const response = await this.api.get('/published-lessons/', {
@@ -213,6 +214,7 @@ class ApiService {
           subject_id: subjectId,
           skip: skip || 0,
           limit: limit || 50,
+          viewer_id: viewerId,
         },
       });
       return response.data;
@@ -256,9 +258,22 @@ class ApiService {
     }
   }
 
-  async likePublishedLesson(lessonId: number): Promise<any> {
+  async likePublishedLesson(lessonId: number, userId: number): Promise<any> {
     try {
-      const response = await this.api.post(`/published-lessons/${lessonId}/like`);
+      const response = await this.api.post(`/published-lessons/${lessonId}/like`, null, {
+        params: { user_id: userId },
+      });
+      return response.data;
+    } catch (error) {
+      throw this.handleError(error);
+    }
+  }
+
+  async unlikePublishedLesson(lessonId: number, userId: number): Promise<any> {
+    try {
+      const response = await this.api.delete(`/published-lessons/${lessonId}/like`, {
+        params: { user_id: userId },
+      });
       return response.data;
     } catch (error) {
       throw this.handleError(error);
@@ -331,10 +346,15 @@ class ApiService {
     }
   }
 
-  async getForumReplies(topicId: number, skip?: number, limit?: number): Promise<ForumReply[]> {
+  async getForumReplies(
+    topicId: number,
+    skip?: number,
+    limit?: number,
+    viewerId?: number
+  ): Promise<ForumReply[]> {
     try {
       const response = await this.api.get(`/forum/topics/${topicId}/replies`, {
-        params: { skip, limit }
+        params: { skip, limit, viewer_id: viewerId }
       });
       return response.data;
     } catch (error) {
@@ -372,9 +392,22 @@ class ApiService {
     }
   }
 
-  async likeForumReply(replyId: number): Promise<ForumReply> {
+  async likeForumReply(replyId: number, userId: number): Promise<ForumReply> {
     try {
-      const response = await this.api.post(`/forum/replies/${replyId}/like`);
+      const response = await this.api.post(`/forum/replies/${replyId}/like`, null, {
+        params: { user_id: userId }
+      });
+      return response.data;
+    } catch (error) {
+      throw this.handleError(error);
+    }
+  }
+
+  async unlikeForumReply(replyId: number, userId: number): Promise<ForumReply> {
+    try {
+      const response = await this.api.delete(`/forum/replies/${replyId}/like`, {
+        params: { user_id: userId }
+      });
       return response.data;
     } catch (error) {
       throw this.handleError(error);
@@ -58,6 +58,7 @@ export interface PublishedLesson {
   media_type?: string;
   views_count: number;
   likes_count: number;
+  liked_by_me?: boolean;
   created_at: string;
   updated_at?: string;
 }
@@ -142,6 +143,7 @@ export interface ForumReply {
   content: string;
   is_accepted: boolean;
   likes_count: number;
+  liked_by_me?: boolean;
   created_at: string;
   updated_at?: string;
   author_name: string;